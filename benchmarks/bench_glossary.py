@@ -0,0 +1,78 @@
+"""Compare Aho-Corasick glossary scanning with naive per-term regex scanning.
+
+Run with ``python benchmarks/bench_glossary.py [--terms N] [--segments N]``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import re
+import string
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from pivot.glossary import Glossary, GlossaryEntry  # noqa: E402
+
+
+def _random_word(rng: random.Random) -> str:
+    return "".join(rng.choices(string.ascii_lowercase, k=rng.randint(4, 10)))
+
+
+def _build_corpus(terms: int, segments: int, seed: int) -> tuple[list[GlossaryEntry], list[str]]:
+    rng = random.Random(seed)
+    vocabulary = sorted({_random_word(rng) for _ in range(terms * 2)})
+    glossary_terms = vocabulary[:terms]
+    entries = [
+        GlossaryEntry(term, None if index % 3 else f"术语{index}")
+        for index, term in enumerate(glossary_terms)
+    ]
+    corpus = [
+        " ".join(rng.choice(vocabulary) for _ in range(rng.randint(20, 60)))
+        for _ in range(segments)
+    ]
+    return entries, corpus
+
+
+def _naive_find(patterns: list[re.Pattern[str]], text: str) -> int:
+    found = 0
+    for pattern in patterns:
+        found += sum(1 for _ in pattern.finditer(text))
+    return found
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--terms", type=int, default=20_000)
+    parser.add_argument("--segments", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    entries, corpus = _build_corpus(args.terms, args.segments, args.seed)
+
+    started = time.perf_counter()
+    glossary = Glossary.from_entries(entries)
+    build_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    automaton_hits = sum(len(glossary.find(segment)) for segment in corpus)
+    automaton_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    patterns = [re.compile(rf"\b{re.escape(entry.term)}\b") for entry in entries]
+    naive_hits = sum(_naive_find(patterns, segment) for segment in corpus)
+    naive_seconds = time.perf_counter() - started
+
+    print(f"terms={len(entries)} segments={len(corpus)}")
+    print(f"automaton build:   {build_seconds * 1000:10.1f} ms")
+    print(f"automaton scan:    {automaton_seconds * 1000:10.1f} ms  hits={automaton_hits}")
+    print(f"naive regex scan:  {naive_seconds * 1000:10.1f} ms  hits={naive_hits}")
+    if automaton_seconds:
+        print(f"speedup:           {naive_seconds / automaton_seconds:10.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -31,20 +31,75 @@ class ChangeDetector:
         if state.last_synced_commit == head_commit:
             return []
 
-        candidates = self._candidate_paths(repo, state)
+        candidates = self._candidate_paths(repo, state.last_synced_commit)
         filtered = [path for path in candidates if self._is_translatable(path, config.docs_path)]
         return filtered
 
+    def collect_branch_changes(
+        self, config: RepositoryConfig, repo: Repo, branch: str, commit: str
+    ) -> list[Path]:
+        """Documents of ``branch`` changed between its sync pointer and ``commit``.
+
+        Branches are compared through their commits only, so several branches
+        can be inspected from one clone without checking any of them out.
+        """
+
+        last = self.state_store.get_repository_state(config.name).branches.get(branch)
+        if last == commit:
+            return []
+
+        candidates = self._candidate_paths(repo, last, commit)
+        return [path for path in candidates if self._is_translatable(path, config.docs_path)]
+
     def record_processed(self, config: RepositoryConfig, repo: Repo) -> None:
-        state = RepositoryState(last_synced_commit=repo.head.commit.hexsha)
-        self.state_store.set_repository_state(config.name, state)
+        self.record_commit(config, repo.head.commit.hexsha)
 
-    def _candidate_paths(self, repo: Repo, state: RepositoryState) -> list[Path]:
-        if state.last_synced_commit:
-            diff = repo.git.diff(f"{state.last_synced_commit}..HEAD", "--name-only")
+    def record_commit(
+        self, config: RepositoryConfig, commit: str, *, branch: str | None = None
+    ) -> None:
+        """Persist ``commit`` as the last processed commit of the repository or ``branch``."""
+
+        def update(state: RepositoryState) -> None:
+            if branch is None:
+                state.last_synced_commit = commit
+            else:
+                state.branches[branch] = commit
+
+        self.state_store.update_repository_state(config.name, update)
+
+    @staticmethod
+    def resolve_blobs(
+        repo: Repo, commit: str, paths: Sequence[Path], docs_root: Path = Path(".")
+    ) -> dict[Path, str]:
+        """Map each of ``paths`` present in ``commit`` to its blob id.
+
+        Paths missing from the commit (deleted files) are left out.
+        """
+
+        if not paths:
+            return {}
+        wanted = {path.as_posix() for path in paths}
+        scope = [] if docs_root in (Path("."), Path("")) else ["--", docs_root.as_posix()]
+        listing = repo.git.ls_tree("-r", "-z", "--full-tree", commit, *scope)
+        blobs: dict[Path, str] = {}
+        for record in listing.split("\0"):
+            meta, _, name = record.partition("\t")
+            parts = meta.split()
+            if len(parts) == 3 and parts[1] == "blob" and name in wanted:
+                blobs[Path(name)] = parts[2]
+        return blobs
+
+    def _candidate_paths(
+        self, repo: Repo, last_commit: str | None, revision: str | None = None
+    ) -> list[Path]:
+        if last_commit:
+            diff = repo.git.diff(f"{last_commit}..{revision or 'HEAD'}", "--name-only")
             return [Path(line.strip()) for line in diff.splitlines() if line.strip()]
 
-        files = repo.git.ls_files()
+        if revision is not None:
+            files = repo.git.ls_tree("-r", "--name-only", "--full-tree", revision)
+        else:
+            files = repo.git.ls_files()
         return [Path(line.strip()) for line in files.splitlines() if line.strip()]
 
     def _is_translatable(self, path: Path, docs_root: Path) -> bool:
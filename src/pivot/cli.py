@@ -2,6 +2,10 @@
 
 from __future__ import annotations
 
+import asyncio
+import tempfile
+from collections.abc import Awaitable, Callable
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
 
 import typer
@@ -9,11 +13,30 @@ from rich.console import Console
 from rich.table import Table
 
 from pivot import get_version
+from pivot.concurrency import AdaptiveProvider, ConcurrencySnapshot
 from pivot.config import AppConfig, ConfigError, load_config
-from pivot.pipeline import LocalizationPipeline, RepositoryPlan
+from pivot.glossary import Glossary, GlossaryError
+from pivot.loadtest import LoadTestSettings, run_load_test
+from pivot.maintenance import MaintenanceReport, RepositoryMaintainer
+from pivot.pipeline import LocalizationPipeline, RepositoryPlan, RunReport
+from pivot.planfile import PlanFileError, PlanSelection, PlanSummary, PlanWriter, read_plan
+from pivot.publish import Publisher, PublishError, collect_sources
+from pivot.repository import RepositoryError, RepositoryManager
+from pivot.standin import LATENCY_DISTRIBUTIONS, StandinServer, StandinSettings
+from pivot.state import StateStore
+from pivot.translation import (
+    GlossaryProvider,
+    TranslationError,
+    TranslationProvider,
+    create_provider,
+)
+from pivot.translation_memory import MemoryProvider, TranslationMemory
 
 console = Console()
 
+# Plans with more pending files than this are summarized instead of listed.
+MAX_LISTED_FILES = 50
+
 app = typer.Typer(
     add_completion=False,
     no_args_is_help=True,
@@ -29,7 +52,8 @@ def _print_config_summary(config: AppConfig) -> None:
     table.add_column("文档路径", style="yellow")
 
     for repo in config.repositories:
-        table.add_row(repo.name, repo.url, repo.branch, str(repo.docs_path))
+        branches = ", ".join(repo.tracked_branches)
+        table.add_row(repo.name, repo.url, branches, str(repo.docs_path))
 
     console.print(table)
     console.print(f"状态缓存目录: [bold]{config.work_dir}[/bold]")
@@ -38,10 +62,15 @@ def _print_config_summary(config: AppConfig) -> None:
 
 def _print_repository_plan(plan: RepositoryPlan) -> None:
     console.rule(f"仓库 [bold]{plan.config.name}[/bold]")
-    console.print(f"分支: [cyan]{plan.config.branch}[/cyan]")
-    console.print(f"工作副本: [magenta]{plan.repo.working_tree_dir}[/magenta]")
+    console.print(f"分支: [cyan]{plan.branch or plan.config.branch}[/cyan]")
+    console.print(f"工作副本: [magenta]{plan.repository.path}[/magenta]")
 
-    if plan.pending_files:
+    if len(plan.pending_files) > MAX_LISTED_FILES:
+        console.print(
+            f"检测到 [yellow]{len(plan.pending_files)}[/yellow] 个待翻译文件"
+            "（文件过多，仅显示摘要；可用 pivot plan --output 导出完整计划）。"
+        )
+    elif plan.pending_files:
         console.print(
             f"检测到 [yellow]{len(plan.pending_files)}[/yellow] 个待翻译文件："
         )
@@ -51,6 +80,195 @@ def _print_repository_plan(plan: RepositoryPlan) -> None:
         console.print("[green]没有检测到需要翻译的文档。[/green]")
 
 
+def _print_plan_summary(summary: PlanSummary, title: str) -> None:
+    table = Table(title=title)
+    table.add_column("指标", style="cyan")
+    table.add_column("数值", style="magenta", justify="right")
+    table.add_row("仓库计划", str(summary.repositories))
+    table.add_row("待翻译文件", str(summary.files))
+    table.add_row("文档大小", _format_mib(summary.bytes))
+    console.print(table)
+
+
+def _print_run_report(report: RunReport) -> None:
+    table = Table(title="翻译执行结果")
+    table.add_column("指标", style="cyan")
+    table.add_column("数值", style="magenta", justify="right")
+    table.add_row("仓库数", str(report.repositories))
+    table.add_row("写出文件", str(report.files_written))
+    table.add_row("移除文件", str(report.files_removed))
+    table.add_row("翻译片段", str(report.segments))
+    table.add_row("解析缓存命中", f"{report.parse_cache_hits} / {report.documents_segmented}")
+    table.add_row("请求片段", str(report.dedup.requested))
+    table.add_row("实际调用", str(report.provider_calls))
+    table.add_row("去重比例", f"{report.dedup.ratio:.1%}")
+    if report.memory is not None:
+        table.add_row("记忆库精确命中", str(report.memory.exact))
+        table.add_row(
+            "模糊匹配 / 补丁复用", f"{report.memory.fuzzy_matches} / {report.memory.patched}"
+        )
+        table.add_row("模糊复用比例", f"{report.memory.fuzzy_ratio:.1%}")
+    console.print(table)
+
+    if report.concurrency is not None:
+        _print_concurrency(report.concurrency)
+
+    for failure in report.failures:
+        console.print(f"[red]翻译失败：{failure}[/red]")
+
+
+def _print_concurrency(snapshot: ConcurrencySnapshot) -> None:
+    table = Table(title="自适应并发控制")
+    table.add_column("指标", style="cyan")
+    table.add_column("数值", style="magenta", justify="right")
+    table.add_row("当前并发上限", f"{snapshot.limit:g}")
+    table.add_row("峰值并发", str(snapshot.peak_in_flight))
+    table.add_row("请求次数", str(snapshot.requests))
+    table.add_row("限流 (429)", str(snapshot.throttled))
+    table.add_row("服务端错误", str(snapshot.server_errors))
+    table.add_row("重试次数", str(snapshot.retries))
+    table.add_row("上调 / 下调", f"{snapshot.increases} / {snapshot.decreases}")
+    table.add_row("延迟 p50", _format_seconds(snapshot.latency_p50))
+    table.add_row("延迟 p99", _format_seconds(snapshot.latency_p99))
+    console.print(table)
+
+
+def _print_maintenance(reports: list[MaintenanceReport]) -> None:
+    ran = [report for report in reports if report.ran]
+    if not ran:
+        console.print(f"[green]{len(reports)} 个仓库均无需维护。[/green]")
+        return
+    table = Table(title="仓库维护")
+    table.add_column("仓库", style="cyan")
+    table.add_column("原因")
+    table.add_column("pack 数", justify="right")
+    table.add_column("松散对象", justify="right")
+    table.add_column("维护耗时", justify="right")
+    table.add_column("查询耗时", justify="right", style="magenta")
+    for report in ran:
+        after = report.after
+        table.add_row(
+            report.name,
+            report.reason or "-",
+            f"{report.before.packs} → {after.packs if after else '-'}",
+            f"{report.before.loose_objects} → {after.loose_objects if after else '-'}",
+            _format_seconds(report.seconds),
+            f"{_format_seconds(report.probe_before)} → {_format_seconds(report.probe_after)}",
+        )
+    console.print(table)
+    for report in ran:
+        if report.error:
+            console.print(f"[yellow]维护 {report.name} 未完成：{report.error}[/yellow]")
+
+
+def _format_seconds(value: float | None) -> str:
+    return "-" if value is None else f"{value * 1000:.0f} ms"
+
+
+def _format_mib(value: int | None) -> str:
+    return "-" if value is None else f"{value / 1024 / 1024:.1f} MiB"
+
+
+async def _translate(
+    app_config: AppConfig,
+    runner: Callable[[TranslationProvider], Awaitable[RunReport]],
+) -> RunReport:
+    provider = create_provider(app_config.translation)
+    adaptive = AdaptiveProvider(provider, app_config.translation)
+    translator: TranslationProvider = adaptive
+    glossary_digest = ""
+    if app_config.glossary is not None:
+        glossary = Glossary.load(app_config.glossary, app_config.work_dir / "cache" / "glossary")
+        glossary_digest = glossary.digest
+        translator = GlossaryProvider(adaptive, glossary)
+    memory: MemoryProvider | None = None
+    if app_config.translation_memory is not None:
+        settings = app_config.translation_memory
+        memory = MemoryProvider(
+            translator,
+            TranslationMemory(
+                settings.path or app_config.work_dir / "cache" / "memory.sqlite3",
+                threshold=settings.similarity_threshold,
+                max_candidates=settings.max_candidates,
+                glossary_digest=glossary_digest,
+            ),
+        )
+        translator = memory
+    try:
+        report = await runner(translator)
+    finally:
+        await provider.aclose()
+        if memory is not None:
+            memory.memory.close()
+    report.concurrency = adaptive.snapshot()
+    report.memory = memory.stats if memory is not None else None
+    return report
+
+
+def _run_translation_or_exit(
+    app_config: AppConfig,
+    runner: Callable[[TranslationProvider], Awaitable[RunReport]],
+) -> None:
+    try:
+        report = asyncio.run(_translate(app_config, runner))
+    except (TranslationError, GlossaryError) as exc:
+        console.print(f"[red]翻译执行失败：{exc}[/red]")
+        raise typer.Exit(code=1) from exc
+    except RuntimeError as exc:  # pragma: no cover - 具体异常依运行环境而定
+        console.print(f"[red]流水线执行失败：{exc}[/red]")
+        raise typer.Exit(code=1) from exc
+
+    _print_run_report(report)
+    if not report.succeeded:
+        raise typer.Exit(code=1)
+
+
+def _maintainer(app_config: AppConfig, manager: RepositoryManager) -> RepositoryMaintainer:
+    return RepositoryMaintainer(
+        manager, app_config.maintenance, app_config.work_dir / "state" / "maintenance.json"
+    )
+
+
+def _finish_run(app_config: AppConfig, pipeline: LocalizationPipeline, *, publish: bool) -> None:
+    """Publish output while due repositories are maintained in the background."""
+
+    maintenance: Future[list[MaintenanceReport]] | None = None
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="pivot-maintenance") as executor:
+        if app_config.maintenance.enabled:
+            maintainer = _maintainer(app_config, pipeline.repository_manager)
+            maintenance = executor.submit(maintainer.run, app_config.repositories)
+        if publish:
+            _publish_if_configured(app_config, pipeline.state_store)
+    if maintenance is None:
+        return
+    try:
+        _print_maintenance(maintenance.result())
+    except RepositoryError as exc:  # pragma: no cover - 具体异常依运行环境而定
+        console.print(f"[yellow]仓库维护失败：{exc}[/yellow]")
+
+
+def _publish_if_configured(app_config: AppConfig, state_store: StateStore) -> None:
+    if app_config.publish is None:
+        return
+    publisher = Publisher(app_config.publish)
+    sources = collect_sources(app_config.repositories, state_store)
+    try:
+        result = publisher.publish(app_config.output_dir, sources)
+    except PublishError as exc:
+        console.print(f"[red]发布失败：{exc}[/red]")
+        raise typer.Exit(code=1) from exc
+
+    target = f"{app_config.publish.repository} ({app_config.publish.branch})"
+    if not result.changed:
+        console.print(f"[yellow]译文无变化，未向 {target} 提交。[/yellow]")
+        return
+    console.print(
+        f"[green]已发布到 {target}: {result.commit}[/green] "
+        f"新增对象 {result.written}，复用 {result.reused}，"
+        f"未变 {result.unchanged}，删除 {result.deleted}"
+    )
+
+
 def _load_or_exit(config_path: Path | None) -> AppConfig:
     try:
         config = load_config(config_path)
@@ -116,17 +334,37 @@ def run(  # noqa: D401
     dry_run: bool = typer.Option(  # noqa: FBT001
         True,
         "--dry-run/--execute",
-        help="默认只演示流程，不执行实际的翻译调度。",
+        help="默认只列出待翻译文件；使用 --execute 执行翻译并写出译文。",
+    ),
+    stream: bool = typer.Option(  # noqa: FBT001
+        False,
+        "--stream",
+        help="流式执行：仓库同步完成即开始翻译，各阶段以有界队列衔接（需配合 --execute）。",
     ),
 ) -> None:
-    """运行翻译流水线（当前为占位实现）。"""
+    """运行翻译流水线。"""
 
     app_config = _load_or_exit(config)
     app_config.ensure_directories()
     console.print("[green]配置加载成功，目录已就绪。[/green]")
     _print_config_summary(app_config)
 
-    pipeline = LocalizationPipeline(app_config.work_dir)
+    pipeline = LocalizationPipeline(
+        app_config.work_dir,
+        shared_objects=app_config.shared_object_store,
+        max_open_repositories=app_config.max_open_repositories,
+        parse_cache_bytes=app_config.parse_cache_max_bytes,
+    )
+    if stream and not dry_run:
+        _run_translation_or_exit(
+            app_config,
+            lambda translator: pipeline.stream(
+                app_config.repositories, translator, app_config.output_dir
+            ),
+        )
+        _finish_run(app_config, pipeline, publish=True)
+        return
+
     try:
         plans = pipeline.collect(app_config.repositories)
     except RuntimeError as exc:  # pragma: no cover - 具体异常依运行环境而定
@@ -138,10 +376,367 @@ def run(  # noqa: D401
 
     if dry_run:
         console.print(
-            "[yellow]当前处于 dry-run 模式。翻译流水线的执行阶段仍在开发中。[/yellow]"
+            "[yellow]当前处于 dry-run 模式，未执行翻译。使用 --execute 执行翻译。[/yellow]"
+        )
+        return
+
+    _run_translation_or_exit(
+        app_config,
+        lambda translator: pipeline.execute(plans, translator, app_config.output_dir),
+    )
+    _finish_run(app_config, pipeline, publish=True)
+
+
+@app.command()
+def publish(  # noqa: D401
+    config: Path | None = typer.Option(  # noqa: FBT001
+        None,
+        "--config",
+        "-c",
+        exists=True,
+        file_okay=True,
+        dir_okay=False,
+        readable=True,
+        resolve_path=True,
+        help="指定配置文件路径",
+    ),
+) -> None:
+    """将译文输出目录提交到配置的发布仓库。"""
+
+    app_config = _load_or_exit(config)
+    if app_config.publish is None:
+        console.print("[red]配置中缺少 publish 段，无法发布。[/red]")
+        raise typer.Exit(code=1)
+    app_config.ensure_directories()
+    state_store = StateStore(app_config.work_dir / "state" / "repositories.json")
+    _publish_if_configured(app_config, state_store)
+
+
+@app.command()
+def plan(  # noqa: D401
+    output: Path = typer.Option(  # noqa: FBT001
+        ...,
+        "--output",
+        "-o",
+        dir_okay=False,
+        writable=True,
+        resolve_path=True,
+        help="计划文件（JSON Lines）的写出路径",
+    ),
+    config: Path | None = typer.Option(  # noqa: FBT001
+        None,
+        "--config",
+        "-c",
+        exists=True,
+        file_okay=True,
+        dir_okay=False,
+        readable=True,
+        resolve_path=True,
+        help="指定配置文件路径",
+    ),
+) -> None:
+    """同步仓库并把待翻译文件导出为计划文件，不执行翻译。"""
+
+    app_config = _load_or_exit(config)
+    app_config.ensure_directories()
+    pipeline = LocalizationPipeline(
+        app_config.work_dir,
+        shared_objects=app_config.shared_object_store,
+        max_open_repositories=app_config.max_open_repositories,
+        parse_cache_bytes=0,
+    )
+    output.parent.mkdir(parents=True, exist_ok=True)
+    partial = output.with_name(output.name + ".partial")
+    try:
+        with partial.open("w", encoding="utf-8") as fh:
+            writer = PlanWriter(fh)
+            for repository in app_config.repositories:
+                for repository_plan in pipeline.plan_repository(repository):
+                    writer.write(repository_plan, pipeline.blob_sizes(repository_plan))
+                    console.print(
+                        f"{repository_plan.label}: "
+                        f"[yellow]{len(repository_plan.pending_files)}[/yellow] 个待翻译文件"
+                    )
+        partial.replace(output)
+    except (RuntimeError, OSError) as exc:  # pragma: no cover - 具体异常依运行环境而定
+        partial.unlink(missing_ok=True)
+        console.print(f"[red]生成计划失败：{exc}[/red]")
+        raise typer.Exit(code=1) from exc
+    _print_plan_summary(writer.summary, f"计划已写入 {output}")
+
+
+@app.command()
+def execute(  # noqa: D401
+    plan_file: Path = typer.Argument(  # noqa: FBT001
+        ...,
+        exists=True,
+        dir_okay=False,
+        readable=True,
+        resolve_path=True,
+        help="由 pivot plan 生成的计划文件",
+    ),
+    config: Path | None = typer.Option(  # noqa: FBT001
+        None,
+        "--config",
+        "-c",
+        exists=True,
+        file_okay=True,
+        dir_okay=False,
+        readable=True,
+        resolve_path=True,
+        help="指定配置文件路径",
+    ),
+    lines: str | None = typer.Option(  # noqa: FBT001
+        None,
+        "--lines",
+        help="只执行第 START:END 个文件记录（从 0 开始，左闭右开）。",
+    ),
+    shard: str | None = typer.Option(  # noqa: FBT001
+        None,
+        "--shard",
+        help="按 blob 哈希分片，只执行第 K/N 片（K 从 0 开始）。",
+    ),
+    record_only: bool = typer.Option(  # noqa: FBT001
+        False,
+        "--record-only",
+        help="不翻译，仅把计划中的提交记录为已处理（各分片均成功后使用）。",
+    ),
+) -> None:
+    """执行计划文件（或其中一部分）中的翻译。"""
+
+    selection = _parse_selection(lines, shard)
+    if record_only and not selection.everything:
+        console.print("[red]--record-only 不能与 --lines / --shard 同时使用。[/red]")
+        raise typer.Exit(code=1)
+    app_config = _load_or_exit(config)
+    app_config.ensure_directories()
+    pipeline = LocalizationPipeline(
+        app_config.work_dir,
+        shared_objects=app_config.shared_object_store,
+        max_open_repositories=app_config.max_open_repositories,
+        parse_cache_bytes=app_config.parse_cache_max_bytes,
+    )
+    manager = pipeline.repository_manager
+    configs = {repository.name: repository for repository in app_config.repositories}
+    try:
+        with plan_file.open("r", encoding="utf-8") as fh:
+            plans, summary = read_plan(fh, configs, manager.reference, selection)
+    except (PlanFileError, OSError) as exc:
+        console.print(f"[red]读取计划失败：{exc}[/red]")
+        raise typer.Exit(code=1) from exc
+    _print_plan_summary(summary, f"计划 {plan_file.name}")
+
+    if record_only:
+        _refuse_stale_plans(pipeline, plans)
+        pipeline.mark_all_processed(plans)
+        console.print(f"[green]已记录 {len(plans)} 个仓库计划为已处理。[/green]")
+        return
+
+    try:
+        for name in dict.fromkeys(p.config.name for p in plans if p.pending_files):
+            manager.sync(configs[name])
+    except RuntimeError as exc:  # pragma: no cover - 具体异常依运行环境而定
+        console.print(f"[red]同步仓库失败：{exc}[/red]")
+        raise typer.Exit(code=1) from exc
+    _refuse_stale_plans(pipeline, plans)
+
+    _run_translation_or_exit(
+        app_config,
+        lambda translator: pipeline.execute(plans, translator, app_config.output_dir),
+    )
+    # A shard only holds part of the output, so it must not be published.
+    _finish_run(app_config, pipeline, publish=selection.everything)
+
+
+def _refuse_stale_plans(pipeline: LocalizationPipeline, plans: list[RepositoryPlan]) -> None:
+    # Only complete plans are recorded, so only they can move a sync pointer.
+    try:
+        stale = [plan.label for plan in plans if not plan.partial and not pipeline.is_current(plan)]
+    except RepositoryError as exc:
+        console.print(f"[red]检查计划失败：{exc}[/red]")
+        raise typer.Exit(code=1) from exc
+    if stale:
+        console.print(
+            f"[red]计划已过期，同步指针已不在其起始提交上：{', '.join(stale)}。"
+            "请重新运行 pivot plan。[/red]"
+        )
+        raise typer.Exit(code=1)
+
+
+def _parse_selection(lines: str | None, shard: str | None) -> PlanSelection:
+    try:
+        start, stop = 0, None
+        if lines is not None:
+            first, sep, last = lines.partition(":")
+            if not sep:
+                raise ValueError(lines)
+            start = int(first) if first else 0
+            stop = int(last) if last else None
+        index, shards = 0, 1
+        if shard is not None:
+            first, sep, last = shard.partition("/")
+            if not sep:
+                raise ValueError(shard)
+            index, shards = int(first), int(last)
+        return PlanSelection(start=start, stop=stop, shard=index, shards=shards)
+    except ValueError as exc:
+        raise typer.BadParameter(f"无效的选择范围: {exc}") from exc
+
+
+@app.command()
+def maintain(  # noqa: D401
+    config: Path | None = typer.Option(  # noqa: FBT001
+        None,
+        "--config",
+        "-c",
+        exists=True,
+        file_okay=True,
+        dir_okay=False,
+        readable=True,
+        resolve_path=True,
+        help="指定配置文件路径",
+    ),
+    force: bool = typer.Option(  # noqa: FBT001
+        False,
+        "--force",
+        help="忽略调度阈值，维护所有已克隆的仓库。",
+    ),
+) -> None:
+    """对缓存的仓库执行 git 维护（commit-graph、增量 repack、prune）。"""
+
+    app_config = _load_or_exit(config)
+    app_config.ensure_directories()
+    manager = RepositoryManager(
+        app_config.work_dir / "repositories", shared_objects=app_config.shared_object_store
+    )
+    try:
+        reports = _maintainer(app_config, manager).run(app_config.repositories, force=force)
+    except RepositoryError as exc:
+        console.print(f"[red]仓库维护失败：{exc}[/red]")
+        raise typer.Exit(code=1) from exc
+    finally:
+        manager.handles.close()
+    _print_maintenance(reports)
+
+
+@app.command()
+def standin(  # noqa: D401
+    host: str = typer.Option("127.0.0.1", "--host", help="监听地址"),
+    port: int = typer.Option(8089, "--port", help="监听端口"),
+    latency: str = typer.Option(
+        "lognormal", "--latency", help=f"延迟分布：{', '.join(LATENCY_DISTRIBUTIONS)}"
+    ),
+    latency_ms: float = typer.Option(50.0, "--latency-ms", help="延迟中位数/均值（毫秒）"),
+    latency_spread: float = typer.Option(0.5, "--latency-spread", help="延迟离散程度"),
+    error_rate: float = typer.Option(0.0, "--error-rate", help="注入 5xx 错误的比例"),
+    rate_limit_rate: float = typer.Option(0.0, "--rate-limit-rate", help="注入 429 的比例"),
+    retry_after: float = typer.Option(1.0, "--retry-after", help="429 响应的 Retry-After 秒数"),
+    seed: int = typer.Option(0, "--seed", help="随机种子"),
+) -> None:
+    """启动本地翻译服务替身（OpenAI 兼容接口），供压测使用。"""
+
+    settings = _standin_settings_or_exit(
+        latency, latency_ms, latency_spread, error_rate, rate_limit_rate, retry_after, seed
+    )
+    server = StandinServer(settings, host=host, port=port)
+    console.print(f"翻译服务替身已启动：[bold]{server.base_url}[/bold]（Ctrl+C 退出）")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:  # pragma: no cover - interactive
+        console.print("已停止。")
+
+
+@app.command()
+def loadtest(  # noqa: D401
+    repositories: int = typer.Option(3, "--repos", min=1, help="合成仓库数量"),
+    files: int = typer.Option(50, "--files", min=1, help="每个仓库的文档数量"),
+    segments: int = typer.Option(20, "--segments", min=1, help="每个文档的片段数量"),
+    shared_fraction: float = typer.Option(0.2, "--shared-fraction", help="重复片段比例"),
+    stream: bool = typer.Option(  # noqa: FBT001
+        True, "--stream/--batch", help="使用流式或批量执行模式"
+    ),
+    initial_concurrency: int = typer.Option(8, "--initial-concurrency", min=1),
+    max_concurrency: int = typer.Option(64, "--max-concurrency", min=1),
+    latency: str = typer.Option(
+        "lognormal", "--latency", help=f"延迟分布：{', '.join(LATENCY_DISTRIBUTIONS)}"
+    ),
+    latency_ms: float = typer.Option(50.0, "--latency-ms", help="延迟中位数/均值（毫秒）"),
+    latency_spread: float = typer.Option(0.5, "--latency-spread", help="延迟离散程度"),
+    error_rate: float = typer.Option(0.0, "--error-rate", help="注入 5xx 错误的比例"),
+    rate_limit_rate: float = typer.Option(0.0, "--rate-limit-rate", help="注入 429 的比例"),
+    retry_after: float = typer.Option(1.0, "--retry-after", help="429 响应的 Retry-After 秒数"),
+    seed: int = typer.Option(0, "--seed", help="随机种子"),
+    work_dir: Path | None = typer.Option(  # noqa: FBT001
+        None,
+        "--work-dir",
+        file_okay=False,
+        resolve_path=True,
+        help="保留压测数据的目录（默认使用临时目录）",
+    ),
+) -> None:
+    """对合成仓库运行端到端压测并报告吞吐、延迟与内存峰值。"""
+
+    settings = LoadTestSettings(
+        repositories=repositories,
+        files_per_repository=files,
+        segments_per_file=segments,
+        shared_fraction=shared_fraction,
+        stream=stream,
+        initial_concurrency=initial_concurrency,
+        max_concurrency=max(initial_concurrency, max_concurrency),
+        seed=seed,
+        standin=_standin_settings_or_exit(
+            latency, latency_ms, latency_spread, error_rate, rate_limit_rate, retry_after, seed
+        ),
+    )
+    if work_dir is not None:
+        work_dir.mkdir(parents=True, exist_ok=True)
+        result = run_load_test(work_dir, settings)
+    else:
+        with tempfile.TemporaryDirectory(prefix="pivot-loadtest-") as tmp:
+            result = run_load_test(Path(tmp), settings)
+
+    table = Table(title="压测结果")
+    table.add_column("指标", style="cyan")
+    table.add_column("数值", style="magenta", justify="right")
+    table.add_row("耗时", f"{result.elapsed_seconds:.2f} s")
+    table.add_row("文件", str(result.report.files_written))
+    table.add_row("片段", str(result.report.segments))
+    table.add_row("文件/秒", f"{result.files_per_second:.1f}")
+    table.add_row("片段/秒", f"{result.segments_per_second:.1f}")
+    table.add_row("延迟 p50", _format_seconds(result.concurrency.latency_p50))
+    table.add_row("延迟 p99", _format_seconds(result.concurrency.latency_p99))
+    table.add_row("内存基线 (RSS)", _format_mib(result.baseline_rss_bytes))
+    table.add_row("内存峰值 (RSS)", _format_mib(result.peak_rss_bytes))
+    table.add_row("流水线内存增量", _format_mib(result.pipeline_rss_bytes))
+    console.print(table)
+    _print_run_report(result.report)
+    if not result.report.succeeded:
+        raise typer.Exit(code=1)
+
+
+def _standin_settings_or_exit(
+    latency: str,
+    latency_ms: float,
+    latency_spread: float,
+    error_rate: float,
+    rate_limit_rate: float,
+    retry_after: float,
+    seed: int,
+) -> StandinSettings:
+    try:
+        return StandinSettings(
+            latency=latency,
+            latency_ms=latency_ms,
+            latency_spread=latency_spread,
+            error_rate=error_rate,
+            rate_limit_rate=rate_limit_rate,
+            retry_after_seconds=retry_after,
+            seed=seed,
         )
-    else:  # pragma: no cover - 流水线待实现
-        console.print("[red]执行模式尚未实现，暂不进行实际翻译。[/red]")
+    except ValueError as exc:
+        console.print(f"[red]参数无效：{exc}[/red]")
+        raise typer.Exit(code=2) from exc
 
 
 def main() -> None:  # pragma: no cover - 控制台入口
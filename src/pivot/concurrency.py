@@ -0,0 +1,313 @@
+"""Adaptive (AIMD) concurrency control and rate limiting for provider requests."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import deque
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from pivot.config import TranslationProviderConfig
+from pivot.translation import (
+    ProviderUnavailableError,
+    RateLimitError,
+    TranslationProvider,
+)
+
+Clock = Callable[[], float]
+
+DEFAULT_BACKOFF_FACTOR = 0.5
+SPIKE_FACTOR = 2.5
+SPIKE_WARMUP_SAMPLES = 20
+LATENCY_SAMPLE_SIZE = 10_000
+RETRY_BASE_DELAY = 0.5
+RETRY_MAX_DELAY = 30.0
+CHARS_PER_TOKEN = 4
+
+
+@dataclass(slots=True)
+class ConcurrencySnapshot:
+    """Point-in-time view of the controller for run metrics."""
+
+    limit: float
+    in_flight: int
+    peak_in_flight: int
+    requests: int
+    successes: int
+    throttled: int
+    server_errors: int
+    retries: int
+    increases: int
+    decreases: int
+    latency_p50: float | None
+    latency_p99: float | None
+
+
+class AdaptiveConcurrencyLimiter:
+    """Additive-increase/multiplicative-decrease limit on in-flight requests.
+
+    Each healthy completion raises the limit by ``1 / limit`` (about one slot per
+    round trip); a 429, 5xx or latency spike multiplies it by ``backoff`` at most
+    once per cooldown so a single burst of failures causes a single cut.
+    ``Retry-After`` pauses all new acquisitions until the given time.
+    """
+
+    def __init__(
+        self,
+        *,
+        initial: int,
+        minimum: int = 1,
+        maximum: int = 32,
+        backoff: float = DEFAULT_BACKOFF_FACTOR,
+        latency_target: float | None = None,
+        clock: Clock = time.monotonic,
+    ) -> None:
+        self._limit = float(initial)
+        self._minimum = float(minimum)
+        self._maximum = float(maximum)
+        self._backoff = backoff
+        self._latency_target = latency_target
+        self._clock = clock
+        self._condition = asyncio.Condition()
+        self._in_flight = 0
+        self._peak_in_flight = 0
+        self._resume_at = 0.0
+        self._last_decrease = float("-inf")
+        self._ewma: float | None = None
+        self._samples = 0
+        self._latencies: deque[float] = deque(maxlen=LATENCY_SAMPLE_SIZE)
+        self.requests = 0
+        self.successes = 0
+        self.throttled = 0
+        self.server_errors = 0
+        self.retries = 0
+        self.increases = 0
+        self.decreases = 0
+
+    @property
+    def limit(self) -> float:
+        return self._limit
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    async def acquire(self) -> None:
+        """Wait for a free slot under the current limit and any Retry-After pause."""
+
+        while True:
+            delay = self._resume_at - self._clock()
+            if delay > 0:
+                await asyncio.sleep(delay)
+                continue
+            async with self._condition:
+                if self._in_flight < max(1, int(self._limit)):
+                    self._in_flight += 1
+                    self._peak_in_flight = max(self._peak_in_flight, self._in_flight)
+                    self.requests += 1
+                    return
+                await self._condition.wait()
+
+    async def release_success(self, latency: float) -> None:
+        """Release a slot after a successful request that took ``latency`` seconds."""
+
+        self.successes += 1
+        self._latencies.append(latency)
+        if self._is_spike(latency):
+            self._decrease()
+        else:
+            self._limit = min(self._maximum, self._limit + 1.0 / self._limit)
+            self.increases += 1
+        self._record_latency(latency)
+        await self._release()
+
+    async def release_throttled(self, retry_after: float | None) -> None:
+        """Release a slot after a 429, honouring ``Retry-After`` when given."""
+
+        self.throttled += 1
+        if retry_after is not None and retry_after > 0:
+            self._resume_at = max(self._resume_at, self._clock() + retry_after)
+        self._decrease()
+        await self._release()
+
+    async def release_unavailable(self) -> None:
+        """Release a slot after a transient server-side failure."""
+
+        self.server_errors += 1
+        self._decrease()
+        await self._release()
+
+    async def release(self) -> None:
+        """Release a slot without adjusting the limit (e.g. a client-side error)."""
+
+        await self._release()
+
+    def snapshot(self) -> ConcurrencySnapshot:
+        ordered = sorted(self._latencies)
+        return ConcurrencySnapshot(
+            limit=round(self._limit, 2),
+            in_flight=self._in_flight,
+            peak_in_flight=self._peak_in_flight,
+            requests=self.requests,
+            successes=self.successes,
+            throttled=self.throttled,
+            server_errors=self.server_errors,
+            retries=self.retries,
+            increases=self.increases,
+            decreases=self.decreases,
+            latency_p50=_percentile(ordered, 0.50),
+            latency_p99=_percentile(ordered, 0.99),
+        )
+
+    def _is_spike(self, latency: float) -> bool:
+        if self._latency_target is not None:
+            return latency > self._latency_target
+        if self._ewma is None or self._samples < SPIKE_WARMUP_SAMPLES:
+            return False
+        return latency > self._ewma * SPIKE_FACTOR
+
+    def _record_latency(self, latency: float) -> None:
+        self._samples += 1
+        if self._ewma is None:
+            self._ewma = latency
+        else:
+            self._ewma = 0.9 * self._ewma + 0.1 * latency
+
+    def _decrease(self) -> None:
+        now = self._clock()
+        cooldown = self._ewma if self._ewma is not None else 1.0
+        if now - self._last_decrease < cooldown:
+            return
+        self._last_decrease = now
+        self._limit = max(self._minimum, self._limit * self._backoff)
+        self.decreases += 1
+
+    async def _release(self) -> None:
+        async with self._condition:
+            self._in_flight -= 1
+            self._condition.notify_all()
+
+
+class TokenBucket:
+    """Continuously refilling bucket enforcing a per-minute budget."""
+
+    def __init__(
+        self,
+        per_minute: float,
+        *,
+        capacity: float | None = None,
+        clock: Clock = time.monotonic,
+    ) -> None:
+        self.rate = per_minute / 60.0
+        self.capacity = capacity if capacity is not None else per_minute
+        self._tokens = self.capacity
+        self._clock = clock
+        self._updated = clock()
+        self._lock = asyncio.Lock()
+
+    async def take(self, amount: float = 1.0) -> None:
+        """Wait until ``amount`` tokens are available and consume them."""
+
+        amount = min(amount, self.capacity)
+        async with self._lock:
+            while True:
+                now = self._clock()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= amount:
+                    self._tokens -= amount
+                    return
+                await asyncio.sleep((amount - self._tokens) / self.rate)
+
+
+class AdaptiveProvider:
+    """Wrap a provider with AIMD concurrency control, rate caps and retries."""
+
+    def __init__(
+        self,
+        inner: TranslationProvider,
+        config: TranslationProviderConfig,
+        *,
+        clock: Clock = time.monotonic,
+    ) -> None:
+        self.inner = inner
+        self.max_retries = config.max_retries
+        self.limiter = AdaptiveConcurrencyLimiter(
+            initial=config.initial_concurrency,
+            minimum=config.min_concurrency,
+            maximum=config.max_concurrency,
+            latency_target=config.latency_target_seconds,
+            clock=clock,
+        )
+        self._clock = clock
+        self._requests = (
+            TokenBucket(config.requests_per_minute, clock=clock)
+            if config.requests_per_minute
+            else None
+        )
+        self._tokens = (
+            TokenBucket(config.tokens_per_minute, clock=clock) if config.tokens_per_minute else None
+        )
+
+    async def translate(self, text: str) -> str:
+        attempt = 0
+        while True:
+            if self._requests is not None:
+                await self._requests.take()
+            if self._tokens is not None:
+                await self._tokens.take(estimate_tokens(text))
+
+            await self.limiter.acquire()
+            started = self._clock()
+            try:
+                result = await self.inner.translate(text)
+            except RateLimitError as exc:
+                await self.limiter.release_throttled(exc.retry_after)
+                if attempt >= self.max_retries:
+                    raise
+                if exc.retry_after is None or exc.retry_after <= 0:
+                    # Without a usable Retry-After, back off instead of spinning.
+                    await asyncio.sleep(_retry_delay(attempt))
+            except ProviderUnavailableError:
+                await self.limiter.release_unavailable()
+                if attempt >= self.max_retries:
+                    raise
+                await asyncio.sleep(_retry_delay(attempt))
+            except BaseException:
+                await self.limiter.release()
+                raise
+            else:
+                await self.limiter.release_success(self._clock() - started)
+                return result
+            attempt += 1
+            self.limiter.retries += 1
+
+    def snapshot(self) -> ConcurrencySnapshot:
+        return self.limiter.snapshot()
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough prompt-plus-completion token estimate used for TPM accounting."""
+
+    return max(1, 2 * len(text) // CHARS_PER_TOKEN)
+
+
+def _retry_delay(attempt: int) -> float:
+    return min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * (2**attempt))
+
+
+def _percentile(ordered: list[float], fraction: float) -> float | None:
+    if not ordered:
+        return None
+    index = min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+__all__ = [
+    "AdaptiveConcurrencyLimiter",
+    "AdaptiveProvider",
+    "ConcurrencySnapshot",
+    "TokenBucket",
+    "estimate_tokens",
+]
@@ -52,6 +52,37 @@ class TranslationProviderConfig(BaseModel):
         gt=0,
         description="Request timeout in seconds for translation calls.",
     )
+    target_language: str = Field(
+        default="简体中文",
+        description="Language the documentation is translated into.",
+    )
+    initial_concurrency: int = Field(
+        default=4,
+        ge=1,
+        description="In-flight request limit the adaptive controller starts from.",
+    )
+    min_concurrency: int = Field(default=1, ge=1, description="Lower bound of the limit.")
+    max_concurrency: int = Field(default=32, ge=1, description="Upper bound of the limit.")
+    latency_target_seconds: float | None = Field(
+        default=None,
+        gt=0,
+        description="Latency above which the limit is cut; defaults to a spike heuristic.",
+    )
+    requests_per_minute: int | None = Field(
+        default=None,
+        gt=0,
+        description="Provider RPM cap enforced with a token bucket.",
+    )
+    tokens_per_minute: int | None = Field(
+        default=None,
+        gt=0,
+        description="Provider TPM cap enforced with a token bucket.",
+    )
+    max_retries: int = Field(
+        default=5,
+        ge=0,
+        description="Retries for rate-limited or temporarily unavailable requests.",
+    )
 
     @model_validator(mode="after")
     def _check_api_key_source(self) -> TranslationProviderConfig:
@@ -60,6 +91,16 @@ class TranslationProviderConfig(BaseModel):
             raise ConfigError(msg)
         return self
 
+    @model_validator(mode="after")
+    def _check_concurrency_bounds(self) -> TranslationProviderConfig:
+        if not self.min_concurrency <= self.initial_concurrency <= self.max_concurrency:
+            msg = (
+                "translation 并发配置需满足 "
+                "min_concurrency <= initial_concurrency <= max_concurrency"
+            )
+            raise ConfigError(msg)
+        return self
+
     def resolve_api_key(self) -> SecretStr:
         """Return the API key, preferring inline value then environment variable."""
 
@@ -73,12 +114,64 @@ class TranslationProviderConfig(BaseModel):
         raise ConfigError(msg)
 
 
+class GlossaryConfig(BaseModel):
+    """Settings for terminology protection and consistent term mapping."""
+
+    path: Path = Field(description="Glossary file (YAML or TSV) listing protected/mapped terms.")
+    case_sensitive: bool = Field(
+        default=True,
+        description="Whether glossary terms are matched case-sensitively.",
+    )
+    whole_words: bool = Field(
+        default=True,
+        description="Only match terms on word boundaries for alphanumeric edges.",
+    )
+
+    @field_validator("path", mode="before")
+    @classmethod
+    def _expand_path(cls, value: object) -> Path:
+        raw = Path(str(value)).expanduser()
+        return Path(os.path.expandvars(str(raw)))
+
+
+class TranslationMemoryConfig(BaseModel):
+    """Settings for reusing earlier translations of identical or similar segments."""
+
+    path: Path | None = Field(
+        default=None,
+        description="SQLite database of the memory; defaults to work_dir/cache/memory.sqlite3.",
+    )
+    similarity_threshold: float = Field(
+        default=0.8,
+        gt=0,
+        le=1,
+        description="Minimum shingle Jaccard similarity for a fuzzy match.",
+    )
+    max_candidates: int = Field(
+        default=16,
+        ge=1,
+        description="Most LSH candidates compared exactly per lookup.",
+    )
+
+    @field_validator("path", mode="before")
+    @classmethod
+    def _expand_path(cls, value: object) -> Path | None:
+        if value is None:
+            return None
+        raw = Path(str(value)).expanduser()
+        return Path(os.path.expandvars(str(raw)))
+
+
 class RepositoryConfig(BaseModel):
     """Settings for a repository to monitor and translate."""
 
     name: str = Field(description="Local identifier for the repository.")
     url: str = Field(description="Git clone URL for the repository.")
     branch: str = Field(default="main", description="Default branch to track.")
+    branches: list[str] = Field(
+        default_factory=list,
+        description="Branches translated side by side into per-branch output directories.",
+    )
     docs_path: Path = Field(
         default=Path("."),
         description="Relative path in the repo containing documentation roots.",
@@ -91,6 +184,83 @@ class RepositoryConfig(BaseModel):
             return value
         return Path(str(value))
 
+    @field_validator("branches")
+    @classmethod
+    def _check_branches(cls, value: list[str]) -> list[str]:
+        unique = list(dict.fromkeys(name.strip() for name in value))
+        for name in unique:
+            if not name or name.startswith("/") or ".." in Path(name).parts:
+                raise ConfigError(f"无效的分支名 {name!r}")
+        return unique
+
+    @model_validator(mode="after")
+    def _check_branch_selection(self) -> RepositoryConfig:
+        if self.branches and "branch" in self.model_fields_set:
+            raise ConfigError(f"仓库 {self.name} 不能同时设置 branch 与 branches")
+        return self
+
+    @property
+    def tracked_branches(self) -> list[str]:
+        """Branches to fetch: ``branches`` when configured, else ``branch``."""
+
+        return self.branches or [self.branch]
+
+
+class PublishConfig(BaseModel):
+    """Target repository that translated output is committed to."""
+
+    repository: Path = Field(description="Git repository (bare or not) receiving the output.")
+    branch: str = Field(default="main", description="Branch updated by each publish.")
+    path_prefix: str = Field(
+        default="",
+        description="Directory inside the target repository that mirrors output_dir.",
+    )
+    author_name: str = Field(default="Pivot", description="Committer name.")
+    author_email: str = Field(default="pivot@localhost", description="Committer email.")
+    update_working_tree: bool = Field(
+        default=False,
+        description="Refresh the working tree of a non-bare target after publishing.",
+    )
+
+    @field_validator("repository", mode="before")
+    @classmethod
+    def _expand_path(cls, value: object) -> Path:
+        raw = Path(str(value)).expanduser()
+        return Path(os.path.expandvars(str(raw)))
+
+
+class MaintenanceConfig(BaseModel):
+    """Thresholds that decide when cached clones get git maintenance."""
+
+    enabled: bool = Field(default=True, description="Run maintenance after each pipeline run.")
+    min_interval_hours: float = Field(
+        default=1.0,
+        ge=0,
+        description="Never maintain the same repository more often than this.",
+    )
+    max_interval_hours: float = Field(
+        default=7 * 24.0,
+        gt=0,
+        description="Maintain a repository with any packable state at least this often.",
+    )
+    max_packs: int = Field(default=8, ge=2, description="Pack count that triggers a repack.")
+    max_loose_objects: int = Field(
+        default=1000,
+        ge=1,
+        description="Loose object count that triggers packing them.",
+    )
+    prune_expire: str = Field(
+        default="2.weeks.ago",
+        description="Unreachable loose objects older than this are pruned.",
+    )
+
+    @model_validator(mode="after")
+    def _check_intervals(self) -> MaintenanceConfig:
+        if self.min_interval_hours > self.max_interval_hours:
+            msg = "maintenance.min_interval_hours 不能大于 max_interval_hours"
+            raise ConfigError(msg)
+        return self
+
 
 class AppConfig(BaseModel):
     """Top-level application configuration."""
@@ -99,6 +269,24 @@ class AppConfig(BaseModel):
     output_dir: Path = Field(description="Directory where translated files are emitted.")
     repositories: list[RepositoryConfig] = Field(default_factory=list)
     translation: TranslationProviderConfig
+    glossary: GlossaryConfig | None = None
+    translation_memory: TranslationMemoryConfig | None = None
+    publish: PublishConfig | None = None
+    maintenance: MaintenanceConfig = Field(default_factory=MaintenanceConfig)
+    shared_object_store: bool = Field(
+        default=False,
+        description="Share git objects between repositories through one alternates pool.",
+    )
+    max_open_repositories: int = Field(
+        default=8,
+        ge=1,
+        description="Upper bound on simultaneously open git.Repo handles.",
+    )
+    parse_cache_max_bytes: int = Field(
+        default=256 * 1024 * 1024,
+        ge=0,
+        description="Size budget of the on-disk segment cache; 0 disables it.",
+    )
 
     @field_validator("work_dir", "output_dir", mode="before")
     @classmethod
@@ -178,7 +366,11 @@ def load_config(path: Path | None = None) -> AppConfig:
 __all__ = [
     "AppConfig",
     "ConfigError",
+    "GlossaryConfig",
+    "MaintenanceConfig",
+    "PublishConfig",
     "RepositoryConfig",
+    "TranslationMemoryConfig",
     "TranslationProviderConfig",
     "discover_config_path",
     "load_config",
@@ -0,0 +1,381 @@
+"""Glossary matching, masking and restoration for protected terminology."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from collections import deque
+from collections.abc import Iterable, Mapping, Sequence
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from ruamel.yaml import YAML
+
+from pivot.config import GlossaryConfig
+
+GLOSSARY_FORMAT_VERSION = 1
+PLACEHOLDER_TEMPLATE = "⟦G{index}⟧"
+
+
+class GlossaryError(RuntimeError):
+    """Raised when a glossary cannot be loaded or enforced."""
+
+
+@dataclass(slots=True, frozen=True)
+class GlossaryEntry:
+    """A single glossary term and its mandated rendering."""
+
+    term: str
+    translation: str | None = None
+
+    @property
+    def protected(self) -> bool:
+        """Whether the term must be kept verbatim (do-not-translate)."""
+
+        return self.translation is None
+
+
+@dataclass(slots=True, frozen=True)
+class GlossaryMatch:
+    """A term occurrence located in a text, as a half-open span."""
+
+    start: int
+    end: int
+    entry: GlossaryEntry
+
+
+@dataclass(slots=True)
+class MaskedText:
+    """Text whose glossary terms were replaced by placeholders."""
+
+    text: str
+    placeholders: list[tuple[str, str, GlossaryEntry]]
+
+    @property
+    def has_placeholders(self) -> bool:
+        return bool(self.placeholders)
+
+
+class GlossaryAutomaton:
+    """Aho-Corasick automaton over glossary terms.
+
+    The automaton is built once per glossary and scans a text in time linear in
+    its length plus the number of reported matches, independent of the number
+    of terms.
+    """
+
+    __slots__ = ("_goto", "_fail", "_outputs", "_lengths", "entries", "case_sensitive")
+
+    def __init__(
+        self,
+        goto: list[dict[str, int]],
+        fail: list[int],
+        outputs: list[tuple[int, ...]],
+        entries: Sequence[GlossaryEntry],
+        case_sensitive: bool,
+    ) -> None:
+        self._goto = goto
+        self._fail = fail
+        self._outputs = outputs
+        self.entries = tuple(entries)
+        self._lengths = tuple(len(entry.term) for entry in self.entries)
+        self.case_sensitive = case_sensitive
+
+    @classmethod
+    def build(
+        cls, entries: Sequence[GlossaryEntry], *, case_sensitive: bool = True
+    ) -> GlossaryAutomaton:
+        goto: list[dict[str, int]] = [{}]
+        terminal: list[list[int]] = [[]]
+
+        for index, entry in enumerate(entries):
+            node = 0
+            for char in _fold(entry.term, case_sensitive):
+                nxt = goto[node].get(char)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[node][char] = nxt
+                    goto.append({})
+                    terminal.append([])
+                node = nxt
+            terminal[node].append(index)
+
+        fail = [0] * len(goto)
+        outputs: list[tuple[int, ...]] = [()] * len(goto)
+        outputs[0] = tuple(terminal[0])
+        queue: deque[int] = deque()
+        for child in goto[0].values():
+            outputs[child] = tuple(terminal[child])
+            queue.append(child)
+
+        while queue:
+            node = queue.popleft()
+            for char, child in goto[node].items():
+                queue.append(child)
+                state = fail[node]
+                while char not in goto[state] and state:
+                    state = fail[state]
+                target = goto[state].get(char, 0)
+                fail[child] = target
+                outputs[child] = tuple(terminal[child]) + outputs[fail[child]]
+
+        return cls(goto, fail, outputs, entries, case_sensitive)
+
+    def iter_matches(self, text: str) -> Iterable[tuple[int, int, int]]:
+        """Yield ``(start, end, entry_index)`` for every (overlapping) occurrence."""
+
+        goto = self._goto
+        fail = self._fail
+        outputs = self._outputs
+        lengths = self._lengths
+        node = 0
+        for position, char in enumerate(_fold(text, self.case_sensitive)):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            for index in outputs[node]:
+                end = position + 1
+                yield end - lengths[index], end, index
+
+    def to_bytes(self, digest: str = "") -> bytes:
+        """Serialize the goto/fail/output tables as plain JSON data."""
+
+        payload = {
+            "version": GLOSSARY_FORMAT_VERSION,
+            "digest": digest,
+            "goto": self._goto,
+            "fail": self._fail,
+            "outputs": self._outputs,
+            "entries": [[entry.term, entry.translation] for entry in self.entries],
+            "case_sensitive": self.case_sensitive,
+        }
+        return json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    @classmethod
+    def from_bytes(cls, data: bytes, digest: str = "") -> GlossaryAutomaton:
+        """Load tables written by :meth:`to_bytes`, checking version and digest."""
+
+        try:
+            payload = json.loads(data)
+            version = payload["version"]
+            if version != GLOSSARY_FORMAT_VERSION:
+                raise GlossaryError(f"不支持的术语表缓存版本: {version}")
+            if payload["digest"] != digest:
+                raise GlossaryError("术语表缓存摘要不匹配")
+            goto = [{str(k): int(v) for k, v in row.items()} for row in payload["goto"]]
+            fail = [int(state) for state in payload["fail"]]
+            outputs = [tuple(int(i) for i in row) for row in payload["outputs"]]
+            entries = [
+                GlossaryEntry(str(term), None if translation is None else str(translation))
+                for term, translation in payload["entries"]
+            ]
+            case_sensitive = bool(payload["case_sensitive"])
+        except (ValueError, KeyError, TypeError, AttributeError) as exc:
+            raise GlossaryError(f"术语表缓存已损坏: {exc}") from exc
+        return cls(goto, fail, outputs, entries, case_sensitive)
+
+
+class Glossary:
+    """Locate glossary terms in segments and mask/restore them around translation.
+
+    ``digest`` identifies the glossary file a loaded glossary was built from.
+    """
+
+    def __init__(
+        self, automaton: GlossaryAutomaton, *, whole_words: bool = True, digest: str = ""
+    ) -> None:
+        self.automaton = automaton
+        self.whole_words = whole_words
+        self.digest = digest
+
+    @classmethod
+    def from_entries(
+        cls,
+        entries: Sequence[GlossaryEntry],
+        *,
+        case_sensitive: bool = True,
+        whole_words: bool = True,
+    ) -> Glossary:
+        automaton = GlossaryAutomaton.build(entries, case_sensitive=case_sensitive)
+        return cls(automaton, whole_words=whole_words)
+
+    @classmethod
+    def load(cls, config: GlossaryConfig, cache_dir: Path | None = None) -> Glossary:
+        """Load a glossary, reusing a compiled automaton cached under ``cache_dir``."""
+
+        try:
+            raw = config.path.read_bytes()
+        except OSError as exc:
+            raise GlossaryError(f"读取术语表 {config.path} 失败: {exc}") from exc
+
+        cache_file: Path | None = None
+        digest = glossary_digest(raw, config)
+        if cache_dir is not None:
+            cache_file = cache_dir / f"{digest}.json"
+            if cache_file.exists():
+                try:
+                    automaton = GlossaryAutomaton.from_bytes(cache_file.read_bytes(), digest)
+                except (GlossaryError, OSError):
+                    cache_file.unlink(missing_ok=True)
+                else:
+                    return cls(automaton, whole_words=config.whole_words, digest=digest)
+
+        entries = parse_glossary(raw.decode("utf-8"), config.path.suffix.lower())
+        automaton = GlossaryAutomaton.build(entries, case_sensitive=config.case_sensitive)
+
+        if cache_file is not None:
+            cache_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_file = cache_file.with_suffix(".tmp")
+            tmp_file.write_bytes(automaton.to_bytes(digest))
+            tmp_file.replace(cache_file)
+        return cls(automaton, whole_words=config.whole_words, digest=digest)
+
+    @property
+    def entries(self) -> tuple[GlossaryEntry, ...]:
+        return self.automaton.entries
+
+    def find(self, text: str) -> list[GlossaryMatch]:
+        """Return leftmost-longest, non-overlapping term occurrences in ``text``."""
+
+        entries = self.automaton.entries
+        candidates = [
+            (start, end, index)
+            for start, end, index in self.automaton.iter_matches(text)
+            if not self.whole_words or _on_word_boundary(text, start, end)
+        ]
+        candidates.sort(key=lambda item: (item[0], item[0] - item[1]))
+
+        matches: list[GlossaryMatch] = []
+        cursor = 0
+        for start, end, index in candidates:
+            if start < cursor:
+                continue
+            matches.append(GlossaryMatch(start=start, end=end, entry=entries[index]))
+            cursor = end
+        return matches
+
+    def mask(self, text: str) -> MaskedText:
+        """Replace glossary terms with opaque placeholders before translation."""
+
+        matches = self.find(text)
+        if not matches:
+            return MaskedText(text=text, placeholders=[])
+
+        parts: list[str] = []
+        placeholders: list[tuple[str, str, GlossaryEntry]] = []
+        cursor = 0
+        for number, match in enumerate(matches):
+            token = PLACEHOLDER_TEMPLATE.format(index=number)
+            parts.append(text[cursor : match.start])
+            parts.append(token)
+            placeholders.append((token, text[match.start : match.end], match.entry))
+            cursor = match.end
+        parts.append(text[cursor:])
+        return MaskedText(text="".join(parts), placeholders=placeholders)
+
+    def restore(self, translated: str, masked: MaskedText, *, strict: bool = True) -> str:
+        """Substitute placeholders with the protected original or mandated translation."""
+
+        result = translated
+        for token, original, entry in masked.placeholders:
+            replacement = original if entry.protected else entry.translation
+            assert replacement is not None  # for mypy
+            if token not in result:
+                if strict:
+                    raise GlossaryError(f"译文缺少术语占位符 {token}（{original}）")
+                continue
+            result = result.replace(token, replacement)
+        return result
+
+
+def glossary_digest(raw: bytes, config: GlossaryConfig) -> str:
+    """Return the cache key for a glossary file, its format and matching options."""
+
+    hasher = hashlib.sha256()
+    hasher.update(f"v{GLOSSARY_FORMAT_VERSION}:{config.path.suffix.lower()}:".encode())
+    hasher.update(f"{config.case_sensitive}:{config.whole_words}:".encode())
+    hasher.update(raw)
+    return hasher.hexdigest()
+
+
+def parse_glossary(content: str, suffix: str) -> list[GlossaryEntry]:
+    """Parse glossary file content into entries.
+
+    TSV files contain ``term<TAB>translation`` lines; a missing translation marks
+    the term as protected. YAML files provide ``protected`` (list) and ``terms``
+    (mapping) keys.
+    """
+
+    if suffix in {".tsv", ".txt"}:
+        return _dedupe_entries(_parse_tsv(content))
+    if suffix in {".yaml", ".yml"}:
+        return _dedupe_entries(_parse_yaml(content))
+    raise GlossaryError(f"不支持的术语表格式: {suffix or '(无扩展名)'}")
+
+
+def _parse_tsv(content: str) -> Iterable[GlossaryEntry]:
+    for line in content.splitlines():
+        if not line.strip() or line.lstrip().startswith("#"):
+            continue
+        term, _, translation = line.partition("\t")
+        term = term.strip()
+        if term:
+            yield GlossaryEntry(term=term, translation=translation.strip() or None)
+
+
+def _parse_yaml(content: str) -> Iterable[GlossaryEntry]:
+    data: Any = YAML(typ="safe").load(content) or {}
+    if not isinstance(data, Mapping):
+        raise GlossaryError("术语表顶层结构必须是字典")
+    protected = data.get("protected") or []
+    terms = data.get("terms") or {}
+    if not isinstance(protected, list) or not isinstance(terms, Mapping):
+        raise GlossaryError("术语表的 protected 必须是列表，terms 必须是字典")
+    for term in protected:
+        yield GlossaryEntry(term=str(term))
+    for term, translation in terms.items():
+        rendered = None if translation is None else str(translation)
+        yield GlossaryEntry(term=str(term), translation=rendered)
+
+
+def _dedupe_entries(entries: Iterable[GlossaryEntry]) -> list[GlossaryEntry]:
+    unique: dict[str, GlossaryEntry] = {}
+    for entry in entries:
+        if entry.term:
+            unique[entry.term] = entry
+    return list(unique.values())
+
+
+def _fold(text: str, case_sensitive: bool) -> str:
+    if case_sensitive:
+        return text
+    folded = text.lower()
+    if len(folded) == len(text):
+        return folded
+    return "".join(char if len(char.lower()) != 1 else char.lower() for char in text)
+
+
+def _is_word_char(char: str) -> bool:
+    # CJK scripts do not delimit words with spaces, so they never form a boundary conflict.
+    return (char.isalnum() and ord(char) < 0x2E80) or char == "_"
+
+
+def _on_word_boundary(text: str, start: int, end: int) -> bool:
+    if start > 0 and _is_word_char(text[start]) and _is_word_char(text[start - 1]):
+        return False
+    if end < len(text) and _is_word_char(text[end - 1]) and _is_word_char(text[end]):
+        return False
+    return True
+
+
+__all__ = [
+    "Glossary",
+    "GlossaryAutomaton",
+    "GlossaryEntry",
+    "GlossaryError",
+    "GlossaryMatch",
+    "MaskedText",
+    "glossary_digest",
+    "parse_glossary",
+]
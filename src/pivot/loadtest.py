@@ -0,0 +1,249 @@
+"""End-to-end load testing against synthetic repositories and the stand-in provider."""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import random
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from git import Actor, Repo
+
+from pivot.concurrency import AdaptiveProvider, ConcurrencySnapshot
+from pivot.config import RepositoryConfig, TranslationProviderConfig
+from pivot.pipeline import LocalizationPipeline, RunReport
+from pivot.standin import StandinProcess, StandinSettings
+from pivot.translation import OpenAICompatibleProvider
+
+try:  # pragma: no cover - platform dependent
+    import resource
+except ImportError:  # pragma: no cover - Windows
+    resource = None  # type: ignore[assignment]
+
+SYNTHETIC_AUTHOR = Actor("Pivot Load Test", "loadtest@pivot.invalid")
+
+_WORDS = (
+    "pipeline repository translation segment release branch commit document "
+    "provider config cluster deploy service network storage update install "
+    "guide reference example option feature support version runtime"
+).split()
+
+
+@dataclass(slots=True)
+class LoadTestSettings:
+    """Shape of the synthetic workload and the provider it runs against."""
+
+    repositories: int = 3
+    files_per_repository: int = 50
+    segments_per_file: int = 20
+    shared_fraction: float = 0.2
+    stream: bool = True
+    initial_concurrency: int = 8
+    max_concurrency: int = 64
+    seed: int = 0
+    standin: StandinSettings = field(default_factory=StandinSettings)
+
+
+@dataclass(slots=True)
+class LoadTestResult:
+    """Throughput, latency and memory figures of a load-test run.
+
+    ``baseline_rss_bytes`` is sampled right before the pipeline starts, after
+    the synthetic repositories exist, and ``peak_rss_bytes`` is the highest
+    resident set size seen while it runs. The stand-in provider lives in a
+    separate process and is not included in either figure.
+    """
+
+    report: RunReport
+    elapsed_seconds: float
+    peak_rss_bytes: int | None
+    concurrency: ConcurrencySnapshot
+    baseline_rss_bytes: int | None = None
+
+    @property
+    def pipeline_rss_bytes(self) -> int | None:
+        """Memory growth attributable to the pipeline run."""
+
+        if self.peak_rss_bytes is None or self.baseline_rss_bytes is None:
+            return None
+        return max(0, self.peak_rss_bytes - self.baseline_rss_bytes)
+
+    @property
+    def files_per_second(self) -> float:
+        return self.report.files_written / self.elapsed_seconds if self.elapsed_seconds else 0.0
+
+    @property
+    def segments_per_second(self) -> float:
+        return self.report.segments / self.elapsed_seconds if self.elapsed_seconds else 0.0
+
+
+def generate_repositories(root: Path, settings: LoadTestSettings) -> list[RepositoryConfig]:
+    """Create synthetic documentation repositories under ``root``."""
+
+    rng = random.Random(settings.seed)
+    shared = [_sentence(rng, 12) for _ in range(max(1, settings.segments_per_file))]
+    configs: list[RepositoryConfig] = []
+    for number in range(settings.repositories):
+        name = f"synthetic-{number:03d}"
+        path = root / name
+        docs = path / "docs"
+        docs.mkdir(parents=True, exist_ok=True)
+        repo = Repo.init(path)
+        for index in range(settings.files_per_repository):
+            (docs / f"page-{index:04d}.md").write_text(
+                _document(rng, shared, settings), encoding="utf-8"
+            )
+        repo.git.add("docs")
+        repo.index.commit("synthetic docs", author=SYNTHETIC_AUTHOR, committer=SYNTHETIC_AUTHOR)
+        repo.git.branch("-M", "main")
+        repo.close()
+        configs.append(
+            RepositoryConfig(name=name, url=str(path), branch="main", docs_path=Path("docs"))
+        )
+    return configs
+
+
+def run_load_test(work_dir: Path, settings: LoadTestSettings | None = None) -> LoadTestResult:
+    """Run the full pipeline against synthetic repositories and a stand-in provider."""
+
+    settings = settings or LoadTestSettings()
+    configs = generate_repositories(work_dir / "origins", settings)
+    output_dir = work_dir / "output"
+
+    with StandinProcess(settings.standin) as server:
+        provider_config = TranslationProviderConfig.model_validate(
+            {
+                "provider": "openai",
+                "model": "standin",
+                "base_url": server.base_url,
+                "api_key": "standin",
+                "initial_concurrency": settings.initial_concurrency,
+                "max_concurrency": settings.max_concurrency,
+            }
+        )
+        pipeline = LocalizationPipeline(work_dir / "work")
+        with _RssMonitor() as memory:
+            started = time.perf_counter()
+            report, snapshot = asyncio.run(
+                _run(pipeline, configs, provider_config, output_dir, settings.stream)
+            )
+            elapsed = time.perf_counter() - started
+
+    report.concurrency = snapshot
+    return LoadTestResult(
+        report=report,
+        elapsed_seconds=elapsed,
+        peak_rss_bytes=memory.peak,
+        concurrency=snapshot,
+        baseline_rss_bytes=memory.baseline,
+    )
+
+
+def peak_rss_bytes() -> int | None:
+    """Peak resident set size of this process, if the platform reports it."""
+
+    if resource is None:  # pragma: no cover - Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes.
+    return int(peak) if sys.platform == "darwin" else int(peak) * 1024
+
+
+def current_rss_bytes() -> int | None:
+    """Current resident set size of this process, where ``/proc`` provides it."""
+
+    try:
+        with open("/proc/self/statm", encoding="ascii") as fh:
+            resident_pages = int(fh.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return resident_pages * os.sysconf("SC_PAGE_SIZE")
+
+
+class _RssMonitor:
+    """Sample RSS on a background thread to find the peak over a code block.
+
+    Falls back to the process-wide ``ru_maxrss`` high-water mark when the
+    current RSS cannot be read; the difference to the baseline is then a
+    lower bound.
+    """
+
+    def __init__(self, interval: float = 0.02) -> None:
+        self.interval = interval
+        self.baseline: int | None = None
+        self.peak: int | None = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample_until_stopped, daemon=True)
+
+    def __enter__(self) -> _RssMonitor:
+        self.baseline = self._read()
+        self.peak = self.baseline
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self._stop.set()
+        self._thread.join()
+        self._sample()
+
+    def _read(self) -> int | None:
+        current = current_rss_bytes()
+        return current if current is not None else peak_rss_bytes()
+
+    def _sample(self) -> None:
+        value = self._read()
+        if value is not None:
+            self.peak = value if self.peak is None else max(self.peak, value)
+
+    def _sample_until_stopped(self) -> None:
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+
+async def _run(
+    pipeline: LocalizationPipeline,
+    configs: list[RepositoryConfig],
+    provider_config: TranslationProviderConfig,
+    output_dir: Path,
+    stream: bool,
+) -> tuple[RunReport, ConcurrencySnapshot]:
+    client = OpenAICompatibleProvider(provider_config)
+    provider = AdaptiveProvider(client, provider_config)
+    try:
+        if stream:
+            report = await pipeline.stream(configs, provider, output_dir)
+        else:
+            plans = await asyncio.to_thread(pipeline.collect, configs)
+            report = await pipeline.execute(plans, provider, output_dir)
+    finally:
+        await client.aclose()
+    return report, provider.snapshot()
+
+
+def _sentence(rng: random.Random, words: int) -> str:
+    text = " ".join(rng.choice(_WORDS) for _ in range(words))
+    return text[0].upper() + text[1:] + "."
+
+
+def _document(rng: random.Random, shared: list[str], settings: LoadTestSettings) -> str:
+    parts = [f"# {_sentence(rng, 4)}\n"]
+    for _ in range(max(0, settings.segments_per_file - 1)):
+        if rng.random() < settings.shared_fraction:
+            parts.append(rng.choice(shared))
+        else:
+            parts.append(_sentence(rng, rng.randint(8, 24)))
+    return "\n\n".join(parts) + "\n"
+
+
+__all__ = [
+    "LoadTestResult",
+    "LoadTestSettings",
+    "current_rss_bytes",
+    "generate_repositories",
+    "peak_rss_bytes",
+    "run_load_test",
+]
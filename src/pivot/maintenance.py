@@ -0,0 +1,271 @@
+"""Scheduled git maintenance for the cached clones under ``work_dir/repositories``."""
+
+from __future__ import annotations
+
+import json
+import threading
+import time
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from git import Repo
+from git.exc import GitCommandError, GitError
+
+from pivot.config import MaintenanceConfig, RepositoryConfig
+from pivot.repository import POOL_DIRNAME, RepositoryError, RepositoryManager
+
+# Upper bound on the data rewritten by one incremental repack, as in ``git maintenance``.
+MAX_REPACK_BATCH_BYTES = 2 * 1024 * 1024 * 1024
+
+
+@dataclass(slots=True, frozen=True)
+class ObjectStats:
+    """Object storage layout of a repository, as reported by ``git count-objects``."""
+
+    loose_objects: int
+    loose_bytes: int
+    packs: int
+    pack_bytes: int
+    has_commit_graph: bool
+
+    @classmethod
+    def read(cls, repo: Repo) -> ObjectStats:
+        values: dict[str, int] = {}
+        for line in repo.git.count_objects("-v").splitlines():
+            key, _, value = line.partition(":")
+            if value.strip().isdigit():
+                values[key.strip()] = int(value)
+        info = Path(repo.git_dir) / "objects" / "info"
+        return cls(
+            loose_objects=values.get("count", 0),
+            loose_bytes=values.get("size", 0) * 1024,
+            packs=values.get("packs", 0),
+            pack_bytes=values.get("size-pack", 0) * 1024,
+            has_commit_graph=(info / "commit-graph").exists() or (info / "commit-graphs").is_dir(),
+        )
+
+
+@dataclass(slots=True)
+class MaintenanceReport:
+    """What maintenance did to one repository and how long each step took.
+
+    ``probe_before``/``probe_after`` time the same history and tree walk that
+    change detection performs, so the effect of maintenance is measurable.
+    """
+
+    name: str
+    reason: str | None
+    before: ObjectStats
+    after: ObjectStats | None = None
+    probe_before: float | None = None
+    probe_after: float | None = None
+    tasks: dict[str, float] = field(default_factory=dict)
+    error: str | None = None
+
+    @property
+    def ran(self) -> bool:
+        return self.reason is not None
+
+    @property
+    def seconds(self) -> float:
+        return sum(self.tasks.values())
+
+
+def maintenance_reason(
+    stats: ObjectStats,
+    last_run: float | None,
+    now: float,
+    config: MaintenanceConfig,
+) -> str | None:
+    """Return why a repository should be maintained now, or ``None`` to skip it.
+
+    Pack and loose-object counts are what make object lookups slow, so either
+    crossing its threshold triggers maintenance; otherwise a repository that
+    has anything to tidy is maintained once ``max_interval_hours`` have
+    passed. Nothing runs within ``min_interval_hours`` of the previous run.
+    """
+
+    elapsed = None if last_run is None else now - last_run
+    if elapsed is not None and elapsed < config.min_interval_hours * 3600:
+        return None
+    if stats.packs >= config.max_packs:
+        return f"packs={stats.packs}"
+    if stats.loose_objects >= config.max_loose_objects:
+        return f"loose={stats.loose_objects}"
+    untidy = stats.packs > 1 or stats.loose_objects > 0 or not stats.has_commit_graph
+    if untidy and (elapsed is None or elapsed >= config.max_interval_hours * 3600):
+        return "interval"
+    return None
+
+
+class RepositoryMaintainer:
+    """Keep cached clones fast to query as fetches accumulate.
+
+    Each due clone gets a split commit-graph with changed-path Bloom filters,
+    its loose objects packed, small packs folded together through the
+    multi-pack-index (leaving the largest pack alone), and old unreachable
+    objects pruned. Clones are maintained under their handle lease, so a
+    concurrent sync of the same repository waits. The shared object pool is
+    only ever collected through
+    :meth:`~pivot.repository.RepositoryManager.collect_pool_garbage`, which
+    protects the objects its dependent clones borrow. The time of each run is
+    kept in ``state_path``.
+    """
+
+    def __init__(
+        self,
+        manager: RepositoryManager,
+        config: MaintenanceConfig,
+        state_path: Path,
+        *,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.manager = manager
+        self.config = config
+        self.state_path = state_path
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._last_runs: dict[str, float] = self._load()
+
+    def run(
+        self, configs: Iterable[RepositoryConfig], *, force: bool = False
+    ) -> list[MaintenanceReport]:
+        """Maintain every existing clone (and the pool) that is due, or all with ``force``."""
+
+        configs = list(configs)
+        reports: list[MaintenanceReport] = []
+        for config in configs:
+            ref = self.manager.reference(config)
+            if not ref.path.exists():
+                continue
+            with self.manager.open(ref) as repo:
+                reports.append(self._maintain(config.name, repo, force, self._maintain_clone))
+        if self.manager.shared_objects and self.manager.pool_path.exists():
+            pool = Repo(self.manager.pool_path)
+            try:
+                reports.append(
+                    self._maintain(
+                        POOL_DIRNAME,
+                        pool,
+                        force,
+                        lambda _repo, report: self._maintain_pool(configs, report),
+                    )
+                )
+            finally:
+                pool.close()
+        return reports
+
+    def _maintain(
+        self,
+        name: str,
+        repo: Repo,
+        force: bool,
+        maintain: Callable[[Repo, MaintenanceReport], None],
+    ) -> MaintenanceReport:
+        try:
+            stats = ObjectStats.read(repo)
+        except (GitError, OSError) as exc:
+            raise RepositoryError(f"读取仓库 {name} 的对象统计失败: {exc}") from exc
+        reason = "forced" if force else None
+        reason = reason or maintenance_reason(
+            stats, self._last_runs.get(name), self._clock(), self.config
+        )
+        report = MaintenanceReport(name=name, reason=reason, before=stats)
+        if reason is None:
+            return report
+        report.probe_before = _probe(repo)
+        try:
+            maintain(repo, report)
+        except (GitError, RepositoryError, OSError) as exc:
+            report.error = str(exc)
+        report.after = ObjectStats.read(repo)
+        report.probe_after = _probe(repo)
+        self._record(name)
+        return report
+
+    def _maintain_clone(self, repo: Repo, report: MaintenanceReport) -> None:
+        git = repo.git
+        _timed(
+            report,
+            "commit-graph",
+            lambda: git.commit_graph("write", "--reachable", "--split", "--changed-paths"),
+        )
+        if report.before.loose_objects:
+            # --local leaves objects borrowed from the shared pool where they are.
+            _timed(
+                report,
+                "loose-objects",
+                lambda: (git.repack("-d", "-l", "-q"), git.prune_packed()),
+            )
+        _timed(report, "incremental-repack", lambda: _incremental_repack(repo))
+        _timed(report, "prune", lambda: git.prune(f"--expire={self.config.prune_expire}"))
+
+    def _maintain_pool(self, configs: list[RepositoryConfig], report: MaintenanceReport) -> None:
+        # gc also rewrites the pool's commit-graph (gc.writeCommitGraph).
+        _timed(report, "gc", lambda: self.manager.collect_pool_garbage(configs))
+
+    def _load(self) -> dict[str, float]:
+        try:
+            data: Any = json.loads(self.state_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(data, dict):
+            return {}
+        return {str(k): float(v) for k, v in data.items() if isinstance(v, (int, float))}
+
+    def _record(self, name: str) -> None:
+        with self._lock:
+            self._last_runs[name] = self._clock()
+            self.state_path.parent.mkdir(parents=True, exist_ok=True)
+            partial = self.state_path.with_suffix(".tmp")
+            partial.write_text(
+                json.dumps(self._last_runs, indent=2, sort_keys=True) + "\n", encoding="utf-8"
+            )
+            partial.replace(self.state_path)
+
+
+def _incremental_repack(repo: Repo) -> None:
+    git = repo.git
+    packs = list((Path(repo.git_dir) / "objects" / "pack").glob("*.pack"))
+    if not packs:  # e.g. a clone whose objects all live in the shared pool
+        return
+    git.multi_pack_index("write")
+    git.multi_pack_index("expire")
+    sizes = sorted(pack.stat().st_size for pack in packs if pack.exists())
+    if len(sizes) < 2:
+        return
+    # A batch as large as all packs but the biggest folds those into one new
+    # pack, while a dominant base pack is left in place (git skips packs at
+    # least as large as the batch). ``git maintenance`` uses a smaller batch
+    # that only merges a couple of packs per run.
+    batch = min(sum(sizes[:-1]), MAX_REPACK_BATCH_BYTES)
+    git.multi_pack_index("repack", f"--batch-size={batch}")
+    git.multi_pack_index("expire")
+
+
+def _timed(report: MaintenanceReport, task: str, action: Callable[[], object]) -> None:
+    started = time.perf_counter()
+    try:
+        action()
+    finally:
+        report.tasks[task] = time.perf_counter() - started
+
+
+def _probe(repo: Repo) -> float | None:
+    started = time.perf_counter()
+    try:
+        repo.git.rev_list("--count", "HEAD")
+        repo.git.ls_tree("-r", "HEAD")
+    except GitCommandError:
+        return None
+    return time.perf_counter() - started
+
+
+__all__ = [
+    "MaintenanceReport",
+    "ObjectStats",
+    "RepositoryMaintainer",
+    "maintenance_reason",
+]
@@ -0,0 +1,228 @@
+"""On-disk cache of segmented documents keyed by git blob id."""
+
+from __future__ import annotations
+
+import os
+import shutil
+import struct
+import threading
+from pathlib import Path
+
+from pivot.segmentation import (
+    MARKDOWN_SUFFIXES,
+    SEGMENTER_VERSION,
+    YAML_SUFFIXES,
+    Segment,
+    SegmentedDocument,
+)
+
+DEFAULT_PARSE_CACHE_BYTES = 256 * 1024 * 1024
+CACHE_SUFFIX = ".seg"
+EVICTION_WATERMARK = 0.9
+
+_MAGIC = b"PVSG"
+# magic, segmenter version, source length in characters, segment count, string table size
+_HEADER = struct.Struct("<4sHQII")
+# start, end, text offset, text size, indent offset, indent size, kind
+_RECORD = struct.Struct("<QQIIIIB")
+_KINDS: tuple[str, ...] = (
+    "text",
+    "cell",
+    "yaml-plain",
+    "yaml-double",
+    "yaml-single",
+    "yaml-block",
+    "heading",
+)
+_KIND_CODES = {kind: code for code, kind in enumerate(_KINDS)}
+
+
+class ParseCache:
+    """Size-bounded cache of segment tables, so unchanged blobs skip parsing.
+
+    Entries live under ``directory/v<SEGMENTER_VERSION>/`` and are keyed by
+    blob id and parser family (Markdown or YAML). Each entry is a fixed-size
+    record array followed by one UTF-8 string table, read with a single
+    ``struct.iter_unpack`` pass. Hits refresh the file's mtime; when the cache
+    outgrows ``max_bytes``, the least recently used entries are removed until
+    it is back under 90 % of the budget.
+    """
+
+    def __init__(self, directory: Path, max_bytes: int = DEFAULT_PARSE_CACHE_BYTES) -> None:
+        if max_bytes < 0:
+            raise ValueError("max_bytes must not be negative")
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.root = directory / f"v{SEGMENTER_VERSION}"
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._sizes: dict[Path, int] | None = None
+        self._total = 0
+
+    def get(self, blob: str, path: Path, source: str) -> SegmentedDocument | None:
+        """Return the cached segmentation of ``blob``, or ``None`` on a miss."""
+
+        entry = self._entry(blob, path)
+        if entry is None:
+            return None
+        try:
+            document = _decode(entry.read_bytes(), source)
+        except FileNotFoundError:
+            document = None
+        except (OSError, ValueError, struct.error):
+            # A damaged entry would fail the same way next time; drop it.
+            self._discard(entry)
+            document = None
+        if document is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        try:
+            os.utime(entry)
+        except OSError:  # pragma: no cover - concurrent eviction
+            pass
+        return document
+
+    def put(self, blob: str, path: Path, document: SegmentedDocument) -> None:
+        """Store the segmentation of ``blob``, evicting old entries if needed."""
+
+        entry = self._entry(blob, path)
+        if entry is None or self.max_bytes == 0:
+            return
+        data = _encode(document)
+        if len(data) > self.max_bytes:
+            return
+        with self._lock:
+            sizes = self._index()
+            try:
+                entry.parent.mkdir(parents=True, exist_ok=True)
+                partial = entry.with_name(f"{entry.name}.{threading.get_ident()}.tmp")
+                partial.write_bytes(data)
+                partial.replace(entry)
+            except OSError:
+                return
+            self._total += len(data) - sizes.get(entry, 0)
+            sizes[entry] = len(data)
+            if self._total > self.max_bytes:
+                self._evict(sizes)
+
+    @property
+    def size_bytes(self) -> int:
+        with self._lock:
+            self._index()
+            return self._total
+
+    def _discard(self, entry: Path) -> None:
+        with self._lock:
+            entry.unlink(missing_ok=True)
+            if self._sizes is not None and entry in self._sizes:
+                self._total -= self._sizes.pop(entry)
+
+    def _entry(self, blob: str, path: Path) -> Path | None:
+        suffix = path.suffix.lower()
+        if suffix in MARKDOWN_SUFFIXES:
+            family = "md"
+        elif suffix in YAML_SUFFIXES:
+            family = "yaml"
+        else:
+            return None
+        return self.root / blob[:2] / f"{blob}.{family}{CACHE_SUFFIX}"
+
+    def _index(self) -> dict[Path, int]:
+        if self._sizes is None:
+            self._sizes = {}
+            self._drop_stale_versions()
+            if self.root.exists():
+                for entry in self.root.glob(f"*/*{CACHE_SUFFIX}"):
+                    try:
+                        self._sizes[entry] = entry.stat().st_size
+                    except OSError:  # pragma: no cover - concurrent eviction
+                        continue
+            self._total = sum(self._sizes.values())
+        return self._sizes
+
+    def _drop_stale_versions(self) -> None:
+        if not self.directory.exists():
+            return
+        for child in self.directory.iterdir():
+            if child.is_dir() and child != self.root and child.name.startswith("v"):
+                shutil.rmtree(child, ignore_errors=True)
+
+    def _evict(self, sizes: dict[Path, int]) -> None:
+        target = int(self.max_bytes * EVICTION_WATERMARK)
+        by_age: list[tuple[float, Path]] = []
+        for entry in sizes:
+            try:
+                by_age.append((entry.stat().st_mtime, entry))
+            except OSError:
+                by_age.append((0.0, entry))
+        by_age.sort()
+        for _, entry in by_age:
+            if self._total <= target:
+                break
+            entry.unlink(missing_ok=True)
+            self._total -= sizes.pop(entry)
+
+
+def _encode(document: SegmentedDocument) -> bytes:
+    strings = bytearray()
+    records = bytearray()
+    for segment in document.segments:
+        text = segment.text.encode("utf-8")
+        indent = segment.indent.encode("utf-8")
+        text_offset = len(strings)
+        strings += text
+        indent_offset = len(strings)
+        strings += indent
+        records += _RECORD.pack(
+            segment.start,
+            segment.end,
+            text_offset,
+            len(text),
+            indent_offset,
+            len(indent),
+            _KIND_CODES[segment.kind],
+        )
+    header = _HEADER.pack(
+        _MAGIC, SEGMENTER_VERSION, len(document.source), len(document.segments), len(strings)
+    )
+    return header + bytes(records) + bytes(strings)
+
+
+def _decode(data: bytes, source: str) -> SegmentedDocument | None:
+    """Decode an entry, or return ``None`` if it describes a different source.
+
+    Raises :class:`ValueError` (or :class:`struct.error`) for damaged entries.
+    """
+
+    magic, version, source_length, count, strings_size = _HEADER.unpack_from(data)
+    if magic != _MAGIC or version != SEGMENTER_VERSION or source_length != len(source):
+        return None
+    records_end = _HEADER.size + count * _RECORD.size
+    if len(data) != records_end + strings_size:
+        raise ValueError("cache entry size does not match its header")
+    strings = memoryview(data)[records_end:]
+    records = _RECORD.iter_unpack(data[_HEADER.size : records_end])
+    segments: list[Segment] = []
+    for start, end, text_offset, text_size, indent_offset, indent_size, kind in records:
+        if (
+            kind >= len(_KINDS)
+            or not start <= end <= source_length
+            or text_offset + text_size > strings_size
+            or indent_offset + indent_size > strings_size
+        ):
+            raise ValueError("cache entry holds an invalid segment record")
+        segments.append(
+            Segment(
+                start=start,
+                end=end,
+                text=str(strings[text_offset : text_offset + text_size], "utf-8"),
+                indent=str(strings[indent_offset : indent_offset + indent_size], "utf-8"),
+                kind=_KINDS[kind],
+            )
+        )
+    return SegmentedDocument(source=source, segments=segments)
+
+
+__all__ = ["DEFAULT_PARSE_CACHE_BYTES", "ParseCache"]
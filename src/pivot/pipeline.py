@@ -2,26 +2,87 @@
 
 from __future__ import annotations
 
+import asyncio
+import os
+import shutil
+import tempfile
 from collections import OrderedDict
-from collections.abc import Sequence
+from collections.abc import Awaitable, Callable, Sequence
 from dataclasses import dataclass, field
 from pathlib import Path
+from typing import TypeVar
 
-from git import Repo
+from git import GitCommandError, Repo
+from git.exc import GitError
 
 from pivot.change_detection import ChangeDetector
+from pivot.concurrency import ConcurrencySnapshot
 from pivot.config import RepositoryConfig
-from pivot.repository import RepositoryManager
-from pivot.state import StateStore
+from pivot.glossary import GlossaryError
+from pivot.parse_cache import DEFAULT_PARSE_CACHE_BYTES, ParseCache
+from pivot.repository import (
+    DEFAULT_MAX_OPEN_REPOSITORIES,
+    RepositoryError,
+    RepositoryManager,
+    RepositoryRef,
+)
+from pivot.segmentation import (
+    DEFAULT_CHUNK_BYTES,
+    MARKDOWN_SUFFIXES,
+    SegmentedDocument,
+    iter_markdown_chunks,
+    segment_document,
+    segment_markdown,
+)
+from pivot.state import OutputIndex, StateStore
+from pivot.translation import (
+    DeduplicatingTranslator,
+    DedupStats,
+    TranslationError,
+    TranslationProvider,
+)
+from pivot.translation_memory import MemoryStats
+
+DEFAULT_FILE_CONCURRENCY = 8
+DEFAULT_SYNC_CONCURRENCY = 2
+DEFAULT_QUEUE_SIZE = 32
+DEFAULT_LARGE_FILE_THRESHOLD = 1024 * 1024
+_IO_WORKERS = 4
+
+_In = TypeVar("_In")
+_Out = TypeVar("_Out")
+_Emit = Callable[[_Out], Awaitable[None]]
 
 
 @dataclass(slots=True)
 class RepositoryPlan:
-    """Aggregated information about a repository run."""
+    """Aggregated information about a repository run.
+
+    Plans hold a :class:`RepositoryRef` rather than a live ``git.Repo`` so that
+    open handles (and their helper processes) stay bounded by the manager's
+    handle pool regardless of how many repositories are planned.
+
+    Repositories tracking several branches produce one plan per ``branch``;
+    those plans read documents straight from git objects and write into a
+    per-branch output directory. ``blobs`` maps each pending file still present
+    at ``head_commit`` to its blob id, and ``base_commit`` is the sync pointer
+    the changes were computed from.
+
+    Plans loaded from a plan file are ``detached`` and read documents from git
+    objects as well, since the clone need not be checked out at
+    ``head_commit``. A ``partial`` plan covers only some of its files and is
+    never marked as processed.
+    """
 
     config: RepositoryConfig
-    repo: Repo
+    repository: RepositoryRef
+    head_commit: str
     pending_files: list[Path] = field(default_factory=list)
+    branch: str | None = None
+    blobs: dict[Path, str] = field(default_factory=dict)
+    base_commit: str | None = None
+    detached: bool = False
+    partial: bool = False
 
     @property
     def has_changes(self) -> bool:
@@ -29,6 +90,76 @@ class RepositoryPlan:
 
         return bool(self.pending_files)
 
+    @property
+    def label(self) -> str:
+        return f"{self.config.name}@{self.branch}" if self.branch else self.config.name
+
+    @property
+    def output_root(self) -> Path:
+        """Output location of the plan, relative to the run's output directory."""
+
+        root = Path(self.config.name)
+        return root / self.branch if self.branch else root
+
+
+@dataclass(slots=True)
+class _FileWork:
+    """A single pending file as it moves through the streaming stages."""
+
+    plan: RepositoryPlan
+    path: Path
+    text: str | None = None
+    document: SegmentedDocument | None = None
+    translations: list[str] | None = None
+    chunked: bool = False
+    copied: bool = False
+    segments: int = 0
+    error: str | None = None
+    source: Path | None = None
+    size: int | None = None
+    owned: _BlobOutput | None = None
+    reuse: _BlobOutput | None = None
+
+
+@dataclass(slots=True)
+class _BlobOutput:
+    """Translation of one distinct blob, shared by every file that holds it."""
+
+    done: bool = False
+    target: Path | None = None
+    segments: int = 0
+    error: str | None = None
+    waiters: list[_FileWork] = field(default_factory=list)
+
+
+@dataclass(slots=True)
+class RunReport:
+    """Outcome of executing translation for a set of repository plans."""
+
+    repositories: int = 0
+    files_written: int = 0
+    files_reused: int = 0
+    files_removed: int = 0
+    segments: int = 0
+    documents_segmented: int = 0
+    parse_cache_hits: int = 0
+    failures: list[str] = field(default_factory=list)
+    dedup: DedupStats = field(default_factory=DedupStats)
+    concurrency: ConcurrencySnapshot | None = None
+    memory: MemoryStats | None = None
+
+    @property
+    def succeeded(self) -> bool:
+        return not self.failures
+
+    @property
+    def provider_calls(self) -> int:
+        """Unique segments that were neither deduplicated nor answered by the memory."""
+
+        if self.memory is None:
+            return self.dedup.unique
+        return self.dedup.unique - self.memory.exact - self.memory.patched
+
 
 class LocalizationPipeline:
     """Coordinate repository synchronization and change detection."""
@@ -40,30 +171,525 @@ class LocalizationPipeline:
         repository_manager: RepositoryManager | None = None,
         state_store: StateStore | None = None,
         change_detector: ChangeDetector | None = None,
+        large_file_threshold: int = DEFAULT_LARGE_FILE_THRESHOLD,
+        chunk_bytes: int = DEFAULT_CHUNK_BYTES,
+        shared_objects: bool = False,
+        max_open_repositories: int = DEFAULT_MAX_OPEN_REPOSITORIES,
+        parse_cache: ParseCache | None = None,
+        parse_cache_bytes: int = DEFAULT_PARSE_CACHE_BYTES,
+        output_index: OutputIndex | None = None,
     ) -> None:
         self.work_dir = work_dir
+        self.large_file_threshold = large_file_threshold
+        self.chunk_bytes = chunk_bytes
         self._repos_dir = work_dir / "repositories"
         self._state_file = work_dir / "state" / "repositories.json"
 
-        self.repository_manager = repository_manager or RepositoryManager(self._repos_dir)
+        self.repository_manager = repository_manager or RepositoryManager(
+            self._repos_dir,
+            shared_objects=shared_objects,
+            max_open_repositories=max_open_repositories,
+        )
         self.state_store = state_store or StateStore(self._state_file)
         self.change_detector = change_detector or ChangeDetector(self.state_store)
+        if parse_cache is None and parse_cache_bytes:
+            parse_cache = ParseCache(work_dir / "cache" / "segments", parse_cache_bytes)
+        self.parse_cache = parse_cache
+        self.output_index = output_index or OutputIndex(work_dir / "state" / "outputs.json")
 
     def collect(self, configs: Sequence[RepositoryConfig]) -> list[RepositoryPlan]:
         """Synchronize repositories and gather pending document changes."""
 
+        return [plan for config in configs for plan in self.plan_repository(config)]
+
+    def plan_repository(self, config: RepositoryConfig) -> list[RepositoryPlan]:
+        """Synchronize a single repository and gather its pending document changes.
+
+        Returns one plan, or one plan per branch when ``config.branches`` is set.
+        All branches share the same clone and are inspected without checkout.
+        """
+
+        manager = self.repository_manager
+        detector = self.change_detector
+        manager.sync(config)
+        ref = manager.reference(config)
         plans: list[RepositoryPlan] = []
-        for config in configs:
-            repo = self.repository_manager.sync(config)
-            raw_changes = self.change_detector.collect_changes(config, repo)
-            pending = self._deduplicate(raw_changes)
-            plans.append(RepositoryPlan(config=config, repo=repo, pending_files=pending))
+        state = self.state_store.get_repository_state(config.name)
+        with manager.open(ref) as repo:
+            if not config.branches:
+                head_commit = repo.head.commit.hexsha
+                pending = self._deduplicate(detector.collect_changes(config, repo))
+                blobs = detector.resolve_blobs(repo, head_commit, pending, config.docs_path)
+                plans.append(
+                    RepositoryPlan(
+                        config=config,
+                        repository=ref,
+                        head_commit=head_commit,
+                        pending_files=pending,
+                        blobs=blobs,
+                        base_commit=state.last_synced_commit,
+                    )
+                )
+            for branch in config.branches:
+                head_commit = manager.branch_commit(repo, branch)
+                pending = self._deduplicate(
+                    detector.collect_branch_changes(config, repo, branch, head_commit)
+                )
+                blobs = detector.resolve_blobs(repo, head_commit, pending, config.docs_path)
+                plans.append(
+                    RepositoryPlan(
+                        config=config,
+                        repository=ref,
+                        head_commit=head_commit,
+                        pending_files=pending,
+                        branch=branch,
+                        blobs=blobs,
+                        base_commit=state.branches.get(branch),
+                    )
+                )
         return plans
 
-    def mark_processed(self, plan: RepositoryPlan) -> None:
-        """Persist that the given plan has been processed."""
+    async def execute(
+        self,
+        plans: Sequence[RepositoryPlan],
+        provider: TranslationProvider,
+        output_dir: Path,
+        *,
+        file_concurrency: int = DEFAULT_FILE_CONCURRENCY,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+    ) -> RunReport:
+        """Translate every pending file of already collected plans into ``output_dir``.
+
+        All plans share one deduplicating translator, so a segment repeated across
+        files and repositories is sent to the provider once. A plan is marked as
+        processed only when all of its files were translated successfully.
+        """
+
+        async def source(emit: _Emit[RepositoryPlan]) -> None:
+            for plan in plans:
+                await emit(plan)
+
+        return await self._run_streaming(
+            source,
+            provider,
+            output_dir,
+            file_concurrency=file_concurrency,
+            queue_size=queue_size,
+        )
+
+    async def stream(
+        self,
+        configs: Sequence[RepositoryConfig],
+        provider: TranslationProvider,
+        output_dir: Path,
+        *,
+        sync_concurrency: int = DEFAULT_SYNC_CONCURRENCY,
+        file_concurrency: int = DEFAULT_FILE_CONCURRENCY,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+    ) -> RunReport:
+        """Sync, detect, translate and record repositories as a streaming pipeline.
+
+        Stages are connected by bounded queues: files of a repository start flowing
+        into translation as soon as that repository is synchronized, and a full
+        queue blocks the upstream stage so pending work cannot outrun the provider.
+        """
+
+        async def source(emit: _Emit[RepositoryConfig]) -> None:
+            for config in configs:
+                await emit(config)
+
+        async def sync(config: RepositoryConfig, emit: _Emit[RepositoryPlan]) -> None:
+            for plan in await asyncio.to_thread(self.plan_repository, config):
+                await emit(plan)
+
+        async def plans(emit: _Emit[RepositoryPlan]) -> None:
+            config_queue: asyncio.Queue[RepositoryConfig | None] = asyncio.Queue(queue_size)
+            plan_queue: asyncio.Queue[RepositoryPlan | None] = asyncio.Queue(queue_size)
+
+            async def produce() -> None:
+                await source(config_queue.put)
+                await config_queue.put(None)
+
+            async def forward() -> None:
+                while (plan := await plan_queue.get()) is not None:
+                    await emit(plan)
+
+            await asyncio.gather(
+                produce(),
+                _run_stage(config_queue, plan_queue, sync, sync_concurrency),
+                forward(),
+            )
+
+        return await self._run_streaming(
+            plans,
+            provider,
+            output_dir,
+            file_concurrency=file_concurrency,
+            queue_size=queue_size,
+        )
 
-        self.change_detector.record_processed(plan.config, plan.repo)
+    async def _run_streaming(
+        self,
+        source: Callable[[_Emit[RepositoryPlan]], Awaitable[None]],
+        provider: TranslationProvider,
+        output_dir: Path,
+        *,
+        file_concurrency: int,
+        queue_size: int,
+    ) -> RunReport:
+        translator = DeduplicatingTranslator(provider)
+        report = RunReport(dedup=translator.stats)
+        remaining: dict[int, int] = {}
+        failed: set[int] = set()
+        # A blob shared by several branches of a repository is translated once;
+        # the other files copy the first output once it has been written, or an
+        # unchanged output recorded for the blob by an earlier run.
+        blob_outputs: dict[tuple[str, str, str], _BlobOutput] = {}
+        index = self.output_index
+
+        plan_queue: asyncio.Queue[RepositoryPlan | None] = asyncio.Queue(queue_size)
+        load_queue: asyncio.Queue[_FileWork | None] = asyncio.Queue(queue_size)
+        segment_queue: asyncio.Queue[_FileWork | None] = asyncio.Queue(queue_size)
+        translate_queue: asyncio.Queue[_FileWork | None] = asyncio.Queue(queue_size)
+        write_queue: asyncio.Queue[_FileWork | None] = asyncio.Queue(queue_size)
+        record_queue: asyncio.Queue[_FileWork | None] = asyncio.Queue(queue_size)
+
+        async def produce() -> None:
+            await source(plan_queue.put)
+            await plan_queue.put(None)
+
+        async def expand(plan: RepositoryPlan, emit: _Emit[_FileWork]) -> None:
+            report.repositories += 1
+            if not plan.pending_files:
+                await asyncio.to_thread(self.mark_processed, plan)
+                return
+            remaining[id(plan)] = len(plan.pending_files)
+            for path in plan.pending_files:
+                await emit(_FileWork(plan=plan, path=path))
+
+        async def load(work: _FileWork, emit: _Emit[_FileWork]) -> None:
+            blob = work.plan.blobs.get(work.path)
+            if blob is not None:
+                key = (work.plan.config.name, blob, work.path.suffix.lower())
+                shared = blob_outputs.get(key)
+                if shared is not None:
+                    work.reuse = shared
+                    await emit(work)
+                    return
+                work.owned = blob_outputs[key] = _BlobOutput()
+                segments = await asyncio.to_thread(self._copy_previous, work, blob, output_dir)
+                if segments is not None:
+                    work.copied, work.segments = True, segments
+                    await emit(work)
+                    return
+            try:
+                if work.plan.branch is not None or work.plan.detached:
+                    if blob is not None:
+                        await asyncio.to_thread(self._load_blob, work, blob)
+                else:
+                    source_path = self._source_path(work)
+                    if source_path.exists() and self._is_large(source_path):
+                        work.chunked = True
+                        work.size = source_path.stat().st_size
+                    elif source_path.exists():
+                        work.text = await asyncio.to_thread(source_path.read_text, encoding="utf-8")
+            except (OSError, UnicodeDecodeError, RepositoryError) as exc:
+                work.error = str(exc)
+            await emit(work)
+
+        async def segment(work: _FileWork, emit: _Emit[_FileWork]) -> None:
+            if work.error is None and work.text is not None:
+                work.document, cached = await asyncio.to_thread(self._segment, work, work.text)
+                work.text = None
+                report.documents_segmented += 1
+                report.parse_cache_hits += cached
+            await emit(work)
+
+        async def translate(work: _FileWork, emit: _Emit[_FileWork]) -> None:
+            if work.error is None and work.chunked:
+                target = output_dir / work.plan.output_root / work.path
+                try:
+                    work.segments = await self._translate_chunked(work, translator, target)
+                except (TranslationError, GlossaryError, OSError, UnicodeDecodeError) as exc:
+                    work.error = str(exc)
+                finally:
+                    if work.source is not None:
+                        work.source.unlink(missing_ok=True)
+            elif work.error is None and work.document is not None:
+                try:
+                    work.translations = await _translate_all(
+                        translator, [s.text for s in work.document.segments]
+                    )
+                except (TranslationError, GlossaryError) as exc:
+                    work.error = str(exc)
+            await emit(work)
+
+        async def copy_shared(work: _FileWork, shared: _BlobOutput) -> None:
+            if shared.error is not None:
+                work.error = shared.error
+                return
+            assert shared.target is not None  # for mypy
+            output = work.plan.output_root / work.path
+            target = output_dir / output
+            try:
+                target.parent.mkdir(parents=True, exist_ok=True)
+                await asyncio.to_thread(shutil.copyfile, shared.target, target)
+            except OSError as exc:
+                work.error = str(exc)
+                return
+            blob = work.plan.blobs.get(work.path)
+            index.record(work.plan.config.name, output, output_dir, blob, shared.segments)
+            report.files_written += 1
+            report.files_reused += 1
+            report.segments += shared.segments
+
+        async def write(work: _FileWork, emit: _Emit[_FileWork]) -> None:
+            if work.reuse is not None:
+                if not work.reuse.done:
+                    # Emitted by the owning file's write once its output exists.
+                    work.reuse.waiters.append(work)
+                    return
+                await copy_shared(work, work.reuse)
+                await emit(work)
+                return
+
+            output = work.plan.output_root / work.path
+            target = output_dir / output
+            if work.error is None:
+                try:
+                    if work.copied:
+                        report.files_written += 1
+                        report.files_reused += 1
+                        report.segments += work.segments
+                    elif work.chunked:
+                        work.document = None
+                        report.files_written += 1
+                        report.segments += work.segments
+                    elif work.document is None:
+                        target.unlink(missing_ok=True)
+                        report.files_removed += 1
+                    else:
+                        assert work.translations is not None  # for mypy
+                        rendered = work.document.render(work.translations)
+                        target.parent.mkdir(parents=True, exist_ok=True)
+                        await asyncio.to_thread(target.write_text, rendered, encoding="utf-8")
+                        report.files_written += 1
+                        work.segments = len(work.document.segments)
+                        report.segments += work.segments
+                except OSError as exc:
+                    work.error = str(exc)
+            blob = work.plan.blobs.get(work.path) if work.error is None else None
+            index.record(work.plan.config.name, output, output_dir, blob, work.segments)
+            work.document = None
+            work.translations = None
+
+            if work.owned is not None:
+                shared = work.owned
+                shared.done = True
+                shared.target = target
+                shared.segments = work.segments
+                shared.error = work.error
+                waiters, shared.waiters = shared.waiters, []
+                for waiter in waiters:
+                    await copy_shared(waiter, shared)
+                    await emit(waiter)
+            await emit(work)
+
+        async def record() -> None:
+            while (work := await record_queue.get()) is not None:
+                key = id(work.plan)
+                if work.error is not None:
+                    failure = f"{work.plan.label}:{work.path.as_posix()}: {work.error}"
+                    report.failures.append(failure)
+                    failed.add(key)
+                remaining[key] -= 1
+                if not remaining[key]:
+                    del remaining[key]
+                    if key not in failed:
+                        await asyncio.to_thread(self.mark_processed, work.plan)
+
+        try:
+            await asyncio.gather(
+                produce(),
+                _run_stage(plan_queue, load_queue, expand, 1),
+                _run_stage(load_queue, segment_queue, load, _IO_WORKERS),
+                _run_stage(segment_queue, translate_queue, segment, 1),
+                _run_stage(translate_queue, write_queue, translate, file_concurrency),
+                _run_stage(write_queue, record_queue, write, _IO_WORKERS),
+                record(),
+            )
+        finally:
+            await asyncio.to_thread(index.save)
+        return report
+
+    def _copy_previous(self, work: _FileWork, blob: str, output_dir: Path) -> int | None:
+        """Copy an output an earlier run recorded for ``blob`` into place, if one is left.
+
+        Returns the number of segments of the copied translation. The source is
+        checked again after copying, so an output rewritten in the meantime is
+        never taken for a translation of ``blob``.
+        """
+
+        output = work.plan.output_root / work.path
+        name = work.plan.config.name
+        found = self.output_index.find(name, blob, work.path.suffix.lower(), output_dir, output)
+        if found is None:
+            return None
+        previous, record = found
+        source, target = output_dir / previous, output_dir / output
+        try:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copyfile(source, target)
+            stat = source.stat()
+        except OSError:
+            return None
+        if (stat.st_size, stat.st_mtime_ns) != (record.size, record.mtime_ns):
+            return None
+        return record.segments
+
+    def _source_path(self, work: _FileWork) -> Path:
+        if work.source is not None:
+            return work.source
+        return work.plan.repository.path / work.path
+
+    def _segment(self, work: _FileWork, text: str) -> tuple[SegmentedDocument, bool]:
+        """Segment ``text``, reusing the parse cache entry of its blob if present."""
+
+        blob = work.plan.blobs.get(work.path)
+        cache = self.parse_cache
+        if cache is not None and blob is not None:
+            cached = cache.get(blob, work.path, text)
+            if cached is not None:
+                return cached, True
+        document = segment_document(work.path, text)
+        if cache is not None and blob is not None:
+            cache.put(blob, work.path, document)
+        return document, False
+
+    def _load_blob(self, work: _FileWork, blob: str) -> None:
+        """Read a branch document from the object database instead of a checkout.
+
+        Large Markdown blobs are streamed to a temporary file so they can be
+        chunked through ``mmap`` like working-tree files. Each file gets its
+        own temporary copy, since the same blob may be in flight for several
+        repositories at once.
+        """
+
+        binsha = bytes.fromhex(blob)
+        with self.repository_manager.open(work.plan.repository) as repo:
+            try:
+                size = repo.odb.info(binsha).size
+            except ValueError as exc:
+                raise RepositoryError(f"仓库中缺少对象 {blob}: {exc}") from exc
+            stream = repo.odb.stream(binsha)
+            suffix = work.path.suffix.lower()
+            if suffix in MARKDOWN_SUFFIXES and size > self.large_file_threshold:
+                tmp_dir = self.work_dir / "tmp"
+                tmp_dir.mkdir(parents=True, exist_ok=True)
+                fd, name = tempfile.mkstemp(prefix=f"{blob[:12]}-", suffix=suffix, dir=tmp_dir)
+                source = Path(name)
+                try:
+                    with os.fdopen(fd, "wb") as out:
+                        shutil.copyfileobj(stream, out)
+                        copied = out.tell()
+                    if copied != size:
+                        raise RepositoryError(f"对象 {blob} 读取不完整: {copied}/{size} 字节")
+                except BaseException:
+                    source.unlink(missing_ok=True)
+                    raise
+                work.source = source
+                work.size = size
+                work.chunked = True
+            else:
+                data = stream.read()
+                if len(data) != size:
+                    raise RepositoryError(f"对象 {blob} 读取不完整: {len(data)}/{size} 字节")
+                work.text = data.decode("utf-8")
+
+    def _is_large(self, path: Path) -> bool:
+        return (
+            path.suffix.lower() in MARKDOWN_SUFFIXES
+            and path.stat().st_size > self.large_file_threshold
+        )
+
+    async def _translate_chunked(
+        self, work: _FileWork, translator: TranslationProvider, target: Path
+    ) -> int:
+        """Translate a large Markdown file chunk by chunk, streaming output to disk.
+
+        Only one chunk and its translations are held in memory at a time; the
+        output is written to a sibling temporary file and moved into place once
+        complete so a failure never leaves a truncated translation behind.
+        """
+
+        source = self._source_path(work)
+        actual = source.stat().st_size
+        if work.size is not None and actual != work.size:
+            raise OSError(f"{source} 只有 {actual} 字节，应为 {work.size} 字节，可能已被截断")
+        target.parent.mkdir(parents=True, exist_ok=True)
+        partial = target.with_name(target.name + ".partial")
+        chunks = iter_markdown_chunks(source, self.chunk_bytes)
+        segments = 0
+        try:
+            with partial.open("w", encoding="utf-8") as out:
+                while (chunk := await asyncio.to_thread(next, chunks, None)) is not None:
+                    document = segment_markdown(chunk)
+                    translations = await _translate_all(
+                        translator, [s.text for s in document.segments]
+                    )
+                    await asyncio.to_thread(out.write, document.render(translations))
+                    segments += len(document.segments)
+            partial.replace(target)
+        finally:
+            chunks.close()
+            partial.unlink(missing_ok=True)
+        return segments
+
+    def blob_sizes(self, plan: RepositoryPlan) -> dict[Path, int]:
+        """Size in bytes of every pending file of ``plan`` that has a blob."""
+
+        if not plan.blobs:
+            return {}
+        with self.repository_manager.open(plan.repository) as repo:
+            return {
+                path: repo.odb.info(bytes.fromhex(blob)).size for path, blob in plan.blobs.items()
+            }
+
+    def is_current(self, plan: RepositoryPlan) -> bool:
+        """Whether recording ``plan`` would move its sync pointer forward correctly.
+
+        The pointer must still be at ``base_commit``, or have moved to a commit
+        between ``base_commit`` and ``head_commit``. Recording a plan made from
+        an older pointer could otherwise move it backwards, or onto a head whose
+        changes since the pointer were never translated.
+        """
+
+        state = self.state_store.get_repository_state(plan.config.name)
+        current = state.branches.get(plan.branch) if plan.branch else state.last_synced_commit
+        base, head = plan.base_commit, plan.head_commit
+        if current in (base, head):
+            return True
+        if current is None:
+            return False
+        try:
+            with self.repository_manager.open(plan.repository) as repo:
+                return _is_ancestor(repo, current, head) and (
+                    base is None or _is_ancestor(repo, base, current)
+                )
+        except (GitError, OSError) as exc:
+            raise RepositoryError(f"无法检查 {plan.label} 的同步指针: {exc}") from exc
+
+    def mark_processed(self, plan: RepositoryPlan) -> bool:
+        """Persist that the given plan has been processed.
+
+        Partial plans are never recorded, and neither are detached plans that
+        are no longer :meth:`is_current`. Returns whether the plan was recorded.
+        """
+
+        if plan.partial or (plan.detached and not self.is_current(plan)):
+            return False
+        self.change_detector.record_commit(plan.config, plan.head_commit, branch=plan.branch)
+        return True
 
     def mark_all_processed(self, plans: Sequence[RepositoryPlan]) -> None:
         """Persist that all provided plans have been processed."""
@@ -79,4 +705,56 @@ class LocalizationPipeline:
         return list(ordered.keys())
 
 
-__all__ = ["LocalizationPipeline", "RepositoryPlan"]
+async def _translate_all(translator: TranslationProvider, texts: Sequence[str]) -> list[str]:
+    """Translate ``texts`` concurrently, in order.
+
+    When one translation fails, the others are cancelled and awaited before
+    the error propagates, so none keeps running or leaves an unretrieved
+    exception behind.
+    """
+
+    tasks = [asyncio.ensure_future(translator.translate(text)) for text in texts]
+    try:
+        return list(await asyncio.gather(*tasks))
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+
+
+def _is_ancestor(repo: Repo, ancestor: str, commit: str) -> bool:
+    try:
+        repo.git.merge_base("--is-ancestor", ancestor, commit)
+    except GitCommandError as exc:
+        if exc.status == 1:
+            return False
+        raise
+    return True
+
+
+async def _run_stage(
+    inbox: asyncio.Queue[_In | None],
+    outbox: asyncio.Queue[_Out | None],
+    handler: Callable[[_In, _Emit[_Out]], Awaitable[None]],
+    workers: int,
+) -> None:
+    """Drain ``inbox`` with ``workers`` concurrent handlers feeding ``outbox``.
+
+    ``None`` marks the end of a stream; it is re-queued so sibling workers stop
+    too, and forwarded once every worker of the stage has finished.
+    """
+
+    async def worker() -> None:
+        while True:
+            item = await inbox.get()
+            if item is None:
+                await inbox.put(None)
+                return
+            await handler(item, outbox.put)
+
+    await asyncio.gather(*(worker() for _ in range(max(1, workers))))
+    await outbox.put(None)
+
+
+__all__ = ["LocalizationPipeline", "RepositoryPlan", "RunReport"]
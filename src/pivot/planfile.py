@@ -0,0 +1,193 @@
+"""Export repository plans as JSON Lines and load them back for execution."""
+
+from __future__ import annotations
+
+import json
+import zlib
+from collections.abc import Callable, Iterable, Mapping
+from dataclasses import dataclass
+from pathlib import Path
+from typing import IO, Any
+
+from pivot.config import RepositoryConfig
+from pivot.pipeline import RepositoryPlan
+from pivot.repository import RepositoryRef
+
+PLAN_FORMAT = "pivot-plan"
+PLAN_FORMAT_VERSION = 1
+
+
+class PlanFileError(RuntimeError):
+    """Raised when a plan file is malformed or does not match the configuration."""
+
+
+@dataclass(slots=True)
+class PlanSummary:
+    """Totals of a written or loaded plan file."""
+
+    repositories: int = 0
+    files: int = 0
+    bytes: int = 0
+
+
+@dataclass(slots=True, frozen=True)
+class PlanSelection:
+    """Subset of a plan's file lines to execute.
+
+    ``start``/``stop`` slice the file lines by their 0-based position in the
+    plan. ``shard``/``shards`` split them by blob id (or path for deleted
+    files), so identical documents always land on the same shard and are
+    translated once.
+    """
+
+    start: int = 0
+    stop: int | None = None
+    shard: int = 0
+    shards: int = 1
+
+    def __post_init__(self) -> None:
+        if self.start < 0 or (self.stop is not None and self.stop < self.start):
+            raise ValueError("invalid line range")
+        if self.shards < 1 or not 0 <= self.shard < self.shards:
+            raise ValueError("shard must satisfy 0 <= shard < shards")
+
+    @property
+    def everything(self) -> bool:
+        return self.start == 0 and self.stop is None and self.shards == 1
+
+    def includes(self, index: int, path: str, blob: str | None) -> bool:
+        if index < self.start or (self.stop is not None and index >= self.stop):
+            return False
+        if self.shards == 1:
+            return True
+        return zlib.crc32((blob or path).encode("utf-8")) % self.shards == self.shard
+
+
+class PlanWriter:
+    """Stream :class:`RepositoryPlan` contents to ``stream`` as compact JSON Lines.
+
+    The first line identifies the format. Each plan is written as one
+    ``repository`` line (name, branch, commit range and file count) followed
+    by one ``file`` line per pending path with its blob id and size; files
+    deleted at the head commit have neither.
+    """
+
+    def __init__(self, stream: IO[str]) -> None:
+        self.stream = stream
+        self.summary = PlanSummary()
+        self._write({"kind": PLAN_FORMAT, "version": PLAN_FORMAT_VERSION})
+
+    def write(self, plan: RepositoryPlan, sizes: Mapping[Path, int]) -> None:
+        name = plan.config.name
+        self._write(
+            {
+                "kind": "repository",
+                "repo": name,
+                "branch": plan.branch,
+                "base": plan.base_commit,
+                "head": plan.head_commit,
+                "files": len(plan.pending_files),
+            }
+        )
+        for path in plan.pending_files:
+            size = sizes.get(path)
+            self._write(
+                {
+                    "kind": "file",
+                    "repo": name,
+                    "branch": plan.branch,
+                    "path": path.as_posix(),
+                    "blob": plan.blobs.get(path),
+                    "size": size,
+                }
+            )
+            self.summary.bytes += size or 0
+        self.summary.repositories += 1
+        self.summary.files += len(plan.pending_files)
+
+    def _write(self, record: dict[str, Any]) -> None:
+        self.stream.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")))
+        self.stream.write("\n")
+
+
+def read_plan(
+    lines: Iterable[str],
+    configs: Mapping[str, RepositoryConfig],
+    reference: Callable[[RepositoryConfig], RepositoryRef],
+    selection: PlanSelection | None = None,
+) -> tuple[list[RepositoryPlan], PlanSummary]:
+    """Rebuild the plans of a plan file, keeping only the selected file lines.
+
+    Restored plans are ``detached``: their documents are read from git objects
+    by blob id, so the local clone may be checked out at any commit. A plan
+    missing some of its file lines is ``partial`` and is never marked as
+    processed. The summary counts the selected files only.
+    """
+
+    selection = selection or PlanSelection()
+    plans: list[RepositoryPlan] = []
+    summary = PlanSummary()
+    current: RepositoryPlan | None = None
+    expected = 0
+    index = 0
+    for number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+            kind = record["kind"]
+            if number == 1:
+                if kind != PLAN_FORMAT or record.get("version") != PLAN_FORMAT_VERSION:
+                    raise PlanFileError(f"不支持的计划文件格式: {line.strip()[:80]}")
+                continue
+            if kind == "repository":
+                _close(current, expected)
+                config = configs.get(record["repo"])
+                if config is None:
+                    raise PlanFileError(f"计划中的仓库 {record['repo']} 不在配置中")
+                current = RepositoryPlan(
+                    config=config,
+                    repository=reference(config),
+                    head_commit=str(record["head"]),
+                    branch=record.get("branch"),
+                    base_commit=record.get("base"),
+                    detached=True,
+                )
+                expected = int(record["files"])
+                plans.append(current)
+                summary.repositories += 1
+            elif kind == "file":
+                if current is None or record["repo"] != current.config.name:
+                    raise PlanFileError("文件记录缺少对应的仓库记录")
+                path, blob = record["path"], record.get("blob")
+                if selection.includes(index, path, blob):
+                    current.pending_files.append(Path(path))
+                    if blob is not None:
+                        current.blobs[Path(path)] = blob
+                    summary.files += 1
+                    summary.bytes += record.get("size") or 0
+                else:
+                    current.partial = True
+                expected -= 1
+                index += 1
+            else:
+                raise PlanFileError(f"未知的记录类型 {kind!r}")
+        except (KeyError, TypeError, ValueError) as exc:
+            raise PlanFileError(f"计划文件第 {number} 行无效: {exc}") from exc
+    _close(current, expected)
+    return plans, summary
+
+
+def _close(plan: RepositoryPlan | None, expected: int) -> None:
+    if plan is not None and expected != 0:
+        raise PlanFileError(f"仓库 {plan.label} 的文件记录数量与声明不符")
+
+
+__all__ = [
+    "PLAN_FORMAT_VERSION",
+    "PlanFileError",
+    "PlanSelection",
+    "PlanSummary",
+    "PlanWriter",
+    "read_plan",
+]
@@ -0,0 +1,283 @@
+"""Publish translated output into a git repository through ``git fast-import``."""
+
+from __future__ import annotations
+
+import contextlib
+import hashlib
+import subprocess
+import time
+from collections.abc import Iterable, Iterator, Sequence
+from dataclasses import dataclass
+from pathlib import Path
+from typing import IO
+
+from git import Repo
+from git.exc import GitCommandError, GitError
+
+from pivot.config import PublishConfig, RepositoryConfig
+from pivot.state import StateStore
+
+FILE_MODE = "100644"
+IGNORED_SUFFIXES: tuple[str, ...] = (".partial",)
+
+
+class PublishError(RuntimeError):
+    """Raised when translated output cannot be published."""
+
+
+@dataclass(slots=True, frozen=True)
+class PublishSource:
+    """A source repository (branch) and the commit its translations reflect."""
+
+    name: str
+    url: str
+    branch: str
+    commit: str | None
+
+
+@dataclass(slots=True)
+class PublishResult:
+    """Outcome of a publish: the new commit (if any) and per-file counts."""
+
+    commit: str | None = None
+    # New blobs streamed, and changed files pointing at an already known blob.
+    written: int = 0
+    reused: int = 0
+    unchanged: int = 0
+    deleted: int = 0
+
+    @property
+    def changed(self) -> bool:
+        return self.commit is not None
+
+
+def collect_sources(
+    configs: Iterable[RepositoryConfig], state_store: StateStore
+) -> list[PublishSource]:
+    """Describe every tracked repository branch with its last synced commit."""
+
+    sources: list[PublishSource] = []
+    for config in configs:
+        state = state_store.get_repository_state(config.name)
+        if config.branches:
+            for branch in config.branches:
+                commit = state.branches.get(branch)
+                sources.append(PublishSource(config.name, config.url, branch, commit))
+        else:
+            sources.append(
+                PublishSource(config.name, config.url, config.branch, state.last_synced_commit)
+            )
+    return sources
+
+
+def git_blob_id(data: bytes) -> str:
+    """The object id git assigns to ``data`` stored as a blob."""
+
+    digest = hashlib.sha1(usedforsecurity=False)
+    digest.update(b"blob %d\0" % len(data))
+    digest.update(data)
+    return digest.hexdigest()
+
+
+class Publisher:
+    """Write a directory tree into a commit on the target repository's branch.
+
+    Files are hashed locally and compared with the branch tip, so only new
+    content is sent to ``git fast-import``; files whose blob already exists in
+    the repository are referenced by id, identical new files share one blob,
+    and files missing from the output are deleted. Nothing is committed when
+    the tree would not change. The target may be bare; a non-bare target with
+    the branch checked out only has its working tree refreshed when
+    ``update_working_tree`` is set.
+    """
+
+    def __init__(self, config: PublishConfig) -> None:
+        self.config = config
+
+    def publish(self, output_dir: Path, sources: Sequence[PublishSource]) -> PublishResult:
+        config = self.config
+        try:
+            repo = self._open_repository()
+        except (GitError, OSError) as exc:
+            raise PublishError(f"无法打开发布仓库 {config.repository}: {exc}") from exc
+        try:
+            return self._publish(repo, output_dir, sources)
+        except (GitError, OSError) as exc:
+            raise PublishError(f"发布到 {config.repository} 失败: {exc}") from exc
+        finally:
+            repo.close()
+
+    def _open_repository(self) -> Repo:
+        target = self.config.repository
+        if target.exists():
+            return Repo(target)
+        return Repo.init(target, bare=True, mkdir=True)
+
+    def _publish(
+        self, repo: Repo, output_dir: Path, sources: Sequence[PublishSource]
+    ) -> PublishResult:
+        ref = f"refs/heads/{self.config.branch}"
+        parent = _resolve(repo, ref)
+        existing = self._tree_entries(repo, parent)
+        known_blobs = set(existing.values())
+        result = PublishResult()
+
+        process = subprocess.Popen(
+            ["git", "--git-dir", str(repo.git_dir), "fast-import", "--quiet", "--done"],
+            stdin=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+        assert process.stdin is not None and process.stderr is not None  # for mypy
+        try:
+            try:
+                changes, present = self._write_blobs(
+                    process.stdin, output_dir, existing, known_blobs, result
+                )
+                deletions = sorted(existing.keys() - present)
+                result.deleted = len(deletions)
+                if changes or deletions:
+                    self._write_commit(process.stdin, ref, parent, changes, deletions, sources)
+                process.stdin.write(b"done\n")
+                process.stdin.close()
+            except BrokenPipeError:
+                pass
+            stderr = process.stderr.read().decode("utf-8", "replace")
+            if process.wait() != 0:
+                raise PublishError(f"git fast-import 失败: {stderr.strip()}")
+        finally:
+            # Without "done" fast-import updates no refs, so killing it is safe.
+            if process.poll() is None:
+                process.kill()
+            process.wait()
+            with contextlib.suppress(OSError):
+                process.stdin.close()
+            process.stderr.close()
+
+        if not (changes or deletions):
+            return result
+        result.commit = _resolve(repo, ref)
+        if self.config.update_working_tree:
+            self._update_working_tree(repo, ref, parent)
+        return result
+
+    def _tree_entries(self, repo: Repo, commit: str | None) -> dict[str, str]:
+        if commit is None:
+            return {}
+        prefix = self.config.path_prefix.strip("/")
+        scope = ["--", prefix] if prefix else []
+        listing = repo.git.ls_tree("-r", "-z", "--full-tree", commit, *scope)
+        entries: dict[str, str] = {}
+        for record in listing.split("\0"):
+            meta, _, name = record.partition("\t")
+            parts = meta.split()
+            if len(parts) == 3 and parts[1] == "blob":
+                entries[name] = parts[2]
+        return entries
+
+    def _write_blobs(
+        self,
+        stream: IO[bytes],
+        output_dir: Path,
+        existing: dict[str, str],
+        known_blobs: set[str],
+        result: PublishResult,
+    ) -> tuple[dict[str, str], set[str]]:
+        """Stream new blobs; return changed paths with their dataref and all paths."""
+
+        changes: dict[str, str] = {}
+        present: set[str] = set()
+        marks: dict[str, str] = {}
+        for source_path, target in self._iter_output(output_dir):
+            present.add(target)
+            data = source_path.read_bytes()
+            blob = git_blob_id(data)
+            if existing.get(target) == blob:
+                result.unchanged += 1
+            elif blob in known_blobs:
+                changes[target] = blob
+                result.reused += 1
+            elif blob in marks:
+                changes[target] = marks[blob]
+                result.reused += 1
+            else:
+                marks[blob] = changes[target] = f":{len(marks) + 1}"
+                stream.write(b"blob\nmark %s\ndata %d\n" % (marks[blob].encode(), len(data)))
+                stream.write(data)
+                stream.write(b"\n")
+                result.written += 1
+        return changes, present
+
+    def _iter_output(self, output_dir: Path) -> Iterator[tuple[Path, str]]:
+        prefix = self.config.path_prefix.strip("/")
+        for path in sorted(output_dir.rglob("*")):
+            relative = path.relative_to(output_dir)
+            if ".git" in relative.parts or not path.is_file():
+                continue
+            if path.suffix in IGNORED_SUFFIXES:
+                continue
+            name = relative.as_posix()
+            yield path, f"{prefix}/{name}" if prefix else name
+
+    def _write_commit(
+        self,
+        stream: IO[bytes],
+        ref: str,
+        parent: str | None,
+        changes: dict[str, str],
+        deletions: Sequence[str],
+        sources: Sequence[PublishSource],
+    ) -> None:
+        config = self.config
+        identity = f"{config.author_name} <{config.author_email}> {int(time.time())} +0000"
+        message = commit_message(sources).encode("utf-8")
+        stream.write(f"commit {ref}\ncommitter {identity}\n".encode())
+        stream.write(b"data %d\n" % len(message) + message + b"\n")
+        if parent is not None:
+            stream.write(f"from {parent}\n".encode())
+        for path in deletions:
+            stream.write(f"D {_quote(path)}\n".encode())
+        for path, dataref in sorted(changes.items()):
+            stream.write(f"M {FILE_MODE} {dataref} {_quote(path)}\n".encode())
+        stream.write(b"\n")
+
+    def _update_working_tree(self, repo: Repo, ref: str, parent: str | None) -> None:
+        if repo.bare or repo.head.is_detached or repo.head.ref.path != ref:
+            return
+        if parent is None:
+            repo.git.read_tree("--reset", "-u", ref)
+        else:
+            # Two-tree merge: refuses to clobber local modifications.
+            repo.git.read_tree("-m", "-u", parent, ref)
+
+
+def commit_message(sources: Sequence[PublishSource]) -> str:
+    """Commit message recording each source and its ``last_synced_commit``."""
+
+    lines = ["Publish translated documentation", ""]
+    for source in sources:
+        lines.append(f"Source: {source.name} {source.url} ({source.branch})")
+        lines.append(f"Last-Synced-Commit: {source.commit or '-'}")
+    return "\n".join(lines) + "\n"
+
+
+def _resolve(repo: Repo, ref: str) -> str | None:
+    try:
+        return repo.git.rev_parse("--verify", "--quiet", f"{ref}^{{commit}}") or None
+    except GitCommandError:
+        return None
+
+
+def _quote(path: str) -> str:
+    escaped = path.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return f'"{escaped}"'
+
+
+__all__ = [
+    "PublishError",
+    "PublishResult",
+    "PublishSource",
+    "Publisher",
+    "collect_sources",
+    "commit_message",
+    "git_blob_id",
+]
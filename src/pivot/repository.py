@@ -2,57 +2,313 @@
 
 from __future__ import annotations
 
-from collections.abc import Iterable
+import threading
+from collections import OrderedDict
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
 from pathlib import Path
+from typing import Any
 
 from git import GitCommandError, Repo
+from git.exc import GitError
 
 from pivot.config import RepositoryConfig
 
+POOL_DIRNAME = ".object-pool.git"
+DEPENDENT_REFS_PREFIX = "refs/dependents"
+DEFAULT_MAX_OPEN_REPOSITORIES = 8
+
 
 class RepositoryError(RuntimeError):
     """Raised when repository synchronization fails."""
 
 
+@dataclass(slots=True, frozen=True)
+class RepositoryRef:
+    """Lightweight pointer to a local clone, resolved to a handle on demand."""
+
+    name: str
+    path: Path
+
+
+class RepoHandlePool:
+    """Size-bounded LRU cache of ``git.Repo`` handles.
+
+    Each handle may keep persistent ``git cat-file`` helper processes and file
+    descriptors alive. Handles are leased for the duration of an operation;
+    when more than ``capacity`` are open, the least recently used unleased
+    handles are closed, which also stops their helper processes.
+
+    A lease is exclusive: GitPython's helper processes are not thread-safe, so
+    other threads leasing the same path wait until the handle is returned.
+    The holding thread may lease it again re-entrantly.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_MAX_OPEN_REPOSITORIES) -> None:
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = capacity
+        self._handles: OrderedDict[Path, Repo] = OrderedDict()
+        self._leases: dict[Path, int] = {}
+        self._owners: dict[Path, threading.RLock] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def open_count(self) -> int:
+        return len(self._handles)
+
+    @contextmanager
+    def lease(self, path: Path) -> Iterator[Repo]:
+        """Yield an open handle for ``path`` exclusively, keeping it from eviction."""
+
+        with self._lock:
+            repo = self._handles.get(path)
+            if repo is None:
+                repo = Repo(path)
+                self._handles[path] = repo
+            self._handles.move_to_end(path)
+            self._leases[path] = self._leases.get(path, 0) + 1
+            owner = self._owners.setdefault(path, threading.RLock())
+            self._evict_locked()
+        try:
+            with owner:
+                yield repo
+        finally:
+            with self._lock:
+                self._leases[path] -= 1
+                if not self._leases[path]:
+                    del self._leases[path]
+                    del self._owners[path]
+                self._evict_locked()
+
+    def discard(self, path: Path) -> None:
+        """Close and forget the handle for ``path`` if it is not leased."""
+
+        with self._lock:
+            if path in self._handles and path not in self._leases:
+                self._handles.pop(path).close()
+
+    def close(self) -> None:
+        """Close every unleased handle."""
+
+        with self._lock:
+            for path in [p for p in self._handles if p not in self._leases]:
+                self._handles.pop(path).close()
+
+    def _evict_locked(self) -> None:
+        if len(self._handles) <= self.capacity:
+            return
+        for path in list(self._handles):
+            if len(self._handles) <= self.capacity:
+                break
+            if path not in self._leases:
+                self._handles.pop(path).close()
+
+
 class RepositoryManager:
-    """Manage cloning and updating repositories defined in configuration."""
+    """Manage cloning and updating repositories defined in configuration.
 
-    def __init__(self, base_dir: Path) -> None:
+    With ``shared_objects`` enabled, every repository fetches into one bare
+    multi-remote pool first and borrows its objects through git alternates, so
+    forks and release branches of the same upstream download and store their
+    common history once. All pool updates are serialized by a manager-level
+    lock, so concurrent syncs never race on creating or fetching into it.
+    """
+
+    def __init__(
+        self,
+        base_dir: Path,
+        *,
+        shared_objects: bool = False,
+        max_open_repositories: int = DEFAULT_MAX_OPEN_REPOSITORIES,
+    ) -> None:
         self.base_dir = base_dir
         self.base_dir.mkdir(parents=True, exist_ok=True)
+        self.shared_objects = shared_objects
+        self.handles = RepoHandlePool(max_open_repositories)
+        self._pool_lock = threading.RLock()
+
+    @property
+    def pool_path(self) -> Path:
+        """Location of the shared bare object pool."""
+
+        return self.base_dir / POOL_DIRNAME
 
     def local_path(self, config: RepositoryConfig) -> Path:
         """Return the local path for a repository."""
 
         return self.base_dir / config.name
 
-    def sync(self, config: RepositoryConfig) -> Repo:
-        """Clone or fast-forward the repository to the latest remote state."""
+    def reference(self, config: RepositoryConfig) -> RepositoryRef:
+        """Return the lightweight reference for a repository's local clone."""
+
+        return RepositoryRef(name=config.name, path=self.local_path(config))
+
+    @contextmanager
+    def open(self, ref: RepositoryRef) -> Iterator[Repo]:
+        """Lease a pooled ``Repo`` handle for ``ref``."""
+
+        with self.handles.lease(ref.path) as repo:
+            yield repo
+
+    def sync(self, config: RepositoryConfig) -> RepositoryRef:
+        """Clone or fast-forward the repository to the latest remote state.
+
+        Returns a reference rather than a handle; use :meth:`open` to lease one
+        from the manager's bounded handle pool.
+        """
 
         target_dir = self.local_path(config)
+        object_pool: Repo | None = None
         try:
-            if target_dir.exists():
-                repo = Repo(target_dir)
-                self._fetch_and_update(repo, config)
-            else:
-                repo = Repo.clone_from(config.url, target_dir, branch=config.branch)
-                repo.git.checkout(config.branch)
-            return repo
-        except GitCommandError as exc:  # pragma: no cover - git errors depend on environment
+            if self.shared_objects:
+                object_pool = self._fetch_into_pool(config)
+            fresh = not target_dir.exists()
+            if fresh:
+                options: dict[str, Any] = {"branch": config.tracked_branches[0]}
+                if object_pool is not None:
+                    options["reference"] = str(object_pool.git_dir)
+                Repo.clone_from(config.url, target_dir, **options).close()
+            with self.handles.lease(target_dir) as repo:
+                if fresh:
+                    repo.git.checkout(config.tracked_branches[0])
+                else:
+                    if object_pool is not None:
+                        self._attach_to_pool(repo, object_pool)
+                    self._fetch_and_update(repo, config)
+            return self.reference(config)
+        except (GitError, OSError) as exc:  # pragma: no cover - git errors depend on environment
             raise RepositoryError(f"同步仓库 {config.name} 失败: {exc}") from exc
+        finally:
+            if object_pool is not None:
+                object_pool.close()
+
+    @staticmethod
+    def branch_commit(repo: Repo, branch: str) -> str:
+        """Return the fetched head commit of ``branch`` without checking it out."""
+
+        try:
+            return repo.git.rev_parse("--verify", f"refs/remotes/origin/{branch}^{{commit}}")
+        except GitCommandError as exc:
+            raise RepositoryError(f"远程分支 {branch} 不存在: {exc}") from exc
 
     def _fetch_and_update(self, repo: Repo, config: RepositoryConfig) -> None:
+        # Every remote branch is fetched; only the first tracked one is checked out.
+        branch = config.tracked_branches[0]
         repo.remotes.origin.fetch(prune=True)
-        repo.git.checkout(config.branch)
-        repo.git.pull("origin", config.branch, "--ff-only")
+        repo.git.checkout(branch)
+        repo.git.pull("origin", branch, "--ff-only")
 
-    def sync_all(self, configs: Iterable[RepositoryConfig]) -> dict[str, Repo]:
-        """Synchronize all repositories and return mapping by name."""
+    def sync_all(self, configs: Iterable[RepositoryConfig]) -> dict[str, RepositoryRef]:
+        """Synchronize all repositories and return their references by name."""
 
-        result: dict[str, Repo] = {}
+        result: dict[str, RepositoryRef] = {}
         for cfg in configs:
-            result[cfg.name] = self.sync(cfg)
+            self.sync(cfg)
+            result[cfg.name] = self.reference(cfg)
         return result
 
+    def collect_pool_garbage(self, configs: Iterable[RepositoryConfig]) -> None:
+        """Garbage-collect the shared pool without breaking dependent clones.
+
+        Clones keep only objects missing from the pool, so before pruning, the
+        refs of every dependent clone are mirrored into the pool under
+        ``refs/dependents/<name>/``. Anything a clone can still reach therefore
+        stays reachable in the pool. Mirrors are dropped only once the clone
+        itself is gone: a clone of a repository that is no longer configured
+        still borrows objects from the pool through its alternates.
+        """
+
+        with self._pool_lock:
+            if not self.pool_path.exists():
+                return
+            try:
+                pool = self._open_pool()
+            except (GitError, OSError) as exc:  # pragma: no cover - depends on environment
+                raise RepositoryError(f"打开共享对象池失败: {exc}") from exc
+            try:
+                self._collect_pool_garbage(pool, configs)
+            finally:
+                pool.close()
+
+    def _collect_pool_garbage(self, pool: Repo, configs: Iterable[RepositoryConfig]) -> None:
+        active = {config.name: config for config in configs}
+        try:
+            for ref in pool.git.for_each_ref("--format=%(refname)", DEPENDENT_REFS_PREFIX).split():
+                name = ref[len(DEPENDENT_REFS_PREFIX) + 1 :].split("/", 1)[0]
+                if not (self.base_dir / name).exists():
+                    pool.git.update_ref("-d", ref)
+            for name, config in active.items():
+                clone = self.local_path(config)
+                if clone.exists():
+                    pool.git.fetch(
+                        "--no-tags",
+                        "--prune",
+                        str(clone),
+                        f"+refs/heads/*:{DEPENDENT_REFS_PREFIX}/{name}/heads/*",
+                        f"+refs/remotes/*:{DEPENDENT_REFS_PREFIX}/{name}/remotes/*",
+                        f"+refs/tags/*:{DEPENDENT_REFS_PREFIX}/{name}/tags/*",
+                        f"+HEAD:{DEPENDENT_REFS_PREFIX}/{name}/HEAD",
+                    )
+            pool.git.gc("--quiet")
+        except GitCommandError as exc:  # pragma: no cover - git errors depend on environment
+            raise RepositoryError(f"共享对象池垃圾回收失败: {exc}") from exc
+
+    def _fetch_into_pool(self, config: RepositoryConfig) -> Repo:
+        with self._pool_lock:
+            pool = self._open_pool()
+            try:
+                self._fetch_remote_into_pool(pool, config)
+            except BaseException:
+                pool.close()
+                raise
+            return pool
+
+    def _open_pool(self) -> Repo:
+        if self.pool_path.exists():
+            pool = Repo(self.pool_path)
+        else:
+            pool = Repo.init(self.pool_path, bare=True)
+        # Automatic gc/maintenance would prune without the dependent-ref
+        # mirrors that collect_pool_garbage() sets up, so it is disabled.
+        with pool.config_writer() as writer:
+            writer.set_value("gc", "auto", 0)
+            writer.set_value("maintenance", "auto", "false")
+        return pool
+
+    def _fetch_remote_into_pool(self, pool: Repo, config: RepositoryConfig) -> None:
+        remote_names = {remote.name for remote in pool.remotes}
+        if config.name in remote_names:
+            pool.git.remote("set-url", config.name, config.url)
+        else:
+            pool.git.remote("add", "--no-tags", config.name, config.url)
+        pool.git.fetch(
+            "--no-tags",
+            config.name,
+            *(
+                f"+refs/heads/{branch}:refs/remotes/{config.name}/{branch}"
+                for branch in config.tracked_branches
+            ),
+        )
+
+    def _attach_to_pool(self, repo: Repo, pool: Repo) -> None:
+        alternates = Path(repo.git_dir) / "objects" / "info" / "alternates"
+        pool_objects = str(Path(pool.git_dir).resolve() / "objects")
+        existing = alternates.read_text(encoding="utf-8").split() if alternates.exists() else []
+        if pool_objects in existing:
+            return
+        alternates.parent.mkdir(parents=True, exist_ok=True)
+        alternates.write_text("\n".join([*existing, pool_objects]) + "\n", encoding="utf-8")
+        # Drop local copies of objects the pool now provides.
+        repo.git.repack("-a", "-d", "-l", "-q")
+        repo.git.prune_packed()
+
 
-__all__ = ["RepositoryError", "RepositoryManager"]
+__all__ = [
+    "DEFAULT_MAX_OPEN_REPOSITORIES",
+    "RepoHandlePool",
+    "RepositoryError",
+    "RepositoryManager",
+    "RepositoryRef",
+]
@@ -0,0 +1,454 @@
+"""Split Markdown and YAML documents into translatable segments."""
+
+from __future__ import annotations
+
+import json
+import mmap
+import re
+from collections.abc import Generator, Iterator, Sequence
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from markdown_it import MarkdownIt
+from ruamel.yaml import YAML
+from ruamel.yaml.error import YAMLError
+from ruamel.yaml.events import (
+    AliasEvent,
+    CollectionEndEvent,
+    CollectionStartEvent,
+    MappingStartEvent,
+    ScalarEvent,
+)
+
+MARKDOWN_SUFFIXES: tuple[str, ...] = (".md", ".markdown")
+YAML_SUFFIXES: tuple[str, ...] = (".yaml", ".yml")
+DEFAULT_CHUNK_BYTES = 64 * 1024
+# Bump whenever segmentation output changes; it keys the on-disk parse cache.
+SEGMENTER_VERSION = 3
+
+_LETTER_RE = re.compile(r"[^\W\d_]")
+_LIST_MARKER_RE = re.compile(r"(?:[-*+]|\d{1,9}[.)])[ \t]+(?:\[[ xX]\][ \t]+)?")
+_TASK_RE = re.compile(r"^\[[ xX]\][ \t]+")
+# Fences are tracked at any depth: after indentation, quote markers or a bullet.
+_FENCE_BYTES_RE = re.compile(rb"^[ \t>]*(?:(?:[-*+]|\d{1,9}[.)])[ \t]+)?(`{3,}|~{3,})(.*)")
+# HTML blocks that may contain blank lines, with the marker that closes them.
+_HTML_BYTES_RE = re.compile(
+    rb"^[ \t>]*<(?:(pre|script|style|textarea)(?=[ \t>]|\r?\n|$)"
+    rb"|(!--)|(\?)|(!\[CDATA\[)|(![A-Za-z]))",
+    re.IGNORECASE,
+)
+_HEADING_BYTES_RE = re.compile(rb"^ {0,3}#{1,6}(?:[ \t]|\r?\n|$)")
+_YAML_PLAIN_UNSAFE = re.compile(r"(?::\s|\s#|^[-?:,\[\]{}#&*!|>'\"%@`\s]|\s$|:$)")
+
+_MARKDOWN = MarkdownIt("commonmark").enable("table")
+
+
+@dataclass(slots=True, frozen=True)
+class Segment:
+    """A translatable span of a document.
+
+    ``start``/``end`` delimit the span in the source text; ``text`` is the span's
+    content with structural prefixes (indentation, quote markers) removed, and
+    ``indent`` is re-applied to every continuation line when rendering.
+    """
+
+    start: int
+    end: int
+    text: str
+    indent: str = ""
+    kind: str = "text"
+
+
+@dataclass(slots=True)
+class SegmentedDocument:
+    """A source document together with its translatable segments."""
+
+    source: str
+    segments: list[Segment] = field(default_factory=list)
+
+    def render(self, translations: Sequence[str]) -> str:
+        """Rebuild the document with each segment replaced by its translation."""
+
+        if len(translations) != len(self.segments):
+            msg = f"译文数量 {len(translations)} 与片段数量 {len(self.segments)} 不一致"
+            raise ValueError(msg)
+
+        parts: list[str] = []
+        cursor = 0
+        for segment, translation in zip(self.segments, translations, strict=True):
+            parts.append(self.source[cursor : segment.start])
+            parts.append(format_translation(segment, translation))
+            cursor = segment.end
+        parts.append(self.source[cursor:])
+        return "".join(parts)
+
+
+def is_supported(path: Path) -> bool:
+    """Whether ``path`` has a suffix the segmenter understands."""
+
+    suffix = path.suffix.lower()
+    return suffix in MARKDOWN_SUFFIXES or suffix in YAML_SUFFIXES
+
+
+def segment_document(path: Path, text: str) -> SegmentedDocument:
+    """Segment ``text`` according to the file type implied by ``path``."""
+
+    suffix = path.suffix.lower()
+    if suffix in MARKDOWN_SUFFIXES:
+        return segment_markdown(text)
+    if suffix in YAML_SUFFIXES:
+        return segment_yaml(text)
+    return SegmentedDocument(source=text)
+
+
+def format_translation(segment: Segment, translation: str) -> str:
+    """Render a translation so it fits back into the segment's syntactic slot."""
+
+    text = translation.strip()
+    if segment.kind == "cell":
+        return text.replace("\n", " ").replace("|", "\\|")
+    if segment.kind == "yaml-double":
+        return _quote_double(text)
+    if segment.kind == "yaml-single":
+        if "\n" in text:
+            return _quote_double(text)
+        return "'" + text.replace("'", "''") + "'"
+    if segment.kind == "yaml-plain":
+        if "\n" in text or _YAML_PLAIN_UNSAFE.search(text):
+            return _quote_double(text)
+        return text
+    if segment.kind == "heading":
+        # A heading is a single line; a line break would start a paragraph.
+        return " ".join(line.strip() for line in text.split("\n") if line.strip())
+    first, *rest = text.split("\n")
+    return "\n".join([first, *(segment.indent + line if line else line for line in rest)])
+
+
+def segment_markdown(text: str) -> SegmentedDocument:
+    """Segment Markdown prose, leaving code, HTML and front matter structure intact.
+
+    Block structure comes from ``markdown-it-py``; each paragraph, heading and
+    table cell it reports is mapped back onto its exact span in ``text`` so
+    everything outside those spans is reproduced byte for byte.
+    """
+
+    document = SegmentedDocument(source=text)
+    segments = document.segments
+    lines = _split_lines(text)
+    parsed = text
+
+    front_end = _front_matter_end(lines)
+    if front_end is not None:
+        start = lines[1][0]
+        front = text[start : lines[front_end][0]]
+        segments.extend(_shift(segment_yaml(front).segments, start))
+        # Blank the front matter out so line numbers still match the source.
+        body_start = lines[front_end + 1][0] if front_end + 1 < len(lines) else len(text)
+        parsed = "\n" * (front_end + 1) + text[body_start:]
+
+    row_cursor: dict[int, int] = {}
+    in_cell = False
+    in_heading = False
+    for token in _MARKDOWN.parse(parsed):
+        if token.type in ("heading_open", "heading_close"):
+            in_heading = token.nesting == 1
+        elif token.type in ("th_open", "td_open", "th_close", "td_close"):
+            in_cell = token.nesting == 1
+        elif token.type == "tr_open":
+            row_cursor.clear()
+        if token.type != "inline" or token.map is None:
+            continue
+        if not _is_translatable(token.content):
+            continue
+        if in_cell:
+            segments.extend(_cell_segment(lines, token.map[0], token.content, row_cursor))
+        else:
+            kind = "heading" if in_heading else "text"
+            segments.extend(_inline_segment(lines, token.map[0], token.content, kind))
+    return document
+
+
+def segment_yaml(text: str) -> SegmentedDocument:
+    """Segment prose-like YAML string values, leaving keys and data scalars intact.
+
+    Scalars are located and decoded with ``ruamel.yaml``'s event parser, so the
+    segment text is the loaded value (escapes resolved) and every translation
+    is re-encoded for the scalar style it replaces.
+    """
+
+    document = SegmentedDocument(source=text)
+    try:
+        events = list(YAML(typ="safe", pure=True).parse(text))
+    except YAMLError:
+        return document
+
+    # One entry per open block collection: [is_mapping, next_scalar_is_key].
+    stack: list[list[bool]] = []
+    flow_depth = 0
+    for event in events:
+        is_key = False
+        if isinstance(event, (ScalarEvent, AliasEvent, CollectionStartEvent)) and stack:
+            frame = stack[-1]
+            if frame[0]:
+                is_key = frame[1]
+                frame[1] = not frame[1]
+        if isinstance(event, CollectionStartEvent):
+            if flow_depth or event.flow_style:
+                flow_depth += 1
+            else:
+                stack.append([isinstance(event, MappingStartEvent), True])
+        elif isinstance(event, CollectionEndEvent):
+            if flow_depth:
+                flow_depth -= 1
+            elif stack:
+                stack.pop()
+        elif isinstance(event, ScalarEvent) and not is_key and not flow_depth and stack:
+            if event.tag is None or event.tag == "!":
+                document.segments.extend(_yaml_scalar(text, event))
+    return document
+
+
+def iter_markdown_chunks(
+    path: Path, max_chunk_bytes: int = DEFAULT_CHUNK_BYTES
+) -> Generator[str, None, None]:
+    """Yield independently segmentable chunks of a (large) Markdown file.
+
+    The file is memory-mapped rather than read into a string, and split at
+    heading lines, falling back to top-level paragraph breaks when a section
+    outgrows ``max_chunk_bytes``. Boundaries never fall inside a code fence,
+    an HTML block or front matter, so each chunk segments exactly as it would
+    within the whole file.
+    """
+
+    with path.open("rb") as fh:
+        if fh.seek(0, 2) == 0:
+            return
+        with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as view:
+            yield from _chunk_view(view, max_chunk_bytes)
+
+
+def _chunk_view(view: mmap.mmap, max_chunk_bytes: int) -> Iterator[str]:
+    size = len(view)
+    chunk_start = 0
+    last_heading = 0
+    last_break = 0
+    after_blank = False
+    fence: bytes | None = None
+    html_end: bytes | None = None
+    position = 0
+
+    if view[:4].rstrip(b"\r\n") == b"---":
+        fence = b"---"
+        position = view.find(b"\n") + 1 or size
+
+    while position < size:
+        newline = view.find(b"\n", position)
+        line_end = size if newline == -1 else newline + 1
+        line = view[position:line_end]
+        stripped = line.strip()
+
+        if fence is not None:
+            if fence == b"---":
+                if stripped in {b"---", b"..."}:
+                    fence = None
+            else:
+                closing = _FENCE_BYTES_RE.match(line)
+                if closing and closing.group(1).startswith(fence) and not closing.group(2).strip():
+                    fence = None
+            after_blank = False
+            position = line_end
+            continue
+        if html_end is not None:
+            if html_end in line.lower():
+                html_end = None
+            after_blank = False
+            position = line_end
+            continue
+
+        if position > chunk_start:
+            if _HEADING_BYTES_RE.match(line):
+                last_heading = position
+            elif after_blank and stripped and line[:1] not in b" \t":
+                # Only a paragraph break at the top level: a blank line inside
+                # a list item or indented code is followed by indented text.
+                last_break = position
+            if position - chunk_start >= max_chunk_bytes:
+                boundary = last_heading if last_heading > chunk_start else last_break
+                if boundary > chunk_start:
+                    yield view[chunk_start:boundary].decode("utf-8")
+                    chunk_start = boundary
+
+        after_blank = not stripped
+        fence_match = _FENCE_BYTES_RE.match(line)
+        html_match = _HTML_BYTES_RE.match(line)
+        if fence_match:
+            fence = fence_match.group(1)
+        elif html_match:
+            tag, comment, instruction, cdata, _ = html_match.groups()
+            if tag:
+                marker = b"</" + tag.lower()
+            elif comment:
+                marker = b"-->"
+            elif instruction:
+                marker = b"?>"
+            elif cdata:
+                marker = b"]]>"
+            else:
+                marker = b">"
+            if marker not in line[html_match.end() :].lower():
+                html_end = marker
+        position = line_end
+
+    if chunk_start < size:
+        yield view[chunk_start:size].decode("utf-8")
+
+
+def _split_lines(text: str) -> list[tuple[int, str]]:
+    lines: list[tuple[int, str]] = []
+    offset = 0
+    for raw in text.splitlines(keepends=True):
+        lines.append((offset, raw.rstrip("\r\n")))
+        offset += len(raw)
+    return lines
+
+
+def _front_matter_end(lines: Sequence[tuple[int, str]]) -> int | None:
+    if not lines or lines[0][1].strip() != "---":
+        return None
+    for closing in range(1, len(lines)):
+        if lines[closing][1].strip() in {"---", "..."}:
+            return closing
+    return None
+
+
+def _is_translatable(text: str) -> bool:
+    return bool(_LETTER_RE.search(text))
+
+
+def _shift(segments: Sequence[Segment], delta: int) -> list[Segment]:
+    return [Segment(s.start + delta, s.end + delta, s.text, s.indent, s.kind) for s in segments]
+
+
+def _inline_segment(
+    lines: Sequence[tuple[int, str]], first_line: int, content: str, kind: str = "text"
+) -> list[Segment]:
+    """Map a paragraph's or heading's inline content back onto source offsets.
+
+    markdown-it strips container prefixes (indentation, ``>`` markers, list
+    bullets) from each line, so every content line is a suffix of its source
+    line, apart from a closing ATX sequence which is searched for instead.
+    """
+
+    parts = content.split("\n")
+    task = _TASK_RE.match(parts[0])
+    if task:
+        parts[0] = parts[0][task.end() :]
+    if first_line + len(parts) > len(lines):
+        return []
+
+    starts: list[int] = []
+    prefixes: list[str] = []
+    for number, part in enumerate(parts):
+        line = lines[first_line + number][1]
+        if line.endswith(part):
+            column = len(line) - len(part)
+        elif line.rstrip().endswith(part):
+            column = len(line.rstrip()) - len(part)
+        else:
+            column = line.rfind(part)
+            if column < 0:
+                return []
+        starts.append(lines[first_line + number][0] + column)
+        prefixes.append(line[:column])
+
+    body = "\n".join(part.rstrip() for part in parts)
+    if not _is_translatable(body):
+        return []
+    end = starts[-1] + len(parts[-1].rstrip())
+    if len(prefixes) > 1:
+        indent = prefixes[1]
+    else:
+        # Continuation lines of a list item align with the text after its bullet.
+        indent = _LIST_MARKER_RE.sub(lambda m: " " * len(m.group()), prefixes[0])
+    return [Segment(start=starts[0], end=end, text=body, indent=indent, kind=kind)]
+
+
+def _cell_segment(
+    lines: Sequence[tuple[int, str]], line_number: int, content: str, cursor: dict[int, int]
+) -> list[Segment]:
+    offset, line = lines[line_number]
+    stripped = content.strip()
+    position = cursor.get(line_number, 0)
+    column = line.find(stripped, position)
+    raw = stripped
+    if column < 0 and "|" in stripped:
+        raw = stripped.replace("|", "\\|")
+        column = line.find(raw, position)
+    if column < 0:
+        return []
+    cursor[line_number] = column + len(raw)
+    return [
+        Segment(start=offset + column, end=offset + column + len(raw), text=stripped, kind="cell")
+    ]
+
+
+def _yaml_scalar(text: str, event: ScalarEvent) -> list[Segment]:
+    value = event.value
+    start = event.start_mark.index
+    end = event.end_mark.index
+    style = event.style
+    if style in ("|", ">"):
+        return _yaml_block(text, start, end, value, folded=style == ">")
+    if not _is_translatable(value) or len(value.split()) < 2 or "://" in value:
+        return []
+    kind = {'"': "yaml-double", "'": "yaml-single"}.get(style or "", "yaml-plain")
+    raw = text[start:end]
+    if kind == "yaml-plain":
+        raw = raw.rstrip()
+    return [Segment(start=start, end=start + len(raw), text=value, kind=kind)]
+
+
+def _yaml_block(text: str, start: int, end: int, value: str, *, folded: bool) -> list[Segment]:
+    if not _is_translatable(value):
+        return []
+    header_end = text.find("\n", start)
+    if header_end < 0:
+        return []
+    content = text[header_end + 1 : end]
+    body_lines = content.rstrip().split("\n")
+    first = next((line for line in body_lines if line.strip()), None)
+    if first is None:
+        return []
+    block_indent = len(first) - len(first.lstrip(" "))
+    begin = header_end + 1 + block_indent
+    finish = header_end + 1 + len(content.rstrip())
+    if folded:
+        # Keep the source line breaks; re-emitting the folded value as one line
+        # would change the file even when the text is left untranslated.
+        body = "\n".join(line[block_indent:] for line in body_lines)
+    else:
+        body = value.rstrip("\n")
+    return [
+        Segment(start=begin, end=finish, text=body, indent=" " * block_indent, kind="yaml-block")
+    ]
+
+
+def _quote_double(text: str) -> str:
+    # JSON string syntax is a subset of YAML's double-quoted style.
+    return json.dumps(text, ensure_ascii=False)
+
+
+__all__ = [
+    "DEFAULT_CHUNK_BYTES",
+    "MARKDOWN_SUFFIXES",
+    "SEGMENTER_VERSION",
+    "YAML_SUFFIXES",
+    "Segment",
+    "SegmentedDocument",
+    "format_translation",
+    "is_supported",
+    "iter_markdown_chunks",
+    "segment_document",
+    "segment_markdown",
+    "segment_yaml",
+]
@@ -0,0 +1,280 @@
+"""Local stand-in for an OpenAI-compatible translation API, for load testing."""
+
+from __future__ import annotations
+
+import json
+import random
+import subprocess
+import sys
+import threading
+import time
+from dataclasses import asdict, dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import TracebackType
+from typing import Any
+
+LATENCY_DISTRIBUTIONS: tuple[str, ...] = ("fixed", "uniform", "exponential", "lognormal")
+PSEUDO_PREFIX = "〔译〕"
+
+
+@dataclass(slots=True)
+class StandinSettings:
+    """Behaviour of the stand-in provider.
+
+    ``latency_ms`` is the median (lognormal), mean (exponential) or centre
+    (fixed/uniform) response time; ``latency_spread`` is the lognormal sigma or
+    the relative half-width of the uniform range.
+    """
+
+    latency: str = "lognormal"
+    latency_ms: float = 50.0
+    latency_spread: float = 0.5
+    error_rate: float = 0.0
+    rate_limit_rate: float = 0.0
+    retry_after_seconds: float = 1.0
+    seed: int = 0
+
+    def __post_init__(self) -> None:
+        if self.latency not in LATENCY_DISTRIBUTIONS:
+            supported = ", ".join(LATENCY_DISTRIBUTIONS)
+            raise ValueError(f"未知的延迟分布 {self.latency!r}（可选: {supported}）")
+        if not 0 <= self.error_rate + self.rate_limit_rate <= 1:
+            raise ValueError("error_rate 与 rate_limit_rate 之和必须在 0 到 1 之间")
+
+
+def pseudo_translate(text: str) -> str:
+    """Deterministic pseudo-translation that keeps placeholders and markup intact."""
+
+    return f"{PSEUDO_PREFIX}{text}"
+
+
+class _Behaviour:
+    """Thread-safe source of latencies and injected failures."""
+
+    def __init__(self, settings: StandinSettings) -> None:
+        self.settings = settings
+        self._random = random.Random(settings.seed)
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+        self.rate_limited = 0
+
+    def draw(self) -> tuple[float, int]:
+        settings = self.settings
+        with self._lock:
+            self.requests += 1
+            roll = self._random.random()
+            seconds = self._latency() / 1000.0
+            if roll < settings.rate_limit_rate:
+                self.rate_limited += 1
+                return seconds, 429
+            if roll < settings.rate_limit_rate + settings.error_rate:
+                self.errors += 1
+                return seconds, 500
+            return seconds, 200
+
+    def _latency(self) -> float:
+        settings = self.settings
+        centre = settings.latency_ms
+        if settings.latency == "fixed":
+            return centre
+        if settings.latency == "uniform":
+            spread = centre * settings.latency_spread
+            return max(0.0, self._random.uniform(centre - spread, centre + spread))
+        if settings.latency == "exponential":
+            return self._random.expovariate(1.0 / centre) if centre > 0 else 0.0
+        return self._random.lognormvariate(0.0, settings.latency_spread) * centre
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: _StandinHTTPServer
+
+    def do_POST(self) -> None:  # noqa: N802 - http.server naming
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._reply(404, {"error": {"message": "not found"}})
+            return
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            payload = json.loads(self.rfile.read(length) or b"{}")
+            messages = payload["messages"]
+            text = str(messages[-1]["content"])
+        except (ValueError, KeyError, IndexError, TypeError):
+            self._reply(400, {"error": {"message": "invalid request"}})
+            return
+
+        delay, status = self.server.behaviour.draw()
+        if delay:
+            time.sleep(delay)
+        if status == 429:
+            retry_after = self.server.behaviour.settings.retry_after_seconds
+            self._reply(429, {"error": {"message": "rate limited"}}, retry_after=retry_after)
+            return
+        if status != 200:
+            self._reply(status, {"error": {"message": "injected failure"}})
+            return
+        self._reply(
+            200,
+            {
+                "object": "chat.completion",
+                "model": payload.get("model", "standin"),
+                "choices": [
+                    {
+                        "index": 0,
+                        "finish_reason": "stop",
+                        "message": {"role": "assistant", "content": pseudo_translate(text)},
+                    }
+                ],
+            },
+        )
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002 - stdlib signature
+        return
+
+    def _reply(
+        self, status: int, body: dict[str, Any], *, retry_after: float | None = None
+    ) -> None:
+        data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        if retry_after is not None:
+            self.send_header("Retry-After", f"{retry_after:g}")
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class _StandinHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+    def __init__(self, address: tuple[str, int], behaviour: _Behaviour) -> None:
+        super().__init__(address, _Handler)
+        self.behaviour = behaviour
+
+
+class StandinServer:
+    """Run the stand-in provider on a background thread.
+
+    Point ``TranslationProviderConfig.base_url`` at :attr:`base_url`.
+    """
+
+    def __init__(
+        self,
+        settings: StandinSettings | None = None,
+        *,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ) -> None:
+        self.settings = settings or StandinSettings()
+        self.behaviour = _Behaviour(self.settings)
+        self._server = _StandinHTTPServer((host, port), self.behaviour)
+        self._thread: threading.Thread | None = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host!s}:{port}/v1"
+
+    def start(self) -> StandinServer:
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name="pivot-standin", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def serve_forever(self) -> None:
+        """Serve on the calling thread until interrupted."""
+
+        self._server.serve_forever()
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self) -> StandinServer:
+        return self.start()
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.stop()
+
+
+class StandinProcess:
+    """Run the stand-in provider in a child Python process.
+
+    Keeps the server's threads and buffers out of the calling process, so
+    measurements such as peak RSS reflect only the caller's own work.
+    """
+
+    def __init__(self, settings: StandinSettings | None = None, *, host: str = "127.0.0.1") -> None:
+        self.settings = settings or StandinSettings()
+        self.host = host
+        self.base_url = ""
+        self._process: subprocess.Popen[str] | None = None
+
+    def start(self) -> StandinProcess:
+        self._process = subprocess.Popen(
+            [sys.executable, "-m", "pivot.standin", self.host, json.dumps(asdict(self.settings))],
+            stdout=subprocess.PIPE,
+            text=True,
+        )
+        assert self._process.stdout is not None  # for mypy
+        self.base_url = self._process.stdout.readline().strip()
+        if not self.base_url:
+            self.stop()
+            raise RuntimeError("替身服务启动失败")
+        return self
+
+    def stop(self) -> None:
+        if self._process is None:
+            return
+        self._process.terminate()
+        try:
+            self._process.wait(timeout=10)
+        except subprocess.TimeoutExpired:  # pragma: no cover - defensive
+            self._process.kill()
+            self._process.wait()
+        if self._process.stdout is not None:
+            self._process.stdout.close()
+        self._process = None
+
+    def __enter__(self) -> StandinProcess:
+        return self.start()
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.stop()
+
+
+def _main(argv: list[str]) -> None:
+    host, raw_settings = argv
+    server = StandinServer(StandinSettings(**json.loads(raw_settings)), host=host)
+    print(server.base_url, flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:  # pragma: no cover - interactive use
+        pass
+
+
+if __name__ == "__main__":  # pragma: no cover - exercised through StandinProcess
+    _main(sys.argv[1:])
+
+
+__all__ = [
+    "LATENCY_DISTRIBUTIONS",
+    "StandinProcess",
+    "StandinServer",
+    "StandinSettings",
+    "pseudo_translate",
+]
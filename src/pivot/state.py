@@ -3,8 +3,9 @@
 from __future__ import annotations
 
 import json
-from collections.abc import Mapping
-from dataclasses import dataclass
+import threading
+from collections.abc import Callable, Mapping
+from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Any
 
@@ -15,16 +16,157 @@ class StateError(RuntimeError):
 
 @dataclass(slots=True)
 class RepositoryState:
-    """Persisted information about a repository run."""
+    """Persisted information about a repository run.
+
+    ``branches`` holds one sync pointer per tracked branch for repositories
+    configured with several branches.
+    """
 
     last_synced_commit: str | None = None
+    branches: dict[str, str] = field(default_factory=dict)
 
     @classmethod
     def from_mapping(cls, data: Mapping[str, Any]) -> RepositoryState:
-        return cls(last_synced_commit=data.get("last_synced_commit"))
+        raw_branches = data.get("branches")
+        branches = (
+            {str(name): str(commit) for name, commit in raw_branches.items()}
+            if isinstance(raw_branches, Mapping)
+            else {}
+        )
+        return cls(last_synced_commit=data.get("last_synced_commit"), branches=branches)
+
+    def to_dict(self) -> dict[str, Any]:
+        data: dict[str, Any] = {"last_synced_commit": self.last_synced_commit}
+        if self.branches:
+            data["branches"] = dict(self.branches)
+        return data
+
+
+@dataclass(slots=True, frozen=True)
+class OutputRecord:
+    """The blob a translated output file was produced from.
+
+    ``size`` and ``mtime_ns`` are the file's as recorded, so an output changed
+    since then is not mistaken for a translation of ``blob``.
+    """
+
+    blob: str
+    segments: int
+    size: int
+    mtime_ns: int
+
+
+class OutputIndex:
+    """Persist which blob each output file under ``output_dir`` translates.
+
+    Paths are stored per repository, relative to the output directory, so a
+    blob translated for one branch in an earlier run can be copied for another
+    branch instead of being translated again.
+    """
 
-    def to_dict(self) -> dict[str, str | None]:
-        return {"last_synced_commit": self.last_synced_commit}
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._records: dict[str, dict[str, OutputRecord]] = {}
+        self._by_blob: dict[tuple[str, str], set[str]] = {}
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._load()
+
+    def _load(self) -> None:
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        if not isinstance(data, dict):
+            return
+        for name, outputs in data.items():
+            if not isinstance(outputs, Mapping):
+                continue
+            for output, value in outputs.items():
+                try:
+                    blob, segments, size, mtime_ns = value
+                    record = OutputRecord(str(blob), int(segments), int(size), int(mtime_ns))
+                except (TypeError, ValueError):
+                    continue
+                self._store(str(name), str(output), record)
+
+    def find(
+        self, repository: str, blob: str, suffix: str, output_dir: Path, exclude: Path
+    ) -> tuple[Path, OutputRecord] | None:
+        """Return an unchanged output of ``repository`` translated from ``blob``.
+
+        Only outputs with the same ``suffix`` qualify, and ``exclude`` (the
+        output about to be written) is skipped.
+        """
+
+        with self._lock:
+            records = self._records.get(repository, {})
+            candidates = [
+                (Path(output), records[output])
+                for output in self._by_blob.get((repository, blob), ())
+            ]
+        for path, record in candidates:
+            if path == exclude or path.suffix.lower() != suffix:
+                continue
+            try:
+                stat = (output_dir / path).stat()
+            except OSError:
+                continue
+            if (stat.st_size, stat.st_mtime_ns) == (record.size, record.mtime_ns):
+                return path, record
+        return None
+
+    def record(
+        self,
+        repository: str,
+        output: Path,
+        output_dir: Path,
+        blob: str | None,
+        segments: int = 0,
+    ) -> None:
+        """Remember that ``output`` now holds ``blob``'s translation, or forget it."""
+
+        record = None
+        if blob is not None:
+            try:
+                stat = (output_dir / output).stat()
+            except OSError:
+                pass
+            else:
+                record = OutputRecord(blob, segments, stat.st_size, stat.st_mtime_ns)
+        with self._lock:
+            self._store(repository, output.as_posix(), record)
+            self._dirty = True
+
+    def save(self) -> None:
+        with self._lock:
+            if not self._dirty:
+                return
+            serializable = {
+                name: {
+                    output: [r.blob, r.segments, r.size, r.mtime_ns]
+                    for output, r in sorted(records.items())
+                }
+                for name, records in sorted(self._records.items())
+                if records
+            }
+            partial = self.path.with_name(self.path.name + ".tmp")
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                partial.write_text(json.dumps(serializable) + "\n", encoding="utf-8")
+                partial.replace(self.path)
+            except OSError as exc:  # pragma: no cover - disk failures are rare
+                raise StateError(f"写入译文索引 {self.path} 失败: {exc}") from exc
+            self._dirty = False
+
+    def _store(self, repository: str, output: str, record: OutputRecord | None) -> None:
+        records = self._records.setdefault(repository, {})
+        previous = records.pop(output, None)
+        if previous is not None:
+            self._by_blob[(repository, previous.blob)].discard(output)
+        if record is not None:
+            records[output] = record
+            self._by_blob.setdefault((repository, record.blob), set()).add(output)
 
 
 class StateStore:
@@ -34,6 +176,7 @@ class StateStore:
         self.path = path
         self.path.parent.mkdir(parents=True, exist_ok=True)
         self._states: dict[str, RepositoryState] = {}
+        self._lock = threading.Lock()
         self._load()
 
     def _load(self) -> None:
@@ -63,8 +206,24 @@ class StateStore:
         return self._states.get(name, RepositoryState())
 
     def set_repository_state(self, name: str, state: RepositoryState) -> None:
-        self._states[name] = state
-        self._write()
+        with self._lock:
+            self._states[name] = state
+            self._write()
+
+    def update_repository_state(
+        self, name: str, update: Callable[[RepositoryState], None]
+    ) -> RepositoryState:
+        """Apply ``update`` to the stored state of ``name`` and persist it atomically."""
+
+        with self._lock:
+            current = self._states.get(name, RepositoryState())
+            state = RepositoryState(
+                last_synced_commit=current.last_synced_commit, branches=dict(current.branches)
+            )
+            update(state)
+            self._states[name] = state
+            self._write()
+        return state
 
     def clear(self) -> None:
         self._states.clear()
@@ -72,4 +231,4 @@ class StateStore:
             self.path.unlink()
 
 
-__all__ = ["RepositoryState", "StateError", "StateStore"]
+__all__ = ["OutputIndex", "OutputRecord", "RepositoryState", "StateError", "StateStore"]
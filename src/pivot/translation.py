@@ -0,0 +1,255 @@
+"""Translation provider clients and composable translation layers."""
+
+from __future__ import annotations
+
+import asyncio
+import unicodedata
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Protocol
+
+import httpx
+
+from pivot.config import TranslationProviderConfig
+from pivot.glossary import Glossary
+
+DEFAULT_BASE_URL = "https://api.openai.com/v1"
+PROVIDER_KINDS: frozenset[str] = frozenset({"openai", "openai-compatible"})
+
+SYSTEM_PROMPT = (
+    "You are a professional technical documentation translator. Translate the user's "
+    "text into {language}. Preserve Markdown inline syntax, inline code, URLs and "
+    "placeholders such as ⟦G0⟧ exactly. Reply with the translation only."
+)
+
+
+class TranslationError(RuntimeError):
+    """Raised when a translation request fails."""
+
+
+class RateLimitError(TranslationError):
+    """Raised when the provider rejects a request with HTTP 429."""
+
+    def __init__(self, message: str, retry_after: float | None = None) -> None:
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class ProviderUnavailableError(TranslationError):
+    """Raised for transient provider failures (5xx responses, timeouts)."""
+
+
+class TranslationProvider(Protocol):
+    """Anything that can translate a single segment of text."""
+
+    async def translate(self, text: str) -> str: ...
+
+
+class OpenAICompatibleProvider:
+    """Translate segments through an OpenAI-compatible chat completions API."""
+
+    def __init__(
+        self,
+        config: TranslationProviderConfig,
+        *,
+        client: httpx.AsyncClient | None = None,
+    ) -> None:
+        self.config = config
+        base_url = str(config.base_url or DEFAULT_BASE_URL).rstrip("/")
+        self._endpoint = f"{base_url}/chat/completions"
+        self._system_prompt = SYSTEM_PROMPT.format(language=config.target_language)
+        self._client = client or httpx.AsyncClient(timeout=config.timeout_seconds)
+        self._owns_client = client is None
+
+    async def translate(self, text: str) -> str:
+        api_key = self.config.resolve_api_key().get_secret_value()
+        payload = {
+            "model": self.config.model,
+            "temperature": 0,
+            "messages": [
+                {"role": "system", "content": self._system_prompt},
+                {"role": "user", "content": text},
+            ],
+        }
+        try:
+            response = await self._client.post(
+                self._endpoint,
+                json=payload,
+                headers={"Authorization": f"Bearer {api_key}"},
+            )
+            response.raise_for_status()
+        except httpx.HTTPStatusError as exc:
+            status = exc.response.status_code
+            if status == 429:
+                retry_after = parse_retry_after(exc.response.headers.get("Retry-After"))
+                raise RateLimitError("翻译请求被限流（HTTP 429）", retry_after) from exc
+            if status >= 500:
+                raise ProviderUnavailableError(f"翻译服务暂不可用（HTTP {status}）") from exc
+            raise TranslationError(f"翻译请求失败（HTTP {status}）") from exc
+        except httpx.TimeoutException as exc:
+            raise ProviderUnavailableError(f"翻译请求超时: {exc}") from exc
+        except httpx.HTTPError as exc:
+            raise TranslationError(f"翻译请求失败: {exc}") from exc
+        return _extract_content(response.json())
+
+    async def aclose(self) -> None:
+        if self._owns_client:
+            await self._client.aclose()
+
+
+class GlossaryProvider:
+    """Mask glossary terms before delegating, then restore or enforce them."""
+
+    def __init__(self, inner: TranslationProvider, glossary: Glossary) -> None:
+        self.inner = inner
+        self.glossary = glossary
+
+    async def translate(self, text: str) -> str:
+        masked = self.glossary.mask(text)
+        translated = await self.inner.translate(masked.text)
+        return self.glossary.restore(translated, masked)
+
+
+@dataclass(slots=True)
+class DedupStats:
+    """Counters describing how much work run-wide deduplication saved."""
+
+    requested: int = 0
+    unique: int = 0
+    coalesced: int = 0
+
+    @property
+    def reused(self) -> int:
+        """Requests answered without a provider call of their own."""
+
+        return self.requested - self.unique
+
+    @property
+    def ratio(self) -> float:
+        """Fraction of requested segments that did not need a provider call."""
+
+        if not self.requested:
+            return 0.0
+        return self.reused / self.requested
+
+
+class _Abandoned(Exception):
+    """Set on a shared request whose owning call was cancelled."""
+
+
+class DeduplicatingTranslator:
+    """Collapse identical segments across a run with single-flight semantics.
+
+    The first request for a normalized segment issues the provider call; any
+    concurrent request for the same text awaits that in-flight call, and later
+    requests reuse its result. Failed calls are forgotten so they can be retried.
+    If the call owning a request is cancelled, one of its waiters takes the
+    request over instead of being cancelled along with it.
+    """
+
+    def __init__(self, inner: TranslationProvider) -> None:
+        self.inner = inner
+        self.stats = DedupStats()
+        self._calls: dict[str, asyncio.Future[str]] = {}
+
+    async def translate(self, text: str) -> str:
+        key = normalize_segment(text)
+        self.stats.requested += 1
+
+        coalesced = False
+        while (existing := self._calls.get(key)) is not None:
+            if not existing.done() and not coalesced:
+                self.stats.coalesced += 1
+                coalesced = True
+            try:
+                return await asyncio.shield(existing)
+            except _Abandoned:
+                continue
+        if coalesced:
+            self.stats.coalesced -= 1
+
+        future: asyncio.Future[str] = asyncio.get_running_loop().create_future()
+        self._calls[key] = future
+        self.stats.unique += 1
+        try:
+            result = await self.inner.translate(text)
+        except asyncio.CancelledError:
+            del self._calls[key]
+            future.set_exception(_Abandoned())
+            future.exception()
+            raise
+        except Exception as exc:
+            del self._calls[key]
+            future.set_exception(exc)
+            # Mark the exception as retrieved so waiter-less futures do not log it.
+            future.exception()
+            raise
+        future.set_result(result)
+        return result
+
+
+def normalize_segment(text: str) -> str:
+    """Return the deduplication key for a segment.
+
+    Unicode is NFC-normalized and horizontal whitespace collapsed per line, so
+    cosmetic differences do not defeat deduplication while line structure (which
+    matters for YAML block scalars) is kept.
+    """
+
+    normalized = unicodedata.normalize("NFC", text)
+    lines = (" ".join(line.split()) for line in normalized.strip().splitlines())
+    return "\n".join(lines)
+
+
+def create_provider(config: TranslationProviderConfig) -> OpenAICompatibleProvider:
+    """Instantiate the provider client described by ``config``."""
+
+    if config.provider.lower() not in PROVIDER_KINDS:
+        supported = ", ".join(sorted(PROVIDER_KINDS))
+        raise TranslationError(f"不支持的翻译提供方 {config.provider!r}（可选: {supported}）")
+    return OpenAICompatibleProvider(config)
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Parse a ``Retry-After`` header given either as seconds or as an HTTP date."""
+
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        moment = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return max(0.0, (moment - datetime.now(timezone.utc)).total_seconds())
+
+
+def _extract_content(data: Any) -> str:
+    try:
+        content = data["choices"][0]["message"]["content"]
+    except (KeyError, IndexError, TypeError) as exc:
+        raise TranslationError("翻译响应缺少 choices[0].message.content") from exc
+    if not isinstance(content, str):
+        raise TranslationError("翻译响应内容不是字符串")
+    return content
+
+
+__all__ = [
+    "DedupStats",
+    "DeduplicatingTranslator",
+    "GlossaryProvider",
+    "OpenAICompatibleProvider",
+    "PROVIDER_KINDS",
+    "ProviderUnavailableError",
+    "RateLimitError",
+    "TranslationError",
+    "TranslationProvider",
+    "create_provider",
+    "normalize_segment",
+    "parse_retry_after",
+]
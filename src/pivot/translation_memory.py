@@ -0,0 +1,371 @@
+"""Persistent translation memory with MinHash/LSH fuzzy matching."""
+
+from __future__ import annotations
+
+import asyncio
+import difflib
+import hashlib
+import re
+import sqlite3
+import struct
+import threading
+import zlib
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+
+from pivot.translation import TranslationProvider, normalize_segment
+
+MEMORY_FORMAT_VERSION = 1
+SIGNATURE_SIZE = 64
+BANDS = 16
+ROWS_PER_BAND = SIGNATURE_SIZE // BANDS
+SHINGLE_SIZE = 5
+DEFAULT_SIMILARITY_THRESHOLD = 0.8
+DEFAULT_MAX_CANDIDATES = 16
+# Segments shorter than this are too short for shingle similarity to mean much.
+MIN_FUZZY_CHARS = 24
+_COMMIT_EVERY = 256
+
+_EMPTY_BIN = 1 << 64
+# Ranks are 64-bit shingle hashes divided by SIGNATURE_SIZE, so they stay below this.
+_RANK_LIMIT = (1 << 64) // SIGNATURE_SIZE
+_BAND = struct.Struct(f"<{ROWS_PER_BAND}Q")
+# Words, including dotted/hyphenated runs such as versions or paths, or single symbols.
+_TOKEN_RE = re.compile(r"\w+(?:[.\-/:]\w+)*|\S")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS segments (
+    id INTEGER PRIMARY KEY,
+    source TEXT NOT NULL UNIQUE,
+    translation TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS bands (
+    band INTEGER NOT NULL,
+    bucket INTEGER NOT NULL,
+    segment INTEGER NOT NULL,
+    PRIMARY KEY (band, bucket, segment)
+) WITHOUT ROWID;
+"""
+
+
+class TranslationMemoryError(RuntimeError):
+    """Raised when the translation memory database cannot be used."""
+
+
+@dataclass(slots=True, frozen=True)
+class FuzzyMatch:
+    """A stored segment similar to the one looked up."""
+
+    source: str
+    translation: str
+    similarity: float
+
+
+@dataclass(slots=True)
+class MemoryStats:
+    """How often the memory answered a segment without a provider call."""
+
+    lookups: int = 0
+    exact: int = 0
+    fuzzy_matches: int = 0
+    patched: int = 0
+
+    @property
+    def fuzzy_ratio(self) -> float:
+        """Fraction of lookups answered by patching a near-duplicate."""
+
+        return self.patched / self.lookups if self.lookups else 0.0
+
+
+class TranslationMemory:
+    """Translated segments indexed for exact and near-duplicate lookup.
+
+    Each source segment is reduced to its set of character 5-shingles and a
+    64-value one-permutation MinHash signature, split into 16 bands of 4 rows.
+    Every band is hashed into a bucket stored in an indexed table, so a lookup
+    is 16 index probes regardless of how many segments are stored; only
+    segments sharing a bucket are compared exactly (Jaccard similarity of
+    their shingles). With these bands a pair at similarity 0.8 collides in
+    some band with a probability above 99.9 %.
+
+    Translations depend on the glossary they were made with, so the memory is
+    emptied when opened with a different ``glossary_digest``. The connection
+    may be used from worker threads; access is serialized by a lock.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        *,
+        threshold: float = DEFAULT_SIMILARITY_THRESHOLD,
+        max_candidates: int = DEFAULT_MAX_CANDIDATES,
+        glossary_digest: str = "",
+    ) -> None:
+        self.path = path
+        self.threshold = threshold
+        self.max_candidates = max_candidates
+        self._pending = 0
+        self._lock = threading.RLock()
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.executescript(_SCHEMA)
+            self._check_format()
+            self._check_glossary(glossary_digest)
+        except (OSError, sqlite3.Error) as exc:
+            raise TranslationMemoryError(f"无法打开翻译记忆库 {path}: {exc}") from exc
+
+    def __len__(self) -> int:
+        with self._lock:
+            return int(self._db.execute("SELECT COUNT(*) FROM segments").fetchone()[0])
+
+    def get(self, text: str) -> str | None:
+        """Return the stored translation of exactly ``text`` (after normalization)."""
+
+        with self._lock:
+            row = self._db.execute(
+                "SELECT translation FROM segments WHERE source = ?", (normalize_segment(text),)
+            ).fetchone()
+        return None if row is None else str(row[0])
+
+    def find_similar(self, text: str) -> FuzzyMatch | None:
+        """Return the most similar stored segment at or above ``threshold``."""
+
+        source = normalize_segment(text)
+        if len(source) < MIN_FUZZY_CHARS:
+            return None
+        shingles = _shingles(source)
+        hits: Counter[int] = Counter()
+        rows: list[tuple[str, str]] = []
+        with self._lock:
+            for band, bucket in enumerate(_buckets(_signature(shingles))):
+                found = self._db.execute(
+                    "SELECT segment FROM bands WHERE band = ? AND bucket = ? LIMIT ?",
+                    (band, bucket, self.max_candidates * 4),
+                )
+                hits.update(segment for (segment,) in found)
+            for segment, _ in hits.most_common(self.max_candidates):
+                row = self._db.execute(
+                    "SELECT source, translation FROM segments WHERE id = ?", (segment,)
+                ).fetchone()
+                if row is not None:
+                    rows.append(row)
+        best: FuzzyMatch | None = None
+        for row in rows:
+            if row[0] == source:
+                continue
+            similarity = _jaccard(shingles, _shingles(row[0]))
+            if similarity >= self.threshold and (best is None or similarity > best.similarity):
+                best = FuzzyMatch(source=row[0], translation=row[1], similarity=similarity)
+        return best
+
+    def add(self, text: str, translation: str) -> None:
+        """Store ``translation`` for ``text``, replacing an earlier one."""
+
+        source = normalize_segment(text)
+        buckets = _buckets(_signature(_shingles(source))) if len(source) >= MIN_FUZZY_CHARS else []
+        with self._lock:
+            # No RETURNING: it needs SQLite 3.35, and lastrowid is not set by the update path.
+            self._db.execute(
+                "INSERT INTO segments (source, translation) VALUES (?, ?) "
+                "ON CONFLICT (source) DO UPDATE SET translation = excluded.translation",
+                (source, translation),
+            )
+            (segment,) = self._db.execute(
+                "SELECT id FROM segments WHERE source = ?", (source,)
+            ).fetchone()
+            self._db.executemany(
+                "INSERT OR IGNORE INTO bands (band, bucket, segment) VALUES (?, ?, ?)",
+                ((band, bucket, segment) for band, bucket in enumerate(buckets)),
+            )
+            self._pending += 1
+            if self._pending >= _COMMIT_EVERY:
+                self.flush()
+
+    def flush(self) -> None:
+        with self._lock:
+            self._db.commit()
+            self._pending = 0
+
+    def close(self) -> None:
+        with self._lock:
+            self.flush()
+            self._db.close()
+
+    def _check_format(self) -> None:
+        expected = f"{MEMORY_FORMAT_VERSION}:{SIGNATURE_SIZE}:{BANDS}:{SHINGLE_SIZE}"
+        row = self._db.execute("SELECT value FROM meta WHERE key = 'format'").fetchone()
+        if row is not None and row[0] == expected:
+            return
+        # Signatures from other parameters cannot be compared; rebuild the index.
+        segments = self._db.execute("SELECT source, translation FROM segments").fetchall()
+        self._db.execute("DELETE FROM bands")
+        self._db.execute("DELETE FROM segments")
+        self._db.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES ('format', ?)", (expected,)
+        )
+        for source, translation in segments:
+            self.add(source, translation)
+        self.flush()
+
+    def _check_glossary(self, digest: str) -> None:
+        row = self._db.execute("SELECT value FROM meta WHERE key = 'glossary'").fetchone()
+        if row is not None and row[0] == digest:
+            return
+        self._db.execute("DELETE FROM bands")
+        self._db.execute("DELETE FROM segments")
+        self._db.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES ('glossary', ?)", (digest,)
+        )
+        self.flush()
+
+
+class MemoryProvider:
+    """Answer segments from a :class:`TranslationMemory` before calling ``inner``.
+
+    Exact matches are reused as they are. A near-duplicate is reused through
+    :func:`patch_translation` when the only differences are tokens that its
+    translation kept verbatim (version numbers, product names, identifiers);
+    anything else is translated by ``inner`` and remembered. Database work
+    runs in worker threads so it does not stall the event loop.
+    """
+
+    def __init__(self, inner: TranslationProvider, memory: TranslationMemory) -> None:
+        self.inner = inner
+        self.memory = memory
+        self.stats = MemoryStats()
+
+    async def translate(self, text: str) -> str:
+        self.stats.lookups += 1
+        stored, match = await asyncio.to_thread(self._lookup, text)
+        if stored is not None:
+            self.stats.exact += 1
+            return stored
+        if match is not None:
+            self.stats.fuzzy_matches += 1
+            patched = patch_translation(match.source, match.translation, normalize_segment(text))
+            if patched is not None:
+                self.stats.patched += 1
+                await asyncio.to_thread(self.memory.add, text, patched)
+                return patched
+        translation = await self.inner.translate(text)
+        await asyncio.to_thread(self.memory.add, text, translation)
+        return translation
+
+    def _lookup(self, text: str) -> tuple[str | None, FuzzyMatch | None]:
+        stored = self.memory.get(text)
+        if stored is not None:
+            return stored, None
+        return None, self.memory.find_similar(text)
+
+
+def patch_translation(source: str, translation: str, new_source: str) -> str | None:
+    """Carry a token-level source edit over into ``translation`` if it is safe.
+
+    The two sources are aligned token by token. Every changed span must be a
+    replacement whose old text occurs exactly once in ``translation`` as a
+    whole term (it was left untranslated there) and does not overlap another
+    changed span's;
+    insertions and deletions change meaning and are rejected.
+    """
+
+    old_tokens = [(m.group(), m.start(), m.end()) for m in _TOKEN_RE.finditer(source)]
+    new_tokens = [(m.group(), m.start(), m.end()) for m in _TOKEN_RE.finditer(new_source)]
+    matcher = difflib.SequenceMatcher(
+        None, [t[0] for t in old_tokens], [t[0] for t in new_tokens], autojunk=False
+    )
+    replacements: dict[str, str] = {}
+    patterns: dict[str, re.Pattern[str]] = {}
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            continue
+        if tag != "replace":
+            return None
+        old = source[old_tokens[i1][1] : old_tokens[i2 - 1][2]]
+        new = new_source[new_tokens[j1][1] : new_tokens[j2 - 1][2]]
+        pattern = patterns.setdefault(old, _verbatim(old))
+        if len(pattern.findall(translation)) != 1 or replacements.get(old, new) != new:
+            return None
+        replacements[old] = new
+    if not replacements:
+        return None
+    if any(a != b and a in b for a in replacements for b in replacements):
+        return None
+    for old, new in replacements.items():
+        match = patterns[old].search(translation)
+        if match is None:  # an earlier replacement introduced or consumed it
+            return None
+        translation = translation[: match.start()] + new + translation[match.end() :]
+    return translation
+
+
+def _verbatim(text: str) -> re.Pattern[str]:
+    # Latin word boundaries only: CJK text around a kept term is not a word
+    # continuation, but "on" inside "Python" or "3.10" inside "3.10.1" is.
+    return re.compile(rf"(?<![A-Za-z0-9_]){re.escape(text)}(?![A-Za-z0-9_]|\.[A-Za-z0-9])")
+
+
+def _shingles(text: str) -> set[int]:
+    data = text.encode("utf-8")
+    chunks = [data[i : i + SHINGLE_SIZE] for i in range(max(1, len(data) - SHINGLE_SIZE + 1))]
+    # Two differently seeded CRCs give a stable 64-bit hash per shingle.
+    return {zlib.crc32(chunk) << 32 | zlib.crc32(chunk, 0x5BD1E995) for chunk in chunks}
+
+
+def _signature(shingles: set[int]) -> list[int]:
+    """One-permutation MinHash: one hash per shingle, minimum kept per bin.
+
+    This costs one pass over the shingles instead of one per signature value.
+    Empty bins borrow the value of the next non-empty bin (rotation
+    densification), offset by the distance so borrowed values stay distinct.
+    """
+
+    bins = [_EMPTY_BIN] * SIGNATURE_SIZE
+    for value in shingles:
+        index, rank = value % SIGNATURE_SIZE, value // SIGNATURE_SIZE
+        if rank < bins[index]:
+            bins[index] = rank
+    signature = list(bins)
+    for index, rank in enumerate(bins):
+        if rank != _EMPTY_BIN:
+            continue
+        for distance in range(1, SIGNATURE_SIZE):
+            borrowed = bins[(index + distance) % SIGNATURE_SIZE]
+            if borrowed != _EMPTY_BIN:
+                signature[index] = borrowed + distance * _RANK_LIMIT
+                break
+    return signature
+
+
+def _buckets(signature: list[int]) -> list[int]:
+    return [
+        int.from_bytes(
+            hashlib.blake2b(
+                _BAND.pack(*signature[start : start + ROWS_PER_BAND]), digest_size=8
+            ).digest(),
+            "little",
+            signed=True,
+        )
+        for start in range(0, SIGNATURE_SIZE, ROWS_PER_BAND)
+    ]
+
+
+def _jaccard(left: set[int], right: set[int]) -> float:
+    if not left and not right:
+        return 1.0
+    return len(left & right) / len(left | right)
+
+
+__all__ = [
+    "DEFAULT_SIMILARITY_THRESHOLD",
+    "FuzzyMatch",
+    "MemoryProvider",
+    "MemoryStats",
+    "TranslationMemory",
+    "TranslationMemoryError",
+    "patch_translation",
+]
@@ -35,25 +35,24 @@ def test_change_detector_tracks_updates(tmp_path: Path) -> None:
         branch="main",
         docs_path=Path("docs"),
     )
-    repo = manager.sync(config)
-
     state_store = StateStore(tmp_path / "state" / "repositories.json")
     detector = ChangeDetector(state_store)
 
-    initial_changes = detector.collect_changes(config, repo)
-    assert Path("docs/readme.md") in initial_changes
-    assert all(path.suffix in {".md", ".yaml", ".yml", ".markdown"} for path in initial_changes)
+    with manager.open(manager.sync(config)) as repo:
+        initial_changes = detector.collect_changes(config, repo)
+        assert Path("docs/readme.md") in initial_changes
+        assert all(path.suffix in {".md", ".yaml", ".yml", ".markdown"} for path in initial_changes)
 
-    detector.record_processed(config, repo)
-    assert detector.collect_changes(config, repo) == []
+        detector.record_processed(config, repo)
+        assert detector.collect_changes(config, repo) == []
 
-    new_doc = origin_path / "docs" / "usage.yaml"
-    new_doc.write_text("key: value", encoding="utf-8")
-    origin.index.add(["docs/usage.yaml"])
-    origin.index.commit("add usage", author=AUTHOR, committer=AUTHOR)
+        new_doc = origin_path / "docs" / "usage.yaml"
+        new_doc.write_text("key: value", encoding="utf-8")
+        origin.index.add(["docs/usage.yaml"])
+        origin.index.commit("add usage", author=AUTHOR, committer=AUTHOR)
 
-    manager.sync(config)
-    updated_changes = detector.collect_changes(config, repo)
-    assert Path("docs/usage.yaml") in updated_changes
+        manager.sync(config)
+        updated_changes = detector.collect_changes(config, repo)
+        assert Path("docs/usage.yaml") in updated_changes
 
-    detector.record_processed(config, repo)
+        detector.record_processed(config, repo)
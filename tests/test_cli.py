@@ -78,3 +78,73 @@ def test_run_dry_run(tmp_path: Path) -> None:
     assert result.exit_code == 0, result.stdout
     assert "dry-run" in result.stdout
     assert "docs/readme.md" in result.stdout
+
+
+def test_maintain_command(tmp_path: Path) -> None:
+    origin_path = tmp_path / "origin"
+    _init_origin(origin_path)
+    config_path = _write_config(
+        tmp_path,
+        repo_url=str(origin_path),
+        work_dir=tmp_path / "work",
+        output_dir=tmp_path / "out",
+    )
+    # A dry run leaves the clones alone.
+    assert runner.invoke(app, ["run", "--config", str(config_path)]).exit_code == 0
+    assert not (tmp_path / "work" / "state" / "maintenance.json").exists()
+
+    result = runner.invoke(app, ["maintain", "--config", str(config_path)])
+    assert result.exit_code == 0, result.stdout
+    assert (tmp_path / "work" / "state" / "maintenance.json").exists()
+
+    result = runner.invoke(app, ["maintain", "--config", str(config_path)])
+    assert result.exit_code == 0, result.stdout
+    assert "无需维护" in result.stdout
+
+    result = runner.invoke(app, ["maintain", "--config", str(config_path), "--force"])
+    assert result.exit_code == 0, result.stdout
+    assert "forced" in result.stdout
+
+
+def test_plan_and_execute_commands(tmp_path: Path) -> None:
+    origin_path = tmp_path / "origin"
+    _init_origin(origin_path)
+    config_path = _write_config(
+        tmp_path,
+        repo_url=str(origin_path),
+        work_dir=tmp_path / "work",
+        output_dir=tmp_path / "out",
+    )
+    plan_path = tmp_path / "plan.jsonl"
+
+    result = runner.invoke(app, ["plan", "--config", str(config_path), "--output", str(plan_path)])
+    assert result.exit_code == 0, result.stdout
+    assert plan_path.read_text(encoding="utf-8").count('"kind":"file"') == 1
+
+    args = ["execute", str(plan_path), "--config", str(config_path)]
+    result = runner.invoke(app, [*args, "--shard", "1/1"])
+    assert result.exit_code != 0
+
+    result = runner.invoke(app, [*args, "--lines", "0:1", "--record-only"])
+    assert result.exit_code != 0
+
+    result = runner.invoke(app, [*args, "--record-only"])
+    assert result.exit_code == 0, result.stdout
+    result = runner.invoke(app, ["run", "--config", str(config_path)])
+    assert "没有检测到需要翻译的文档" in result.stdout
+
+    # Recording an older plan would move the sync pointer backwards.
+    origin = Repo(origin_path)
+    (origin_path / "docs" / "readme.md").write_text("# Intro\n\nhello again\n", encoding="utf-8")
+    origin.index.add(["docs/readme.md"])
+    origin.index.commit("update", author=AUTHOR, committer=AUTHOR)
+    newer_path = tmp_path / "newer.jsonl"
+    result = runner.invoke(app, ["plan", "--config", str(config_path), "--output", str(newer_path)])
+    assert result.exit_code == 0, result.stdout
+    newer = ["execute", str(newer_path), "--config", str(config_path), "--record-only"]
+    assert runner.invoke(app, newer).exit_code == 0
+    result = runner.invoke(app, [*args, "--record-only"])
+    assert result.exit_code != 0
+    assert "计划已过期" in result.stdout
+    state = (tmp_path / "work" / "state" / "repositories.json").read_text(encoding="utf-8")
+    assert origin.head.commit.hexsha in state
@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import asyncio
+import time
+
+import pytest
+
+from pivot.concurrency import AdaptiveConcurrencyLimiter, AdaptiveProvider, TokenBucket
+from pivot.config import ConfigError, TranslationProviderConfig
+from pivot.translation import ProviderUnavailableError, RateLimitError
+
+
+def _config(**overrides: object) -> TranslationProviderConfig:
+    values: dict[str, object] = {"provider": "openai", "model": "m", "api_key": "k"}
+    values.update(overrides)
+    return TranslationProviderConfig.model_validate(values)
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_limiter_adds_additively_and_cuts_multiplicatively() -> None:
+    clock = FakeClock()
+    limiter = AdaptiveConcurrencyLimiter(initial=4, minimum=1, maximum=8, clock=clock)
+
+    async def scenario() -> None:
+        for _ in range(8):
+            await limiter.acquire()
+            await limiter.release_success(0.1)
+        assert 5.5 < limiter.limit < 6.5
+
+        await limiter.acquire()
+        await limiter.acquire()
+        await limiter.release_throttled(None)
+        await limiter.release_unavailable()
+
+    asyncio.run(scenario())
+
+    snapshot = limiter.snapshot()
+    assert snapshot.decreases == 1
+    assert 2.5 < snapshot.limit < 3.5
+    assert snapshot.throttled == 1
+    assert snapshot.server_errors == 1
+    assert snapshot.latency_p50 == pytest.approx(0.1)
+
+
+def test_limiter_cuts_on_latency_target() -> None:
+    limiter = AdaptiveConcurrencyLimiter(initial=8, maximum=8, latency_target=1.0)
+
+    async def scenario() -> None:
+        await limiter.acquire()
+        await limiter.release_success(2.0)
+
+    asyncio.run(scenario())
+    assert limiter.limit == 4
+
+
+def test_adaptive_provider_caps_in_flight_and_retries_after_429() -> None:
+    class Provider:
+        def __init__(self) -> None:
+            self.active = 0
+            self.peak = 0
+            self.calls = 0
+
+        async def translate(self, text: str) -> str:
+            self.calls += 1
+            if self.calls == 1:
+                raise RateLimitError("slow down", retry_after=0.01)
+            if self.calls == 2:
+                raise ProviderUnavailableError("503")
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+            await asyncio.sleep(0.005)
+            self.active -= 1
+            return text.upper()
+
+    inner = Provider()
+    provider = AdaptiveProvider(inner, _config(initial_concurrency=2, max_concurrency=2))
+
+    async def scenario() -> list[str]:
+        return list(await asyncio.gather(*(provider.translate(f"s{i}") for i in range(10))))
+
+    assert asyncio.run(scenario()) == [f"S{i}" for i in range(10)]
+    assert inner.peak <= 2
+    snapshot = provider.snapshot()
+    assert snapshot.retries == 2
+    assert snapshot.throttled == 1
+    assert snapshot.server_errors == 1
+    assert snapshot.in_flight == 0
+
+
+def test_adaptive_provider_gives_up_after_max_retries() -> None:
+    class AlwaysLimited:
+        async def translate(self, text: str) -> str:
+            raise RateLimitError("no", retry_after=0)
+
+    provider = AdaptiveProvider(AlwaysLimited(), _config(max_retries=1))
+    with pytest.raises(RateLimitError):
+        asyncio.run(provider.translate("x"))
+    assert provider.snapshot().retries == 1
+
+
+def test_token_bucket_throttles_to_rate() -> None:
+    bucket = TokenBucket(1200, capacity=1)
+
+    async def scenario() -> float:
+        started = time.monotonic()
+        for _ in range(3):
+            await bucket.take()
+        return time.monotonic() - started
+
+    assert asyncio.run(scenario()) >= 0.09
+
+
+def test_concurrency_bounds_are_validated() -> None:
+    with pytest.raises(ConfigError):
+        _config(initial_concurrency=10, max_concurrency=4)
+
+
+def test_adaptive_provider_backs_off_on_zero_retry_after(monkeypatch: pytest.MonkeyPatch) -> None:
+    delays: list[float] = []
+    real_sleep = asyncio.sleep
+
+    async def fake_sleep(delay: float) -> None:
+        delays.append(delay)
+        await real_sleep(0)
+
+    monkeypatch.setattr("pivot.concurrency.asyncio.sleep", fake_sleep)
+
+    class AlwaysLimited:
+        async def translate(self, text: str) -> str:
+            raise RateLimitError("no", retry_after=0)
+
+    provider = AdaptiveProvider(AlwaysLimited(), _config(max_retries=2))
+    with pytest.raises(RateLimitError):
+        asyncio.run(provider.translate("x"))
+    assert delays == [0.5, 1.0]
@@ -5,7 +5,7 @@ from pathlib import Path
 
 import pytest
 
-from pivot.config import ConfigError, TranslationProviderConfig, load_config
+from pivot.config import ConfigError, RepositoryConfig, TranslationProviderConfig, load_config
 
 
 def _write_config(path: Path, content: str) -> Path:
@@ -79,3 +79,17 @@ def test_env_override(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
     assert config.translation.resolve_api_key().get_secret_value() == "dummy"
 
     monkeypatch.delenv("PIVOT_CONFIG")
+
+
+def test_repository_rejects_branch_together_with_branches() -> None:
+    config = RepositoryConfig(
+        name="docs", url="https://example.com/docs.git", branches=["v1", "v2"]
+    )
+    assert config.tracked_branches == ["v1", "v2"]
+    assert RepositoryConfig(name="docs", url="https://example.com/docs.git").tracked_branches == [
+        "main"
+    ]
+    with pytest.raises(ConfigError):
+        RepositoryConfig(
+            name="docs", url="https://example.com/docs.git", branch="main", branches=["v1"]
+        )
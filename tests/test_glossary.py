@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from pivot.config import GlossaryConfig
+from pivot.glossary import Glossary, GlossaryEntry, GlossaryError
+
+
+def _glossary(**kwargs: bool) -> Glossary:
+    entries = [
+        GlossaryEntry("Kubernetes"),
+        GlossaryEntry("kubectl"),
+        GlossaryEntry("pod", "Pod"),
+        GlossaryEntry("pod security", "Pod 安全"),
+        GlossaryEntry("namespace", "命名空间"),
+    ]
+    return Glossary.from_entries(entries, **kwargs)
+
+
+def test_find_prefers_leftmost_longest_on_word_boundaries() -> None:
+    glossary = _glossary()
+    text = "Use kubectl to apply pod security in a namespace; podman is unrelated."
+
+    matches = glossary.find(text)
+
+    assert [text[m.start : m.end] for m in matches] == ["kubectl", "pod security", "namespace"]
+
+
+def test_case_insensitive_matching() -> None:
+    glossary = _glossary(case_sensitive=False)
+    matches = glossary.find("KUBERNETES runs every Pod.")
+    assert [m.entry.term for m in matches] == ["Kubernetes", "pod"]
+
+
+def test_mask_and_restore_round_trip() -> None:
+    glossary = _glossary()
+    masked = glossary.mask("Deploy the pod with kubectl.")
+
+    assert "kubectl" not in masked.text
+    assert "pod" not in masked.text
+
+    translated = masked.text.replace("Deploy the", "使用").replace("with", "部署，借助")
+    restored = glossary.restore(translated, masked)
+
+    assert restored == "使用 Pod 部署，借助 kubectl."
+
+
+def test_restore_enforces_placeholders() -> None:
+    glossary = _glossary()
+    masked = glossary.mask("Run kubectl.")
+
+    with pytest.raises(GlossaryError):
+        glossary.restore("运行。", masked)
+    assert glossary.restore("运行。", masked, strict=False) == "运行。"
+
+
+def test_load_caches_compiled_automaton(tmp_path: Path) -> None:
+    glossary_path = tmp_path / "glossary.yaml"
+    glossary_path.write_text(
+        "protected:\n  - Pivot\nterms:\n  repository: 仓库\n",
+        encoding="utf-8",
+    )
+    config = GlossaryConfig(path=glossary_path)
+    cache_dir = tmp_path / "cache"
+
+    first = Glossary.load(config, cache_dir)
+    cached_files = list(cache_dir.glob("*.json"))
+    assert len(cached_files) == 1
+
+    second = Glossary.load(config, cache_dir)
+    assert second.entries == first.entries
+
+    # A cache whose embedded digest does not match is rebuilt rather than trusted.
+    cached_files[0].write_text(
+        cached_files[0].read_text(encoding="utf-8").replace('"digest":"', '"digest":"x'),
+        encoding="utf-8",
+    )
+    rebuilt = Glossary.load(config, cache_dir)
+    assert rebuilt.entries == first.entries
+    assert '"digest":"x' not in cached_files[0].read_text(encoding="utf-8")
+    assert [m.entry.term for m in second.find("Pivot syncs the repository")] == [
+        "Pivot",
+        "repository",
+    ]
+
+    glossary_path.write_text("Pivot\nrepository\t仓库\nbranch\t分支\n", encoding="utf-8")
+    tsv_path = glossary_path.rename(tmp_path / "glossary.tsv")
+    third = Glossary.load(GlossaryConfig(path=tsv_path), cache_dir)
+    assert len(third.entries) == 3
+    assert len(list(cache_dir.glob("*.json"))) == 2
+
+
+def test_load_keys_cache_by_file_format(tmp_path: Path) -> None:
+    content = "protected: [Pivot]\n"
+    cache_dir = tmp_path / "cache"
+    for name in ("glossary.yaml", "glossary.tsv"):
+        (tmp_path / name).write_text(content, encoding="utf-8")
+
+    as_yaml = Glossary.load(GlossaryConfig(path=tmp_path / "glossary.yaml"), cache_dir)
+    as_tsv = Glossary.load(GlossaryConfig(path=tmp_path / "glossary.tsv"), cache_dir)
+
+    assert [entry.term for entry in as_yaml.entries] == ["Pivot"]
+    assert [entry.term for entry in as_tsv.entries] == ["protected: [Pivot]"]
@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from pivot.loadtest import LoadTestSettings, run_load_test
+from pivot.standin import StandinSettings
+
+
+def test_run_load_test_reports_throughput(tmp_path: Path) -> None:
+    settings = LoadTestSettings(
+        repositories=2,
+        files_per_repository=3,
+        segments_per_file=4,
+        shared_fraction=0.5,
+        standin=StandinSettings(latency="fixed", latency_ms=1, error_rate=0.1, seed=3),
+    )
+
+    result = run_load_test(tmp_path, settings)
+
+    assert result.report.succeeded
+    assert result.report.files_written == 6
+    assert result.report.segments == 24
+    assert result.files_per_second > 0
+    assert result.segments_per_second > 0
+    assert result.concurrency.latency_p50 is not None
+    assert result.concurrency.latency_p99 is not None
+    assert result.peak_rss_bytes is None or result.peak_rss_bytes > 0
+    if result.baseline_rss_bytes is not None:
+        assert result.pipeline_rss_bytes is not None
+        assert result.pipeline_rss_bytes >= 0
+    page = tmp_path / "output" / "synthetic-000" / "docs" / "page-0000.md"
+    assert page.read_text(encoding="utf-8").startswith("# 〔译〕")
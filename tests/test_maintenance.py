@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from git import Actor, Repo
+
+from pivot.config import MaintenanceConfig, RepositoryConfig
+from pivot.maintenance import ObjectStats, RepositoryMaintainer, maintenance_reason
+from pivot.repository import RepositoryManager
+
+AUTHOR = Actor("Pivot Bot", "pivot@example.com")
+HOUR = 3600.0
+
+
+def _commit(origin: Repo, root: Path, name: str) -> None:
+    path = root / "docs" / f"{name}.md"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(f"# {name}\n", encoding="utf-8")
+    origin.index.add([f"docs/{name}.md"])
+    origin.index.commit(name, author=AUTHOR, committer=AUTHOR)
+
+
+def _stats(**overrides: object) -> ObjectStats:
+    values: dict[str, object] = {
+        "loose_objects": 0,
+        "loose_bytes": 0,
+        "packs": 1,
+        "pack_bytes": 0,
+        "has_commit_graph": True,
+    }
+    values.update(overrides)
+    return ObjectStats(**values)  # type: ignore[arg-type]
+
+
+def test_maintenance_reason_weighs_counts_and_age() -> None:
+    config = MaintenanceConfig(max_packs=4, max_loose_objects=100)
+    now = 1_000_000.0
+
+    assert maintenance_reason(_stats(), None, now, config) is None
+    assert maintenance_reason(_stats(packs=4), now - 2 * HOUR, now, config) == "packs=4"
+    assert maintenance_reason(_stats(loose_objects=150), None, now, config) == "loose=150"
+    # Within min_interval_hours nothing runs, whatever the counts.
+    assert maintenance_reason(_stats(packs=40), now - 0.5 * HOUR, now, config) is None
+    # Below the thresholds, only stale repositories with something to tidy run.
+    assert maintenance_reason(_stats(packs=2), now - 2 * HOUR, now, config) is None
+    assert maintenance_reason(_stats(packs=2), now - 200 * HOUR, now, config) == "interval"
+    assert maintenance_reason(_stats(has_commit_graph=False), None, now, config) == "interval"
+
+
+def test_maintainer_packs_and_writes_commit_graph(tmp_path: Path) -> None:
+    origin_path = tmp_path / "origin"
+    origin = Repo.init(origin_path)
+    _commit(origin, origin_path, "intro")
+    origin.git.branch("-M", "main")
+
+    manager = RepositoryManager(tmp_path / "repos")
+    config = RepositoryConfig(name="docs", url=str(origin_path), branch="main")
+    ref = manager.sync(config)
+    with manager.open(ref) as repo:
+        # Keep every fetch as its own pack, as large fetches would.
+        repo.git.config("fetch.unpackLimit", "1")
+    for index in range(4):
+        _commit(origin, origin_path, f"page-{index}")
+        manager.sync(config)
+
+    clock = [1_000_000.0]
+    state_path = tmp_path / "state" / "maintenance.json"
+    maintainer = RepositoryMaintainer(
+        manager,
+        MaintenanceConfig(max_packs=3, max_loose_objects=1),
+        state_path,
+        clock=lambda: clock[0],
+    )
+    (report,) = maintainer.run([config])
+
+    assert report.ran and report.error is None
+    assert report.before.packs >= 3 or report.before.loose_objects
+    assert report.after is not None
+    assert report.after.packs < max(report.before.packs, 2)
+    assert report.after.loose_objects == 0
+    assert report.after.has_commit_graph
+    assert set(report.tasks) >= {"commit-graph", "incremental-repack", "prune"}
+    assert report.probe_before is not None and report.probe_after is not None
+    with manager.open(ref) as repo:
+        assert repo.git.fsck("--connectivity-only") == ""
+        assert int(repo.git.rev_list("--count", "HEAD")) == 5
+
+    # The run is remembered, so a fresh maintainer skips the repository.
+    clock[0] += 60
+    again = RepositoryMaintainer(manager, MaintenanceConfig(), state_path, clock=lambda: clock[0])
+    (skipped,) = again.run([config])
+    assert not skipped.ran and skipped.after is None
+    (forced,) = again.run([config], force=True)
+    assert forced.reason == "forced"
+
+
+def test_maintainer_collects_shared_pool_safely(tmp_path: Path) -> None:
+    origin_path = tmp_path / "origin"
+    origin = Repo.init(origin_path)
+    _commit(origin, origin_path, "intro")
+    origin.git.branch("-M", "main")
+
+    manager = RepositoryManager(tmp_path / "repos", shared_objects=True)
+    configs = [
+        RepositoryConfig(name=name, url=str(origin_path), branch="main") for name in ("a", "b")
+    ]
+    for config in configs:
+        manager.sync(config)
+
+    maintainer = RepositoryMaintainer(
+        manager, MaintenanceConfig(), tmp_path / "state" / "maintenance.json"
+    )
+    reports = {report.name: report for report in maintainer.run(configs, force=True)}
+
+    assert set(reports) == {"a", "b", ".object-pool.git"}
+    assert all(report.error is None for report in reports.values())
+    assert set(reports[".object-pool.git"].tasks) == {"gc"}
+    for config in configs:
+        with manager.open(manager.reference(config)) as repo:
+            assert repo.git.fsck("--connectivity-only") == ""
+
+    # A clone dropped from the configuration still borrows from the pool.
+    other_path = tmp_path / "other"
+    other = Repo.init(other_path)
+    _commit(other, other_path, "dropped")
+    other.git.branch("-M", "main")
+    # A file:// URL, so the clone borrows objects instead of copying them locally.
+    dropped = RepositoryConfig(name="c", url=other_path.as_uri(), branch="main")
+    manager.sync(dropped)
+    with Repo(manager.pool_path) as pool:
+        pool.git.config("gc.pruneExpire", "now")
+        manager.collect_pool_garbage([*configs, dropped])
+        # As if the origin had rewritten its history: only the clone still
+        # references the objects, through the pool's mirror of its refs.
+        pool.git.update_ref("-d", "refs/remotes/c/main")
+    manager.collect_pool_garbage(configs)
+    with manager.open(manager.reference(dropped)) as repo:
+        assert repo.git.fsck("--connectivity-only", "--no-dangling") == ""
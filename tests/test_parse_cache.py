@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import os
+import textwrap
+from pathlib import Path
+
+from pivot.parse_cache import ParseCache
+from pivot.segmentation import segment_markdown, segment_yaml
+
+SOURCE = textwrap.dedent(
+    """\
+    # Guide
+
+    > - Quoted item
+    >   continued
+
+    | Name | Value |
+    | ---- | ----- |
+    | Pivot | 文档 |
+    """
+)
+BLOB = "ab" + "0" * 38
+
+
+def test_parse_cache_round_trips_segments(tmp_path: Path) -> None:
+    cache = ParseCache(tmp_path / "segments")
+    document = segment_markdown(SOURCE)
+
+    assert cache.get(BLOB, Path("guide.md"), SOURCE) is None
+    cache.put(BLOB, Path("guide.md"), document)
+    cached = cache.get(BLOB, Path("guide.md"), SOURCE)
+
+    assert cached is not None
+    assert cached.segments == document.segments
+    assert (cache.hits, cache.misses) == (1, 1)
+    # Parser family is part of the key, and a differing source is never trusted.
+    assert cache.get(BLOB, Path("guide.yaml"), SOURCE) is None
+    assert cache.get(BLOB, Path("guide.md"), SOURCE + "\n") is None
+
+
+def test_parse_cache_evicts_least_recently_used_entries(tmp_path: Path) -> None:
+    source = "title: A prose title here\nbody: Another prose value here\n"
+    document = segment_yaml(source)
+    probe = ParseCache(tmp_path / "probe")
+    probe.put(BLOB, Path("a.yaml"), document)
+    entry_size = probe.size_bytes
+
+    cache = ParseCache(tmp_path / "segments", max_bytes=entry_size * 3)
+    blobs = [f"{number:02d}" + "0" * 38 for number in range(3)]
+    for age, blob in enumerate(blobs):
+        cache.put(blob, Path("a.yaml"), document)
+        entry = next((tmp_path / "segments").rglob(f"{blob}.*"))
+        os.utime(entry, (1_000 + age, 1_000 + age))
+    assert cache.get(blobs[0], Path("a.yaml"), source) is not None
+
+    cache.put("ff" + "0" * 38, Path("a.yaml"), document)
+
+    assert cache.size_bytes <= entry_size * 3
+    assert cache.get(blobs[0], Path("a.yaml"), source) is not None
+    assert cache.get(blobs[1], Path("a.yaml"), source) is None
+
+
+def test_parse_cache_drops_damaged_entries(tmp_path: Path) -> None:
+    cache = ParseCache(tmp_path / "segments")
+    cache.put(BLOB, Path("guide.md"), segment_markdown(SOURCE))
+    entry = next((tmp_path / "segments").rglob(f"{BLOB}.*"))
+    data = bytearray(entry.read_bytes())
+    # The 22-byte header is followed by 33-byte records ending in their kind byte.
+    data[22 + 33 - 1] = 0xFF
+    entry.write_bytes(bytes(data))
+
+    assert cache.get(BLOB, Path("guide.md"), SOURCE) is None
+    assert not entry.exists()
+    assert cache.size_bytes == 0
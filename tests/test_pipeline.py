@@ -1,11 +1,13 @@
 from __future__ import annotations
 
+import asyncio
+import threading
 from pathlib import Path
 
 from git import Actor, Repo
 
 from pivot.config import RepositoryConfig
-from pivot.pipeline import LocalizationPipeline
+from pivot.pipeline import LocalizationPipeline, RepositoryPlan
 
 AUTHOR = Actor("Pivot Bot", "pivot@example.com")
 
@@ -52,3 +54,259 @@ def test_pipeline_collects_and_records_changes(tmp_path: Path) -> None:
     updated_plan = plans[0]
     assert updated_plan.pending_files == [Path("docs/usage.yaml")]
     assert updated_plan.has_changes
+
+
+class RecordingProvider:
+    def __init__(self) -> None:
+        self.calls: list[str] = []
+
+    async def translate(self, text: str) -> str:
+        self.calls.append(text)
+        await asyncio.sleep(0)
+        return f"译文 {text}"
+
+
+def _init_docs_origin(path: Path, body: str) -> Repo:
+    origin = Repo.init(path)
+    docs_dir = path / "docs"
+    docs_dir.mkdir(parents=True, exist_ok=True)
+    guide = f"# Guide\n\n{body}\n\nShared footer text.\n"
+    (docs_dir / "guide.md").write_text(guide, encoding="utf-8")
+    (docs_dir / "license.md").write_text("Shared footer text.\n", encoding="utf-8")
+    origin.index.add(["docs/guide.md", "docs/license.md"])
+    origin.index.commit("init", author=AUTHOR, committer=AUTHOR)
+    origin.git.branch("-M", "main")
+    return origin
+
+
+def test_pipeline_execute_deduplicates_across_repositories(tmp_path: Path) -> None:
+    configs = []
+    for name in ("alpha", "beta"):
+        origin = _init_docs_origin(tmp_path / f"origin-{name}", f"About {name}.")
+        configs.append(
+            RepositoryConfig(
+                name=name,
+                url=str(origin.working_tree_dir),
+                branch="main",
+                docs_path=Path("docs"),
+            )
+        )
+
+    pipeline = LocalizationPipeline(tmp_path / "work")
+    plans = pipeline.collect(configs)
+    provider = RecordingProvider()
+
+    report = asyncio.run(pipeline.execute(plans, provider, tmp_path / "out"))
+
+    assert report.succeeded
+    assert report.files_written == 4
+    assert report.segments == 8
+    assert sorted(provider.calls) == ["About alpha.", "About beta.", "Guide", "Shared footer text."]
+    assert report.dedup.requested == 8
+    assert report.dedup.unique == 4
+    assert report.dedup.ratio == 0.5
+
+    output = (tmp_path / "out" / "alpha" / "docs" / "guide.md").read_text(encoding="utf-8")
+    assert output == "# 译文 Guide\n\n译文 About alpha.\n\n译文 Shared footer text.\n"
+    assert all(not plan.has_changes for plan in pipeline.collect(configs))
+
+
+def test_pipeline_stream_translates_before_all_repositories_sync(tmp_path: Path) -> None:
+    configs = []
+    for name in ("fast", "slow"):
+        origin = _init_docs_origin(tmp_path / f"origin-{name}", f"About {name}.")
+        configs.append(
+            RepositoryConfig(
+                name=name,
+                url=str(origin.working_tree_dir),
+                branch="main",
+                docs_path=Path("docs"),
+            )
+        )
+
+    first_translation = threading.Event()
+    waited: list[bool] = []
+
+    class GatedPipeline(LocalizationPipeline):
+        def plan_repository(self, config: RepositoryConfig) -> list[RepositoryPlan]:
+            if config.name == "slow":
+                waited.append(first_translation.wait(timeout=5))
+            return super().plan_repository(config)
+
+    class SignallingProvider(RecordingProvider):
+        async def translate(self, text: str) -> str:
+            first_translation.set()
+            return await super().translate(text)
+
+    pipeline = GatedPipeline(tmp_path / "work")
+    provider = SignallingProvider()
+
+    report = asyncio.run(
+        pipeline.stream(configs, provider, tmp_path / "out", sync_concurrency=1, queue_size=1)
+    )
+
+    assert waited == [True]
+    assert report.succeeded
+    assert report.repositories == 2
+    assert report.files_written == 4
+    assert (tmp_path / "out" / "slow" / "docs" / "license.md").exists()
+    assert all(not plan.has_changes for plan in pipeline.collect(configs))
+
+
+def test_pipeline_translates_large_files_in_chunks(tmp_path: Path) -> None:
+    origin = Repo.init(tmp_path / "origin")
+    body = "".join(f"## Section {n}\n\nParagraph {n}.\n\n```\ncode {n}\n```\n\n" for n in range(50))
+    changelog = tmp_path / "origin" / "CHANGELOG.md"
+    changelog.write_text(body, encoding="utf-8")
+    origin.index.add(["CHANGELOG.md"])
+    origin.index.commit("init", author=AUTHOR, committer=AUTHOR)
+    origin.git.branch("-M", "main")
+    config = RepositoryConfig(name="big", url=str(origin.working_tree_dir), branch="main")
+
+    pipeline = LocalizationPipeline(tmp_path / "work", large_file_threshold=256, chunk_bytes=256)
+    provider = RecordingProvider()
+    report = asyncio.run(pipeline.execute(pipeline.collect([config]), provider, tmp_path / "out"))
+
+    assert report.succeeded
+    assert report.files_written == 1
+    assert report.segments == 100
+    output = (tmp_path / "out" / "big" / "CHANGELOG.md").read_text(encoding="utf-8")
+    assert output == body.replace("## Section", "## 译文 Section").replace(
+        "\n\nParagraph", "\n\n译文 Paragraph"
+    )
+    assert not list((tmp_path / "out" / "big").glob("*.partial"))
+
+
+def test_pipeline_tracks_branches_with_shared_blobs(tmp_path: Path) -> None:
+    origin = _init_docs_origin(tmp_path / "origin", "About main.")
+    origin.git.checkout("-b", "release-1.0")
+    guide = Path(origin.working_tree_dir) / "docs" / "guide.md"
+    guide.write_text("# Guide\n\nAbout the release.\n", encoding="utf-8")
+    origin.index.add(["docs/guide.md"])
+    origin.index.commit("release guide", author=AUTHOR, committer=AUTHOR)
+    origin.git.checkout("main")
+    config = RepositoryConfig(
+        name="docs",
+        url=str(origin.working_tree_dir),
+        branches=["main", "release-1.0"],
+        docs_path=Path("docs"),
+    )
+
+    pipeline = LocalizationPipeline(tmp_path / "work")
+    plans = pipeline.collect([config])
+    assert [plan.branch for plan in plans] == ["main", "release-1.0"]
+    assert plans[0].blobs[Path("docs/license.md")] == plans[1].blobs[Path("docs/license.md")]
+
+    provider = RecordingProvider()
+    report = asyncio.run(pipeline.execute(plans, provider, tmp_path / "out"))
+
+    assert report.succeeded
+    assert report.files_written == 4
+    assert report.files_reused == 1
+    out = tmp_path / "out" / "docs"
+    assert (out / "release-1.0" / "docs" / "guide.md").read_text(encoding="utf-8") == (
+        "# 译文 Guide\n\n译文 About the release.\n"
+    )
+    assert (out / "main" / "docs" / "license.md").read_text(encoding="utf-8") == (
+        (out / "release-1.0" / "docs" / "license.md").read_text(encoding="utf-8")
+    )
+    state = pipeline.state_store.get_repository_state("docs")
+    assert state.branches == {plan.branch: plan.head_commit for plan in plans}
+
+    origin.git.checkout("release-1.0")
+    guide.write_text("# Guide\n\nAbout the patch release.\n", encoding="utf-8")
+    origin.index.add(["docs/guide.md"])
+    origin.index.commit("patch guide", author=AUTHOR, committer=AUTHOR)
+
+    plans = pipeline.collect([config])
+    assert [plan.pending_files for plan in plans] == [[], [Path("docs/guide.md")]]
+
+
+def test_pipeline_reuses_parse_cache_across_runs(tmp_path: Path) -> None:
+    origin = _init_docs_origin(tmp_path / "origin", "About caching.")
+    config = RepositoryConfig(
+        name="docs", url=str(origin.working_tree_dir), branch="main", docs_path=Path("docs")
+    )
+
+    pipeline = LocalizationPipeline(tmp_path / "work")
+    first = asyncio.run(
+        pipeline.execute(pipeline.collect([config]), RecordingProvider(), tmp_path / "out")
+    )
+    assert (first.documents_segmented, first.parse_cache_hits) == (2, 0)
+
+    pipeline.state_store.clear()
+    second = asyncio.run(
+        pipeline.execute(pipeline.collect([config]), RecordingProvider(), tmp_path / "out")
+    )
+    assert (second.documents_segmented, second.parse_cache_hits) == (2, 2)
+    assert (tmp_path / "out" / "docs" / "docs" / "guide.md").read_text(encoding="utf-8") == (
+        "# 译文 Guide\n\n译文 About caching.\n\n译文 Shared footer text.\n"
+    )
+
+
+def test_pipeline_gives_each_large_blob_its_own_temporary_copy(tmp_path: Path) -> None:
+    body = "".join(f"## Section {n}\n\nParagraph {n}.\n\n" for n in range(40))
+    configs = []
+    for name in ("upstream", "fork"):
+        origin = Repo.init(tmp_path / f"origin-{name}")
+        (tmp_path / f"origin-{name}" / "CHANGELOG.md").write_text(body, encoding="utf-8")
+        origin.index.add(["CHANGELOG.md"])
+        origin.index.commit("init", author=AUTHOR, committer=AUTHOR)
+        origin.git.branch("-M", "main")
+        configs.append(RepositoryConfig(name=name, url=str(origin.working_tree_dir)))
+
+    pipeline = LocalizationPipeline(tmp_path / "work", large_file_threshold=256, chunk_bytes=256)
+    plans = pipeline.collect(configs)
+    assert plans[0].blobs == plans[1].blobs
+    for plan in plans:
+        plan.detached = True
+    report = asyncio.run(
+        pipeline.execute(plans, RecordingProvider(), tmp_path / "out", file_concurrency=1)
+    )
+
+    assert report.succeeded and report.files_written == 2
+    outputs = [
+        (tmp_path / "out" / name / "CHANGELOG.md").read_text(encoding="utf-8")
+        for name in ("upstream", "fork")
+    ]
+    translated = body.replace("## Section", "## 译文 Section")
+    assert outputs == [translated.replace("\n\nParagraph", "\n\n译文 Paragraph")] * 2
+    assert not list((tmp_path / "work" / "tmp").iterdir())
+
+
+def test_pipeline_reuses_outputs_of_earlier_runs_for_new_branches(tmp_path: Path) -> None:
+    origin = _init_docs_origin(tmp_path / "origin", "About main.")
+    origin.git.branch("v3.x")
+    config = RepositoryConfig(
+        name="docs", url=str(origin.working_tree_dir), branches=["main"], docs_path=Path("docs")
+    )
+    pipeline = LocalizationPipeline(tmp_path / "work")
+    first = asyncio.run(
+        pipeline.execute(pipeline.collect([config]), RecordingProvider(), tmp_path / "out")
+    )
+    assert first.succeeded and first.files_reused == 0
+
+    # A branch cut from main holds the same blobs; they are copied, not translated.
+    config = config.model_copy(update={"branches": ["main", "v3.x"]})
+    pipeline = LocalizationPipeline(tmp_path / "work")
+    provider = RecordingProvider()
+    plans = pipeline.collect([config])
+    assert [len(plan.pending_files) for plan in plans] == [0, 2]
+    second = asyncio.run(pipeline.execute(plans, provider, tmp_path / "out"))
+
+    assert second.succeeded and provider.calls == []
+    assert (second.files_written, second.files_reused, second.segments) == (2, 2, 4)
+    out = tmp_path / "out" / "docs"
+    for name in ("guide.md", "license.md"):
+        assert (out / "v3.x" / "docs" / name).read_bytes() == (
+            out / "main" / "docs" / name
+        ).read_bytes()
+
+    # An output edited since it was recorded is not trusted.
+    (out / "main" / "docs" / "guide.md").write_text("edited\n", encoding="utf-8")
+    pipeline.state_store.clear()
+    provider = RecordingProvider()
+    plans = [plan for plan in pipeline.collect([config]) if plan.branch == "v3.x"]
+    third = asyncio.run(pipeline.execute(plans, provider, tmp_path / "out"))
+    assert third.succeeded and third.files_reused == 1
+    assert sorted(provider.calls) == ["About main.", "Guide", "Shared footer text."]
@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import asyncio
+import io
+import json
+from pathlib import Path
+
+import pytest
+from git import Actor, Repo
+
+from pivot.config import RepositoryConfig
+from pivot.pipeline import LocalizationPipeline
+from pivot.planfile import PlanFileError, PlanSelection, PlanWriter, read_plan
+
+AUTHOR = Actor("Pivot Bot", "pivot@example.com")
+PAGES = {f"docs/page-{index}.md": f"# Page {index}\n\nBody {index}.\n" for index in range(6)}
+
+
+class EchoProvider:
+    async def translate(self, text: str) -> str:
+        await asyncio.sleep(0)
+        return f"译文 {text}"
+
+
+def _setup(tmp_path: Path) -> tuple[Repo, RepositoryConfig, LocalizationPipeline]:
+    origin_path = tmp_path / "origin"
+    origin = Repo.init(origin_path)
+    for name, content in PAGES.items():
+        (origin_path / name).parent.mkdir(parents=True, exist_ok=True)
+        (origin_path / name).write_text(content, encoding="utf-8")
+    origin.index.add(list(PAGES))
+    origin.index.commit("init", author=AUTHOR, committer=AUTHOR)
+    origin.git.branch("-M", "main")
+    config = RepositoryConfig(name="docs", url=str(origin_path), docs_path=Path("docs"))
+    return origin, config, LocalizationPipeline(tmp_path / "work")
+
+
+def _export(pipeline: LocalizationPipeline, config: RepositoryConfig) -> tuple[str, PlanWriter]:
+    buffer = io.StringIO()
+    writer = PlanWriter(buffer)
+    for plan in pipeline.plan_repository(config):
+        writer.write(plan, pipeline.blob_sizes(plan))
+    return buffer.getvalue(), writer
+
+
+def test_plan_file_round_trips_plans(tmp_path: Path) -> None:
+    origin, config, pipeline = _setup(tmp_path)
+    text, writer = _export(pipeline, config)
+
+    records = [json.loads(line) for line in text.splitlines()]
+    assert records[0] == {"kind": "pivot-plan", "version": 1}
+    assert records[1]["kind"] == "repository"
+    assert records[1]["head"] == origin.head.commit.hexsha
+    assert records[1]["base"] is None and records[1]["files"] == 6
+    sizes = {record["path"]: record["size"] for record in records[2:]}
+    assert sizes == {name: len(content.encode()) for name, content in PAGES.items()}
+    assert (writer.summary.files, writer.summary.bytes) == (6, sum(sizes.values()))
+
+    manager = pipeline.repository_manager
+    (plan,), summary = read_plan(text.splitlines(), {"docs": config}, manager.reference)
+    assert plan.detached and not plan.partial
+    assert [path.as_posix() for path in plan.pending_files] == sorted(PAGES)
+    assert summary.files == 6
+
+    shards = [
+        read_plan(
+            text.splitlines(), {"docs": config}, manager.reference, PlanSelection(0, None, k, 3)
+        )
+        for k in range(3)
+    ]
+    selected = [path for (shard_plan,), _ in shards for path in shard_plan.pending_files]
+    assert sorted(selected) == sorted(plan.pending_files)
+    (ranged,), _ = read_plan(
+        text.splitlines(), {"docs": config}, manager.reference, PlanSelection(start=2, stop=4)
+    )
+    assert ranged.partial and ranged.pending_files == plan.pending_files[2:4]
+
+
+def test_plan_file_rejects_unknown_repository_and_truncation(tmp_path: Path) -> None:
+    _, config, pipeline = _setup(tmp_path)
+    text, _ = _export(pipeline, config)
+    reference = pipeline.repository_manager.reference
+
+    with pytest.raises(PlanFileError):
+        read_plan(text.splitlines(), {}, reference)
+    with pytest.raises(PlanFileError):
+        read_plan(text.splitlines()[:-1], {"docs": config}, reference)
+    with pytest.raises(PlanFileError):
+        read_plan(["{}"], {"docs": config}, reference)
+
+
+def test_executing_plan_shards_records_only_complete_plans(tmp_path: Path) -> None:
+    origin, config, planner = _setup(tmp_path)
+    text, _ = _export(planner, config)
+    # The worker's clone may be checked out elsewhere; documents come from blobs.
+    worker = LocalizationPipeline(tmp_path / "worker")
+    worker.repository_manager.sync(config)
+    with worker.repository_manager.open(worker.repository_manager.reference(config)) as repo:
+        repo.git.checkout("--detach", "HEAD")
+        (Path(repo.working_tree_dir) / "docs" / "page-0.md").unlink()
+    output = tmp_path / "out"
+
+    reference = worker.repository_manager.reference
+    (first,), _ = read_plan(
+        text.splitlines(), {"docs": config}, reference, PlanSelection(shard=0, shards=2)
+    )
+    report = asyncio.run(worker.execute([first], EchoProvider(), output))
+    assert report.succeeded and report.files_written == len(first.pending_files)
+    assert worker.state_store.get_repository_state("docs").last_synced_commit is None
+
+    (full,), _ = read_plan(text.splitlines(), {"docs": config}, reference)
+    report = asyncio.run(worker.execute([full], EchoProvider(), output))
+    assert report.succeeded and report.files_written == 6
+    assert (
+        (output / "docs" / "docs" / "page-0.md")
+        .read_text(encoding="utf-8")
+        .startswith("# 译文 Page 0")
+    )
+    head = origin.head.commit.hexsha
+    assert worker.state_store.get_repository_state("docs").last_synced_commit == head
+
+
+def test_stale_plans_are_not_recorded(tmp_path: Path) -> None:
+    origin, config, pipeline = _setup(tmp_path)
+    old_text, _ = _export(pipeline, config)
+    reference = pipeline.repository_manager.reference
+    (old,), _ = read_plan(old_text.splitlines(), {"docs": config}, reference)
+    assert pipeline.is_current(old) and pipeline.mark_processed(old)
+
+    (Path(origin.working_tree_dir) / "docs" / "page-0.md").write_text("# New\n", encoding="utf-8")
+    origin.index.add(["docs/page-0.md"])
+    origin.index.commit("update", author=AUTHOR, committer=AUTHOR)
+    new_text, _ = _export(pipeline, config)
+    (new,), _ = read_plan(new_text.splitlines(), {"docs": config}, reference)
+    assert new.base_commit == old.head_commit
+    assert pipeline.mark_processed(new)
+
+    # The older plan would move the pointer backwards; the newer one is a no-op.
+    assert not pipeline.is_current(old) and not pipeline.mark_processed(old)
+    assert pipeline.is_current(new)
+    head = origin.head.commit.hexsha
+    assert pipeline.state_store.get_repository_state("docs").last_synced_commit == head
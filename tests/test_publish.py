@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import subprocess
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any
+
+import pytest
+from git import Actor, Repo
+
+from pivot.config import PublishConfig
+from pivot.publish import Publisher, PublishError, PublishSource, git_blob_id
+
+AUTHOR = Actor("Pivot Bot", "pivot@example.com")
+SOURCES = [PublishSource("docs", "https://example.com/docs.git", "main", "a" * 40)]
+
+
+def _write(root: Path, files: dict[str, str]) -> None:
+    for name, content in files.items():
+        path = root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content, encoding="utf-8")
+
+
+def _tree(repo: Repo, ref: str = "main") -> dict[str, str]:
+    commit = repo.commit(ref)
+    return {
+        str(item.path): item.data_stream.read().decode("utf-8")
+        for item in commit.tree.traverse()
+        if item.type == "blob"
+    }
+
+
+def test_publish_commits_output_and_skips_unchanged(tmp_path: Path) -> None:
+    output = tmp_path / "output"
+    _write(output, {"docs/guide.md": "# 指南\n", "docs/copy.md": "# 指南\n", "a.yaml": "k: v\n"})
+    (output / "docs" / "skip.md.partial").write_text("half", encoding="utf-8")
+    publisher = Publisher(PublishConfig(repository=tmp_path / "site.git", path_prefix="zh"))
+
+    first = publisher.publish(output, SOURCES)
+
+    repo = Repo(tmp_path / "site.git")
+    assert repo.bare
+    assert first.changed and repo.commit("main").hexsha == first.commit
+    assert (first.written, first.reused) == (2, 1)
+    assert _tree(repo) == {
+        "zh/a.yaml": "k: v\n",
+        "zh/docs/copy.md": "# 指南\n",
+        "zh/docs/guide.md": "# 指南\n",
+    }
+    message = repo.commit("main").message
+    assert "Source: docs https://example.com/docs.git (main)" in message
+    assert f"Last-Synced-Commit: {'a' * 40}" in message
+
+    again = publisher.publish(output, SOURCES)
+    assert not again.changed
+    assert again.unchanged == 3
+    assert repo.commit("main").hexsha == first.commit
+
+
+def test_publish_updates_changed_and_deleted_files(tmp_path: Path) -> None:
+    output = tmp_path / "output"
+    _write(output, {"guide.md": "old\n", "gone.md": "bye\n", "keep.md": "same\n"})
+    publisher = Publisher(PublishConfig(repository=tmp_path / "site.git"))
+    first = publisher.publish(output, SOURCES)
+
+    (output / "gone.md").unlink()
+    _write(output, {"guide.md": "new\n", "moved.md": "same\n"})
+    second = publisher.publish(output, SOURCES)
+
+    repo = Repo(tmp_path / "site.git")
+    assert repo.commit("main").parents[0].hexsha == first.commit
+    assert _tree(repo) == {"guide.md": "new\n", "keep.md": "same\n", "moved.md": "same\n"}
+    # moved.md matches a blob already on the branch, so only guide.md is new.
+    assert (second.written, second.reused, second.unchanged, second.deleted) == (1, 1, 1, 1)
+
+
+def test_publish_refreshes_checked_out_working_tree(tmp_path: Path) -> None:
+    site = Repo.init(tmp_path / "site")
+    (tmp_path / "site" / "README.md").write_text("site\n", encoding="utf-8")
+    site.index.add(["README.md"])
+    site.index.commit("init", author=AUTHOR, committer=AUTHOR)
+    site.git.branch("-M", "main")
+
+    output = tmp_path / "output"
+    _write(output, {"guide.md": "# 指南\n"})
+    config = PublishConfig(repository=tmp_path / "site", path_prefix="zh", update_working_tree=True)
+    Publisher(config).publish(output, SOURCES)
+
+    assert (tmp_path / "site" / "zh" / "guide.md").read_text(encoding="utf-8") == "# 指南\n"
+    assert (tmp_path / "site" / "README.md").exists()
+    assert not site.is_dirty(untracked_files=True)
+
+
+def test_publish_reports_invalid_target(tmp_path: Path) -> None:
+    target = tmp_path / "not-a-repo"
+    target.mkdir()
+    with pytest.raises(PublishError):
+        Publisher(PublishConfig(repository=target)).publish(tmp_path, SOURCES)
+
+
+def test_publish_reaps_fast_import_when_output_cannot_be_read(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    started: list[subprocess.Popen[bytes]] = []
+    popen = subprocess.Popen
+
+    def recording_popen(*args: Any, **kwargs: Any) -> subprocess.Popen[bytes]:
+        process = popen(*args, **kwargs)
+        started.append(process)
+        return process
+
+    def unreadable(self: Publisher, output_dir: Path) -> Iterator[tuple[Path, str]]:
+        yield output_dir / "missing.md", "missing.md"
+
+    monkeypatch.setattr(subprocess, "Popen", recording_popen)
+    monkeypatch.setattr(Publisher, "_iter_output", unreadable)
+    publisher = Publisher(PublishConfig(repository=tmp_path / "site.git"))
+
+    with pytest.raises(PublishError):
+        publisher.publish(tmp_path / "output", SOURCES)
+
+    assert len(started) == 1
+    assert started[0].returncode is not None
+    assert Repo(tmp_path / "site.git").heads == []
+
+
+def test_git_blob_id_matches_git(tmp_path: Path) -> None:
+    path = tmp_path / "blob.md"
+    path.write_bytes("# 指南\n".encode())
+    repo = Repo.init(tmp_path / "repo")
+    assert git_blob_id(path.read_bytes()) == repo.git.hash_object(str(path))
@@ -1,11 +1,14 @@
 from __future__ import annotations
 
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 from git import Actor, Repo
 
 from pivot.config import RepositoryConfig
-from pivot.repository import RepositoryManager
+from pivot.repository import RepoHandlePool, RepositoryManager
 
 AUTHOR = Actor("Pivot Bot", "pivot@example.com")
 
@@ -33,16 +36,146 @@ def test_repository_manager_clone_and_update(tmp_path: Path) -> None:
         docs_path=Path("docs"),
     )
 
-    repo = manager.sync(config)
+    ref = manager.sync(config)
     local_path = manager.local_path(config)
-    assert Path(repo.working_tree_dir) == local_path
-    initial_head = repo.head.commit.hexsha
+    assert ref.path == local_path
+    with manager.open(ref) as repo:
+        assert Path(repo.working_tree_dir) == local_path
+        initial_head = repo.head.commit.hexsha
 
     updated_file = origin_path / "docs" / "usage.md"
     updated_file.write_text("usage", encoding="utf-8")
     origin.index.add([str(updated_file.relative_to(origin_path))])
     origin.index.commit("add usage", author=AUTHOR, committer=AUTHOR)
 
-    repo = manager.sync(config)
-    assert repo.head.commit.hexsha != initial_head
+    with manager.open(manager.sync(config)) as repo:
+        assert repo.head.commit.hexsha != initial_head
     assert (local_path / "docs" / "usage.md").exists()
+
+
+def _count_local_objects(repo: Repo) -> int:
+    stats = dict(
+        line.split(": ", 1) for line in repo.git.count_objects("-v").splitlines() if ": " in line
+    )
+    return int(stats["count"]) + int(stats["in-pack"])
+
+
+def test_repository_manager_shares_objects_between_forks(tmp_path: Path) -> None:
+    upstream_path = tmp_path / "upstream"
+    upstream = _init_origin(upstream_path)
+    for number in range(5):
+        page = upstream_path / "docs" / f"page{number}.md"
+        page.write_text(f"page {number}", encoding="utf-8")
+        upstream.index.add([str(page.relative_to(upstream_path))])
+        upstream.index.commit(f"page {number}", author=AUTHOR, committer=AUTHOR)
+
+    fork_path = tmp_path / "fork"
+    fork = upstream.clone(str(fork_path))
+    extra = fork_path / "docs" / "fork.md"
+    extra.write_text("fork only", encoding="utf-8")
+    fork.index.add([str(extra.relative_to(fork_path))])
+    fork.index.commit("fork change", author=AUTHOR, committer=AUTHOR)
+
+    manager = RepositoryManager(tmp_path / "repos", shared_objects=True)
+    # file:// URLs force a real transport; plain local paths would be hard-linked.
+    configs = [
+        RepositoryConfig(name="upstream", url=upstream_path.as_uri(), branch="main"),
+        RepositoryConfig(name="fork", url=fork_path.as_uri(), branch="main"),
+    ]
+    refs = manager.sync_all(configs)
+
+    pool_objects = str((manager.pool_path / "objects").resolve())
+    for ref in refs.values():
+        alternates = ref.path / ".git" / "objects" / "info" / "alternates"
+        assert alternates.read_text(encoding="utf-8").split() == [pool_objects]
+        with manager.open(ref) as repo:
+            assert _count_local_objects(repo) == 0
+    assert (manager.local_path(configs[1]) / "docs" / "fork.md").exists()
+
+    # Rewrite the upstream branch so the pool alone no longer references the
+    # clone's commits; pool GC must still keep everything the clones need.
+    upstream.git.reset("--hard", "HEAD~3")
+    fork.git.reset("--hard", "HEAD~3")
+    for config in configs:
+        manager._fetch_into_pool(config).close()
+    manager.collect_pool_garbage(configs)
+    Repo(manager.pool_path).git.prune("--expire=now")
+
+    for ref in refs.values():
+        with manager.open(ref) as repo:
+            repo.git.fsck("--connectivity-only")
+            assert repo.head.commit.tree.traverse()
+
+
+def test_repo_handle_pool_bounds_open_handles(tmp_path: Path) -> None:
+    paths = []
+    for number in range(3):
+        path = tmp_path / f"origin{number}"
+        _init_origin(path)
+        paths.append(path)
+
+    pool = RepoHandlePool(capacity=2)
+    with pool.lease(paths[0]) as first:
+        assert first.head.commit.tree["docs"]
+        assert first.git.cat_file_all is not None
+
+    with pool.lease(paths[1]) as second, pool.lease(paths[2]):
+        assert pool.open_count == 2
+        # The least recently used, unleased handle was closed with its helpers.
+        assert first.git.cat_file_all is None
+        with pool.lease(paths[1]) as again:
+            assert again is second
+
+    with pool.lease(paths[0]), pool.lease(paths[1]), pool.lease(paths[2]):
+        # Leased handles are never closed underneath their users.
+        assert pool.open_count == 3
+    assert pool.open_count == 2
+
+    pool.close()
+    assert pool.open_count == 0
+
+
+def test_shared_object_pool_tolerates_concurrent_syncs(tmp_path: Path) -> None:
+    configs = []
+    for number in range(6):
+        path = tmp_path / f"origin{number}"
+        _init_origin(path)
+        configs.append(RepositoryConfig(name=f"repo{number}", url=path.as_uri(), branch="main"))
+
+    manager = RepositoryManager(tmp_path / "repos", shared_objects=True)
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        list(executor.map(manager.sync, configs))
+
+    pool = Repo(manager.pool_path)
+    assert {remote.name for remote in pool.remotes} == {config.name for config in configs}
+    reader = pool.config_reader()
+    assert reader.get_value("gc", "auto") == 0
+    assert reader.get_value("maintenance", "auto") is False
+    pool.close()
+
+
+def test_repo_handle_pool_leases_are_exclusive_across_threads(tmp_path: Path) -> None:
+    _init_origin(tmp_path / "origin")
+    pool = RepoHandlePool(capacity=1)
+    active = 0
+    overlaps = 0
+    lock = threading.Lock()
+
+    def use_handle(_: int) -> str:
+        nonlocal active, overlaps
+        with pool.lease(tmp_path / "origin") as repo:
+            with lock:
+                active += 1
+                overlaps += active > 1
+            time.sleep(0.005)
+            text = repo.head.commit.tree["docs"]["readme.md"].data_stream.read().decode()
+            with lock:
+                active -= 1
+        return text
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        results = list(executor.map(use_handle, range(16)))
+
+    assert results == ["hello"] * 16
+    assert overlaps == 0
+    pool.close()
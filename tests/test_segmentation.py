@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+import textwrap
+from pathlib import Path
+
+from ruamel.yaml import YAML
+
+from pivot.segmentation import (
+    iter_markdown_chunks,
+    segment_document,
+    segment_markdown,
+    segment_yaml,
+)
+
+
+def test_markdown_segments_skip_code_and_preserve_structure() -> None:
+    source = textwrap.dedent(
+        """\
+        ---
+        title: Getting started guide
+        ---
+        # Install the tool
+
+        Pivot keeps docs in sync
+        across many repos.
+
+        ```bash
+        echo "do not translate"
+        ```
+
+        - First item
+          continued here
+
+        > Quoted note.
+
+        | Name | Description |
+        | ---- | ----------- |
+        | `a`  | First thing |
+        """
+    )
+
+    document = segment_markdown(source)
+    texts = [segment.text for segment in document.segments]
+
+    assert texts == [
+        "Getting started guide",
+        "Install the tool",
+        "Pivot keeps docs in sync\nacross many repos.",
+        "First item\ncontinued here",
+        "Quoted note.",
+        "Name",
+        "Description",
+        "`a`",
+        "First thing",
+    ]
+    assert all("do not translate" not in text for text in texts)
+
+    rendered = document.render([f"<{text}>" for text in texts])
+    assert "title: <Getting started guide>" in rendered
+    assert "# <Install the tool>" in rendered
+    assert "- <First item\n  continued here>" in rendered
+    assert 'echo "do not translate"' in rendered
+    assert "| ---- | ----------- |" in rendered
+
+
+def test_yaml_segments_only_prose_values() -> None:
+    source = textwrap.dedent(
+        """\
+        title: Hello world page
+        weight: 3
+        slug: getting-started
+        summary: "Say \\"hi\\" now"
+        body: |
+          First line of the block.
+
+          Second paragraph.
+        """
+    )
+
+    document = segment_yaml(source)
+
+    assert [segment.text for segment in document.segments] == [
+        "Hello world page",
+        'Say "hi" now',
+        "First line of the block.\n\nSecond paragraph.",
+    ]
+    rendered = document.render(["标题: 你好", '说 "你好"', "第一行。\n\n第二段。"])
+    assert 'title: "标题: 你好"' in rendered
+    assert 'summary: "说 \\"你好\\""' in rendered
+    assert "body: |\n  第一行。\n\n  第二段。\n" in rendered
+    assert "slug: getting-started" in rendered
+
+
+def test_unknown_suffix_has_no_segments() -> None:
+    assert segment_document(Path("notes.txt"), "plain text here").segments == []
+
+
+def test_markdown_chunks_split_at_headings_outside_fences(tmp_path: Path) -> None:
+    sections = ["---\ntitle: Release notes\n---\n"]
+    for number in range(40):
+        sections.append(
+            f"## Release {number}\n\nFixed bug {number}.\n\n"
+            f"```md\n# not a heading {number}\n\n## still code\n```\n\n"
+        )
+    source = "".join(sections)
+    path = tmp_path / "CHANGELOG.md"
+    path.write_text(source, encoding="utf-8")
+
+    chunks = list(iter_markdown_chunks(path, max_chunk_bytes=300))
+
+    assert len(chunks) > 5
+    assert "".join(chunks) == source
+    assert all(chunk.startswith("## Release") for chunk in chunks[1:])
+    assert all(chunk.count("```") % 2 == 0 for chunk in chunks)
+    chunked = [s.text for chunk in chunks for s in segment_markdown(chunk).segments]
+    assert chunked == [s.text for s in segment_markdown(source).segments]
+
+
+def test_yaml_identity_translation_preserves_escaped_values() -> None:
+    source = textwrap.dedent(
+        """\
+        path: "Use C:\\\\path and more words"
+        tabbed: "Column\\tseparated words here"
+        accented: "Caf\\u00e9 is open today"
+        quoted: 'It''s a good day'
+        tags: [not prose here, nor this]
+        """
+    )
+
+    document = segment_yaml(source)
+    rendered = document.render([segment.text for segment in document.segments])
+
+    yaml = YAML(typ="safe")
+    assert yaml.load(rendered) == yaml.load(source)
+    assert [segment.text for segment in document.segments][0] == "Use C:\\path and more words"
+
+
+def test_markdown_nested_containers_keep_their_prefixes() -> None:
+    source = "> - Quoted list item\n\n- [x] Finished task\n"
+
+    document = segment_markdown(source)
+
+    assert [segment.text for segment in document.segments] == [
+        "Quoted list item",
+        "Finished task",
+    ]
+    rendered = document.render(["第一行\n第二行", "完成"])
+    assert rendered == "> - 第一行\n>   第二行\n\n- [x] 完成\n"
+
+
+def test_headings_and_folded_scalars_keep_their_line_structure() -> None:
+    document = segment_markdown("> ## Quoted heading\n")
+    assert document.render(["引用的\n标题"]) == "> ## 引用的 标题\n"
+
+    source = "summary: >\n  A folded paragraph\n  wrapped over lines.\n\n  Second one.\nnext: 1\n"
+    document = segment_yaml(source)
+
+    assert document.render([segment.text for segment in document.segments]) == source
+    rendered = document.render(["折叠的\n段落"])
+    assert rendered == "summary: >\n  折叠的\n  段落\nnext: 1\n"
+
+
+def test_markdown_chunks_never_split_nested_blocks(tmp_path: Path) -> None:
+    sections = []
+    for number in range(30):
+        sections.append(
+            f"Paragraph {number} introduces the list.\n\n"
+            f"- Item {number} with nested code:\n\n"
+            f"      ```\n      # not a heading {number}\n\n      Still code.\n      ```\n\n"
+            f"  Continued item text {number}.\n\n"
+            f"<pre>\nPreformatted {number}\n\nMore preformatted text\n</pre>\n\n"
+        )
+    source = "".join(sections)
+    path = tmp_path / "nested.md"
+    path.write_text(source, encoding="utf-8")
+
+    chunks = list(iter_markdown_chunks(path, max_chunk_bytes=200))
+
+    assert len(chunks) > 5
+    assert "".join(chunks) == source
+    assert all(chunk.count("```") % 2 == 0 for chunk in chunks)
+    assert all(chunk.count("<pre>") == chunk.count("</pre>") for chunk in chunks)
+    assert not any(chunk.startswith(" ") for chunk in chunks)
+    chunked = [s.text for chunk in chunks for s in segment_markdown(chunk).segments]
+    assert chunked == [s.text for s in segment_markdown(source).segments]
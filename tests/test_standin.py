@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from pivot.config import TranslationProviderConfig
+from pivot.standin import StandinServer, StandinSettings, pseudo_translate
+from pivot.translation import OpenAICompatibleProvider, RateLimitError
+
+
+def _provider_config(base_url: str) -> TranslationProviderConfig:
+    return TranslationProviderConfig.model_validate(
+        {"provider": "openai", "model": "m", "base_url": base_url, "api_key": "k"}
+    )
+
+
+def test_standin_returns_deterministic_pseudo_translation() -> None:
+    with StandinServer(StandinSettings(latency="fixed", latency_ms=1)) as server:
+        provider = OpenAICompatibleProvider(_provider_config(server.base_url))
+
+        async def scenario() -> str:
+            try:
+                return await provider.translate("Use ⟦G0⟧ here")
+            finally:
+                await provider.aclose()
+
+        assert asyncio.run(scenario()) == pseudo_translate("Use ⟦G0⟧ here")
+        assert server.behaviour.requests == 1
+
+
+def test_standin_injects_rate_limits_with_retry_after() -> None:
+    settings = StandinSettings(
+        latency="fixed", latency_ms=0, rate_limit_rate=1.0, retry_after_seconds=3
+    )
+    with StandinServer(settings) as server:
+        provider = OpenAICompatibleProvider(_provider_config(server.base_url))
+
+        async def scenario() -> None:
+            try:
+                await provider.translate("Hello")
+            finally:
+                await provider.aclose()
+
+        with pytest.raises(RateLimitError) as excinfo:
+            asyncio.run(scenario())
+    assert excinfo.value.retry_after == 3.0
+
+
+def test_standin_settings_validation() -> None:
+    with pytest.raises(ValueError):
+        StandinSettings(latency="bimodal")
+    with pytest.raises(ValueError):
+        StandinSettings(error_rate=0.7, rate_limit_rate=0.7)
@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import asyncio
+
+import httpx
+import pytest
+
+from pivot.config import TranslationProviderConfig
+from pivot.glossary import Glossary, GlossaryEntry
+from pivot.translation import (
+    DeduplicatingTranslator,
+    GlossaryProvider,
+    OpenAICompatibleProvider,
+    RateLimitError,
+    TranslationError,
+    normalize_segment,
+    parse_retry_after,
+)
+
+
+class SlowProvider:
+    def __init__(self) -> None:
+        self.calls: list[str] = []
+
+    async def translate(self, text: str) -> str:
+        self.calls.append(text)
+        await asyncio.sleep(0.01)
+        return f"译:{text}"
+
+
+class FlakyProvider:
+    def __init__(self) -> None:
+        self.calls = 0
+
+    async def translate(self, text: str) -> str:
+        self.calls += 1
+        await asyncio.sleep(0)
+        if self.calls == 1:
+            raise TranslationError("boom")
+        return text.upper()
+
+
+def test_normalize_segment_collapses_horizontal_whitespace() -> None:
+    assert normalize_segment("  Hello   world \n next\tline ") == "Hello world\nnext line"
+
+
+def test_deduplicator_single_flight() -> None:
+    provider = SlowProvider()
+    translator = DeduplicatingTranslator(provider)
+
+    async def scenario() -> list[str]:
+        first = await asyncio.gather(*(translator.translate("Footer  text") for _ in range(5)))
+        later = await translator.translate("Footer text")
+        other = await translator.translate("Other")
+        return [*first, later, other]
+
+    results = asyncio.run(scenario())
+
+    assert provider.calls == ["Footer  text", "Other"]
+    assert results[:6] == ["译:Footer  text"] * 6
+    assert translator.stats.requested == 7
+    assert translator.stats.unique == 2
+    assert translator.stats.coalesced == 4
+    assert translator.stats.ratio == pytest.approx(5 / 7)
+
+
+def test_deduplicator_forgets_failures() -> None:
+    provider = FlakyProvider()
+    translator = DeduplicatingTranslator(provider)
+
+    async def scenario() -> str:
+        with pytest.raises(TranslationError):
+            await asyncio.gather(translator.translate("x"), translator.translate("x"))
+        return await translator.translate("x")
+
+    assert asyncio.run(scenario()) == "X"
+    assert provider.calls == 2
+
+
+def test_deduplicator_hands_cancelled_requests_to_waiters() -> None:
+    provider = SlowProvider()
+    translator = DeduplicatingTranslator(provider)
+
+    async def scenario() -> str:
+        owner = asyncio.ensure_future(translator.translate("x"))
+        waiter = asyncio.ensure_future(translator.translate("x"))
+        await asyncio.sleep(0)
+        owner.cancel()
+        return await waiter
+
+    assert asyncio.run(scenario()) == "译:x"
+    assert provider.calls == ["x", "x"]
+    assert (translator.stats.unique, translator.stats.coalesced) == (2, 0)
+
+
+def test_glossary_provider_masks_terms() -> None:
+    seen: list[str] = []
+
+    class Echo:
+        async def translate(self, text: str) -> str:
+            seen.append(text)
+            return text.replace("Use", "使用")
+
+    glossary = Glossary.from_entries([GlossaryEntry("kubectl"), GlossaryEntry("pod", "Pod")])
+    translator = GlossaryProvider(Echo(), glossary)
+
+    result = asyncio.run(translator.translate("Use kubectl on the pod"))
+
+    assert "kubectl" not in seen[0]
+    assert result == "使用 kubectl on the Pod"
+
+
+def test_openai_provider_posts_chat_completion() -> None:
+    captured: dict[str, object] = {}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        captured["url"] = str(request.url)
+        captured["auth"] = request.headers["Authorization"]
+        return httpx.Response(200, json={"choices": [{"message": {"content": "你好"}}]})
+
+    config = TranslationProviderConfig(
+        provider="openai",
+        model="m",
+        base_url="http://provider.test/v1",
+        api_key="secret",
+    )
+
+    async def scenario() -> str:
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            provider = OpenAICompatibleProvider(config, client=client)
+            return await provider.translate("Hello")
+
+    assert asyncio.run(scenario()) == "你好"
+    assert captured == {"url": "http://provider.test/v1/chat/completions", "auth": "Bearer secret"}
+
+
+def test_parse_retry_after_accepts_seconds_and_dates() -> None:
+    assert parse_retry_after("3") == 3.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+    assert parse_retry_after("soon") is None
+
+
+def test_openai_provider_maps_rate_limits() -> None:
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(429, headers={"Retry-After": "2"})
+
+    config = TranslationProviderConfig(provider="openai", model="m", api_key="k")
+
+    async def scenario() -> None:
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            await OpenAICompatibleProvider(config, client=client).translate("Hello")
+
+    with pytest.raises(RateLimitError) as excinfo:
+        asyncio.run(scenario())
+    assert excinfo.value.retry_after == 2.0
@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+from pathlib import Path
+
+from pivot.translation_memory import MemoryProvider, TranslationMemory, patch_translation
+
+SOURCE = "Pivot 1.4 requires Python 3.10 or later on every build agent."
+TRANSLATION = "Pivot 1.4 需要在每个构建节点上使用 Python 3.10 或更高版本。"
+
+
+class CountingProvider:
+    def __init__(self) -> None:
+        self.calls: list[str] = []
+
+    async def translate(self, text: str) -> str:
+        self.calls.append(text)
+        await asyncio.sleep(0)
+        return f"译文 {text}"
+
+
+def test_patch_translation_carries_verbatim_tokens() -> None:
+    bumped = SOURCE.replace("3.10", "3.11").replace("1.4", "1.5")
+    assert patch_translation(SOURCE, TRANSLATION, bumped) == (
+        "Pivot 1.5 需要在每个构建节点上使用 Python 3.11 或更高版本。"
+    )
+    renamed = SOURCE.replace("Pivot", "Pilot")
+    assert patch_translation(SOURCE, TRANSLATION, renamed) == TRANSLATION.replace("Pivot", "Pilot")
+    # Translated words, insertions and deletions need a real translation.
+    assert patch_translation(SOURCE, TRANSLATION, SOURCE.replace("later", "newer")) is None
+    assert patch_translation(SOURCE, TRANSLATION, SOURCE.replace(" or later", "")) is None
+    assert patch_translation(SOURCE, TRANSLATION, SOURCE) is None
+
+
+def test_memory_finds_near_duplicates_across_reopen(tmp_path: Path) -> None:
+    path = tmp_path / "memory.sqlite3"
+    memory = TranslationMemory(path)
+    memory.add(SOURCE, TRANSLATION)
+    for index in range(50):
+        memory.add(f"Unrelated paragraph number {index} about something else.", "无关")
+    memory.close()
+
+    memory = TranslationMemory(path)
+    assert len(memory) == 51
+    assert memory.get("  " + SOURCE) == TRANSLATION
+    match = memory.find_similar(SOURCE.replace("3.10", "3.12"))
+    assert match is not None and match.source == SOURCE
+    assert 0.8 <= match.similarity < 1
+    assert memory.find_similar("Completely different text that shares nothing at all.") is None
+    assert memory.find_similar("Pivot 1.5") is None
+    memory.close()
+
+
+def test_memory_provider_reuses_exact_and_patched_segments(tmp_path: Path) -> None:
+    inner = CountingProvider()
+    memory = TranslationMemory(tmp_path / "memory.sqlite3")
+    provider = MemoryProvider(inner, memory)
+    memory.add(SOURCE, TRANSLATION)
+
+    async def scenario() -> list[str]:
+        return [
+            await provider.translate(SOURCE),
+            await provider.translate(SOURCE.replace("3.10", "3.13")),
+            # Similar enough to match, but "on" was translated, so it cannot be patched.
+            await provider.translate(SOURCE.replace(" on ", " in ")),
+        ]
+
+    exact, patched, fresh = asyncio.run(scenario())
+    assert exact == TRANSLATION
+    assert patched == TRANSLATION.replace("3.10", "3.13")
+    assert fresh == f"译文 {SOURCE.replace(' on ', ' in ')}"
+    assert inner.calls == [SOURCE.replace(" on ", " in ")]
+    stats = provider.stats
+    assert (stats.lookups, stats.exact, stats.fuzzy_matches, stats.patched) == (3, 1, 2, 1)
+    assert stats.fuzzy_ratio == 1 / 3
+    # Both new segments are remembered for later runs.
+    assert memory.get(SOURCE.replace("3.10", "3.13")) == patched
+    assert memory.get(SOURCE.replace(" on ", " in ")) == fresh
+    memory.close()
+
+
+def test_patch_translation_matches_whole_terms_only() -> None:
+    source = "Use Python 3.10 on Linux."
+    translation = "在Linux上使用Python 3.10.1。"
+    assert patch_translation(source, translation, "Use Python 3.10 in Linux.") is None
+    assert patch_translation(source, translation, "Use Python 3.11 on Linux.") is None
+    assert patch_translation(source, translation, "Use Python 3.10 on macOS.") == (
+        "在macOS上使用Python 3.10.1。"
+    )
+
+
+def test_memory_is_cleared_when_the_glossary_changes(tmp_path: Path) -> None:
+    path = tmp_path / "memory.sqlite3"
+    memory = TranslationMemory(path, glossary_digest="a")
+    memory.add(SOURCE, TRANSLATION)
+    memory.close()
+
+    memory = TranslationMemory(path, glossary_digest="a")
+    assert memory.get(SOURCE) == TRANSLATION
+    memory.close()
+
+    memory = TranslationMemory(path, glossary_digest="b")
+    assert len(memory) == 0
+    assert memory.find_similar(SOURCE.replace("3.10", "3.12")) is None
+    memory.close()
+
+
+def test_memory_provider_keeps_database_work_off_the_event_loop(tmp_path: Path) -> None:
+    threads: set[int] = set()
+
+    class RecordingMemory(TranslationMemory):
+        def get(self, text: str) -> str | None:
+            threads.add(threading.get_ident())
+            return super().get(text)
+
+    inner = CountingProvider()
+    memory = RecordingMemory(tmp_path / "memory.sqlite3")
+    provider = MemoryProvider(inner, memory)
+    texts = [f"Paragraph number {index} of the guide." for index in range(20)]
+
+    async def scenario() -> list[str]:
+        return list(await asyncio.gather(*(provider.translate(text) for text in texts)))
+
+    assert asyncio.run(scenario()) == [f"译文 {text}" for text in texts]
+    assert threads and threading.get_ident() not in threads
+    assert len(memory) == 20
+    memory.close()